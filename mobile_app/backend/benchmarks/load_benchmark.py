@@ -0,0 +1,443 @@
+"""Scripted user journeys against the API, with latency, throughput and Mongo command counts.
+
+In-process (default): builds the app, runs its lifespan, seeds a dataset with seed.py and
+drives it through httpx's ASGI transport. Pick the storage with STORAGE_BACKEND/MONGO_URL.
+
+    STORAGE_BACKEND=memory python benchmarks/load_benchmark.py --concurrency 16 --duration 20
+
+Against a running server (seed it first with `python seed.py --prefix bench`); Mongo
+command counts are only available in-process:
+
+    python benchmarks/load_benchmark.py --base-url http://127.0.0.1:8000 --prefix bench
+
+Scenarios run one after another, each at the configured concurrency, so the Mongo
+commands captured while a scenario runs belong to it. Results go to a JSON file;
+`--compare` prints the change against an earlier results file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable
+import uuid
+
+import httpx
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from routing.spot_tiles import tile_for_point  # noqa: E402
+
+
+@dataclass
+class Session:
+    """One virtual user: an authenticated client plus what its journeys need."""
+
+    client: httpx.AsyncClient
+    index: int
+    user_id: str = ""
+    token: str = ""
+    rng: random.Random = field(default_factory=random.Random)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class Shared:
+    username_prefix: str
+    password: str
+    users: int
+    spots: list[dict[str, Any]] = field(default_factory=list)
+
+
+class Recorder:
+    """Latency samples per scenario step and per whole journey."""
+
+    def __init__(self) -> None:
+        self.steps: dict[str, list[float]] = {}
+        self.journeys: list[float] = []
+        self.errors: dict[str, int] = {}
+        self.requests = 0
+
+    async def call(self, session: Session, step: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await session.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self._error(step, type(e).__name__)
+            raise
+        finally:
+            self.steps.setdefault(step, []).append(time.perf_counter() - started)
+            self.requests += 1
+        if response.status_code >= 400:
+            self._error(step, str(response.status_code))
+        return response
+
+    def _error(self, step: str, reason: str) -> None:
+        key = f"{step}:{reason}"
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+
+Journey = Callable[[Session, Shared, Recorder], Awaitable[None]]
+
+
+def _random_spot(session: Session, shared: Shared) -> dict[str, Any] | None:
+    return session.rng.choice(shared.spots) if shared.spots else None
+
+
+async def journey_auth(session: Session, shared: Shared, rec: Recorder) -> None:
+    name = f"bench{uuid.uuid4().hex[:12]}"
+    password = "Bench1234!"
+    await rec.call(
+        session,
+        "register",
+        "POST",
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": password},
+    )
+    await rec.call(session, "login", "POST", "/auth/login", json={"username_or_email": name, "password": password})
+
+
+async def journey_map(session: Session, shared: Shared, rec: Recorder) -> None:
+    await rec.call(session, "spots", "GET", "/social/spots", params={"limit": 500}, headers=session.headers)
+    spot = _random_spot(session, shared)
+    if spot is None:
+        return
+    z, x, y = tile_for_point(spot["lat"], spot["lon"], 11)
+    # A phone screen shows roughly a 3x2 tile area.
+    for dx, dy in ((0, 0), (1, 0), (-1, 0), (0, 1), (1, 1), (-1, 1)):
+        await rec.call(session, "tile", "GET", f"/social/spots/tiles/{z}/{x + dx}/{y + dy}", headers=session.headers)
+    await rec.call(session, "tile_private", "GET", f"/social/spots/tiles/{z}/{x}/{y}/private", headers=session.headers)
+
+
+async def journey_favorites(session: Session, shared: Shared, rec: Recorder) -> None:
+    await rec.call(session, "list", "GET", "/social/favorites", headers=session.headers)
+    spot = _random_spot(session, shared)
+    if spot is None:
+        return
+    await rec.call(session, "add", "POST", f"/social/favorites/{spot['id']}", headers=session.headers)
+    await rec.call(session, "list_after_add", "GET", "/social/favorites", headers=session.headers)
+    await rec.call(session, "remove", "DELETE", f"/social/favorites/{spot['id']}", headers=session.headers)
+
+
+async def journey_followers(session: Session, shared: Shared, rec: Recorder) -> None:
+    await rec.call(session, "followers", "GET", f"/social/followers/{session.user_id}", headers=session.headers)
+    await rec.call(session, "following", "GET", f"/social/following/{session.user_id}", headers=session.headers)
+    await rec.call(session, "requests", "GET", "/social/follow/requests", headers=session.headers)
+    spot = _random_spot(session, shared)
+    if spot is not None and spot["owner_id"] != session.user_id:
+        await rec.call(session, "profile", "GET", f"/social/users/{spot['owner_id']}/profile", headers=session.headers)
+        await rec.call(session, "user_spots", "GET", f"/social/users/{spot['owner_id']}/spots", headers=session.headers)
+
+
+async def journey_search(session: Session, shared: Shared, rec: Recorder) -> None:
+    target = session.rng.randrange(max(1, shared.users))
+    for length in (2, 4, 6):
+        # Type-ahead: each keystroke past the prefix issues a search.
+        query = f"{shared.username_prefix}{target:07d}"[: len(shared.username_prefix) + length]
+        await rec.call(session, "search", "GET", "/social/users/search", params={"q": query}, headers=session.headers)
+
+
+async def journey_profile(session: Session, shared: Shared, rec: Recorder) -> None:
+    await rec.call(session, "me", "GET", "/social/me", headers=session.headers)
+    await rec.call(
+        session,
+        "update",
+        "PUT",
+        "/social/me",
+        json={"bio": f"Benchmark bio {session.rng.getrandbits(32)}"},
+        headers=session.headers,
+    )
+
+
+SCENARIOS: dict[str, Journey] = {
+    "auth": journey_auth,
+    "map": journey_map,
+    "favorites": journey_favorites,
+    "followers": journey_followers,
+    "search": journey_search,
+    "profile": journey_profile,
+}
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _mongo_summary(captured: list[tuple[str, int]] | None, requests: int) -> dict[str, Any] | None:
+    if captured is None:
+        return None
+    per_route: dict[str, list[int]] = {}
+    for route, commands in captured:
+        per_route.setdefault(route, []).append(commands)
+    total = sum(sum(values) for values in per_route.values())
+    return {
+        "commands": total,
+        "commands_per_request": round(total / requests, 2) if requests else 0.0,
+        "routes": {
+            route: {"requests": len(values), "commands_per_request": round(sum(values) / len(values), 2)}
+            for route, values in sorted(per_route.items())
+        },
+    }
+
+
+async def run_scenario(
+    name: str,
+    journey: Journey,
+    sessions: list[Session],
+    shared: Shared,
+    duration: float,
+    iterations: int,
+    in_process: bool,
+) -> dict[str, Any]:
+    rec = Recorder()
+    remaining = iterations
+    deadline = time.perf_counter() + duration
+
+    def next_journey() -> bool:
+        nonlocal remaining
+        if iterations:
+            if remaining <= 0:
+                return False
+            remaining -= 1
+            return True
+        return time.perf_counter() < deadline
+
+    async def worker(session: Session) -> None:
+        while next_journey():
+            started = time.perf_counter()
+            try:
+                await journey(session, shared, rec)
+            except httpx.HTTPError:
+                continue
+            rec.journeys.append(time.perf_counter() - started)
+
+    capture: Any = nullcontext(None)
+    if in_process:
+        from data.mongo_metrics import get_mongo_command_metrics
+
+        capture = get_mongo_command_metrics().capture_requests()
+
+    started = time.perf_counter()
+    with capture as captured:
+        await asyncio.gather(*(worker(session) for session in sessions))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in rec.steps.values() for sample in samples]
+    return {
+        "concurrency": len(sessions),
+        "seconds": round(elapsed, 3),
+        "journeys": len(rec.journeys),
+        "requests": rec.requests,
+        "errors": rec.errors,
+        "journeys_per_second": round(len(rec.journeys) / elapsed, 2) if elapsed else 0.0,
+        "requests_per_second": round(rec.requests / elapsed, 2) if elapsed else 0.0,
+        "latency": _percentiles(all_samples),
+        "journey_latency": _percentiles(rec.journeys),
+        "steps": {step: _percentiles(samples) for step, samples in rec.steps.items()},
+        "mongo": _mongo_summary(captured, rec.requests),
+    }
+
+
+async def _login(session: Session, shared: Shared) -> None:
+    username = f"{shared.username_prefix}{session.index % max(1, shared.users):07d}"
+    response = await session.client.post(
+        "/auth/login",
+        json={"username_or_email": username, "password": shared.password},
+    )
+    response.raise_for_status()
+    body = response.json()
+    session.token = body["access_token"]
+    session.user_id = body["user"]["id"]
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    in_process = not args.base_url
+    shared = Shared(username_prefix=args.prefix, password=args.password, users=args.users)
+
+    async with AsyncExitStack() as stack:
+        if in_process:
+            from data.storage import storage_backend
+            from main import create_app
+            from seed import SeedConfig, seed_dataset
+
+            # Every virtual user shares one client address in-process; per-IP limits would
+            # turn the run into a 429 benchmark.
+            os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+            app = create_app()
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            if args.users:
+                seed_dataset(
+                    SeedConfig(users=args.users, prefix=args.prefix, password=args.password, seed=args.seed),
+                    log=lambda line: print(line) if args.verbose else None,
+                )
+            transport: httpx.AsyncBaseTransport = httpx.ASGITransport(app=app)
+            base_url = "http://benchmark"
+            backend = storage_backend()
+        else:
+            transport = httpx.AsyncHTTPTransport(retries=0)
+            base_url = args.base_url.rstrip("/")
+            backend = "remote"
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits)
+        )
+
+        sessions = [Session(client=client, index=i, rng=random.Random(args.seed + i)) for i in range(args.concurrency)]
+        await asyncio.gather(*(_login(session, shared) for session in sessions))
+        response = await client.get("/social/spots", params={"limit": 500}, headers=sessions[0].headers)
+        response.raise_for_status()
+        shared.spots = response.json()
+
+        results: dict[str, Any] = {}
+        for name in args.scenarios:
+            print(f"[BENCH] {name}: {args.concurrency} users, " + (f"{args.iterations} journeys" if args.iterations else f"{args.duration}s"))
+            if args.warmup:
+                await run_scenario(name, SCENARIOS[name], sessions, shared, args.warmup, 0, in_process=False)
+            results[name] = await run_scenario(
+                name,
+                SCENARIOS[name],
+                sessions,
+                shared,
+                args.duration,
+                args.iterations,
+                in_process,
+            )
+
+    return {
+        "meta": {
+            "at": datetime.now(UTC).isoformat(),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "target": args.base_url or "in-process",
+            "storage": backend,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "iterations": args.iterations,
+            "users": args.users,
+        },
+        "scenarios": results,
+    }
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    lines = [f"{'scenario':<12} {'req/s':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'cmds/req':>10}"]
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        mongo, base_mongo = result.get("mongo") or {}, base.get("mongo") or {}
+        lines.append(
+            f"{name:<12} "
+            f"{_delta(result['requests_per_second'], base['requests_per_second']):>10} "
+            f"{_delta(result['latency'].get('p50_ms', 0), base['latency'].get('p50_ms', 0)):>10} "
+            f"{_delta(result['latency'].get('p95_ms', 0), base['latency'].get('p95_ms', 0)):>10} "
+            f"{_delta(result['latency'].get('p99_ms', 0), base['latency'].get('p99_ms', 0)):>10} "
+            f"{_delta(mongo.get('commands_per_request', 0), base_mongo.get('commands_per_request', 0)):>10}"
+        )
+    return lines
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run scripted API journeys and record latency/throughput.")
+    parser.add_argument("--base-url", default="", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=8, help="virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--iterations", type=int, default=0, help="journeys per scenario (overrides --duration)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--users", type=int, default=1000, help="seeded users (in-process seeds them; remote must match)")
+    parser.add_argument("--prefix", default="bench", help="username prefix of the seeded users")
+    parser.add_argument("--password", default="Seed1234!")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", default="", help="results file (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--compare", default="", help="earlier results file to print deltas against")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    args.concurrency = max(1, args.concurrency)
+    return args
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    output = Path(args.output or BACKEND_ROOT / "benchmarks" / "results" / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
+
+    for name, result in results["scenarios"].items():
+        latency = result["latency"]
+        mongo = result.get("mongo") or {}
+        print(
+            f"[BENCH] {name:<10} {result['requests_per_second']:>8.1f} req/s  "
+            f"p50 {latency.get('p50_ms', 0):>7.1f}ms  p95 {latency.get('p95_ms', 0):>7.1f}ms  "
+            f"p99 {latency.get('p99_ms', 0):>7.1f}ms  errors {sum(result['errors'].values())}"
+            + (f"  mongo {mongo['commands_per_request']}/req" if mongo else "")
+        )
+    print(f"[BENCH] Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print("\n".join(compare(results, baseline)))
+    return results
+
+
+if __name__ == "__main__":
+    main()
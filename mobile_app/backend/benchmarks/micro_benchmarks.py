@@ -0,0 +1,224 @@
+"""Timings for the per-row conversion helpers that every list response goes through.
+
+    python benchmarks/micro_benchmarks.py                    # compare against the stored baseline
+    python benchmarks/micro_benchmarks.py --update-baseline  # record new numbers
+    python benchmarks/micro_benchmarks.py --filter spot
+
+Each case is timed with timeit. The best of `--repeat` runs is compared with
+`benchmarks/baselines/micro.json`, and the exit status is 1 if a case is slower than
+its baseline by more than `--threshold`. Baselines depend on the machine; record them
+on the machine that runs the comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import statistics
+import sys
+import timeit
+from typing import Any, Callable
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from bson import ObjectId, json_util  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from data.dto import AuthUserRecord, SpotPublic, SpotUpsertRequest, UserPublic  # noqa: E402
+from routing.social_routes import (  # noqa: E402
+    _build_spot_doc,
+    _normalize_id_list,
+    _normalize_social_accounts,
+    _to_spot_public,
+    _to_user_public,
+)
+
+
+BASELINE_PATH = BACKEND_ROOT / "benchmarks" / "baselines" / "micro.json"
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    func: Callable[[], Any]
+    # Calls per timing sample; sized so one sample takes a few milliseconds.
+    number: int
+
+
+def _base64_image(rng: random.Random, size: int) -> str:
+    return "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(size)).decode("ascii")
+
+
+def _spot_doc(rng: random.Random, images: int, image_bytes: int, invites: int) -> dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "owner_id": str(ObjectId()),
+        "title": "  Lake viewpoint at sunrise  ",
+        "description": "Quiet spot on the eastern shore. " * 8,
+        "tags": ["nature", "sunrise", "lake", "", "  photography "],
+        "lat": 47.3769 + rng.random() / 10,
+        "lon": 8.5417 + rng.random() / 10,
+        "images": [_base64_image(rng, image_bytes) for _ in range(images)],
+        "visibility": "invite_only" if invites else "public",
+        "invite_user_ids": [str(ObjectId()) for _ in range(invites)] + ["not-an-id", ""],
+        "created_at": datetime.now(UTC),
+    }
+
+
+def _user_doc(rng: random.Random, avatar_bytes: int) -> dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "username": "maxmustermann",
+        "email": "max@example.com",
+        "password_hash": "$2b$12$" + "x" * 53,
+        "display_name": "Max Mustermann",
+        "bio": "Hiker and photographer. " * 10,
+        "avatar_image": _base64_image(rng, avatar_bytes) if avatar_bytes else "",
+        "social_accounts": {"instagram": "@max", "github": "max", "mastodon": "@max@social", "": "skip", "web": " "},
+        "follow_requires_approval": False,
+        "created_at": datetime.now(UTC),
+    }
+
+
+def build_cases() -> list[Case]:
+    rng = random.Random(1234)
+    spot_small = _spot_doc(rng, images=0, image_bytes=0, invites=0)
+    spot_invites = _spot_doc(rng, images=1, image_bytes=2_000, invites=25)
+    spot_large = _spot_doc(rng, images=3, image_bytes=200_000, invites=0)
+    user_plain = _user_doc(rng, avatar_bytes=0)
+    user_avatar = _user_doc(rng, avatar_bytes=150_000)
+    spot_page = [_spot_doc(rng, images=rng.randint(0, 2), image_bytes=4_000, invites=0) for _ in range(100)]
+    user_page = [_user_doc(rng, avatar_bytes=8_000) for _ in range(100)]
+    spot_list_adapter = TypeAdapter(list[SpotPublic])
+    user_list_adapter = TypeAdapter(list[UserPublic])
+    spot_models = [_to_spot_public(doc) for doc in spot_page]
+    user_models = [_to_user_public(doc) for doc in user_page]
+    upsert = SpotUpsertRequest(
+        title="Lake viewpoint",
+        description="Quiet sunrise spot",
+        tags=["nature", "sunrise", " "],
+        lat=47.3769,
+        lon=8.5417,
+        images=[_base64_image(rng, 50_000)],
+        visibility="invite_only",
+        invite_user_ids=[str(ObjectId()) for _ in range(10)],
+    )
+    record_fields = {key: value for key, value in user_avatar.items() if key != "_id"}
+    record_fields["username"] = "  MaxMustermann "
+    record_fields["email"] = " Max@Example.com "
+    invite_ids = spot_invites["invite_user_ids"]
+    accounts = user_plain["social_accounts"]
+
+    return [
+        Case("to_spot_public.small", lambda: _to_spot_public(spot_small), 2000),
+        Case("to_spot_public.invites", lambda: _to_spot_public(spot_invites), 1000),
+        Case("to_spot_public.large_images", lambda: _to_spot_public(spot_large), 1000),
+        Case("to_spot_public.page_100", lambda: [_to_spot_public(doc) for doc in spot_page], 20),
+        Case("to_user_public.plain", lambda: _to_user_public(user_plain), 2000),
+        Case("to_user_public.avatar", lambda: _to_user_public(user_avatar), 1000),
+        Case("to_user_public.page_100", lambda: [_to_user_public(doc) for doc in user_page], 20),
+        Case("normalize_id_list.27", lambda: _normalize_id_list(invite_ids), 2000),
+        Case("normalize_social_accounts", lambda: _normalize_social_accounts(accounts), 5000),
+        Case("build_spot_doc", lambda: _build_spot_doc(upsert, owner_id="owner"), 2000),
+        Case("auth_user_record.validate", lambda: AuthUserRecord.model_validate(record_fields), 1000),
+        Case("response.spots_json_100", lambda: spot_list_adapter.dump_json(spot_models), 20),
+        Case("response.users_json_100", lambda: user_list_adapter.dump_json(user_models), 20),
+        Case("json_util.roundtrip_spot_large", lambda: json.loads(json_util.dumps(spot_large)), 50),
+        Case("json_util.roundtrip_page_100", lambda: json.loads(json_util.dumps(spot_page)), 5),
+    ]
+
+
+def run_cases(cases: list[Case], repeat: int = 5, scale: float = 1.0) -> dict[str, dict[str, float]]:
+    """Microseconds per call: best and median over `repeat` samples."""
+    results: dict[str, dict[str, float]] = {}
+    for case in cases:
+        number = max(1, int(case.number * scale))
+        case.func()  # warm caches and lazy imports outside the timed samples
+        samples = [seconds / number * 1_000_000 for seconds in timeit.repeat(case.func, number=number, repeat=repeat)]
+        results[case.name] = {
+            "best_us": round(min(samples), 3),
+            "median_us": round(statistics.median(samples), 3),
+            "calls": number,
+        }
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, Any],
+    threshold: float,
+) -> list[tuple[str, float, float]]:
+    """Cases whose best time exceeds the baseline by more than `threshold` (0.25 = 25%)."""
+    regressions = []
+    for name, result in results.items():
+        expected = (baseline.get("cases") or {}).get(name, {}).get("best_us")
+        if expected and result["best_us"] > expected * (1 + threshold):
+            regressions.append((name, expected, result["best_us"]))
+    return regressions
+
+
+def _load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for per-row serialization helpers.")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply calls per sample (use <1 for quick runs)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default="", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in build_cases() if args.filter in case.name]
+    results = run_cases(cases, repeat=max(1, args.repeat), scale=args.scale)
+    baseline_path = Path(args.baseline)
+    baseline = _load_baseline(baseline_path)
+
+    print(f"{'case':<34} {'best us':>12} {'median us':>12} {'baseline':>12} {'change':>8}")
+    for name, result in results.items():
+        expected = (baseline.get("cases") or {}).get(name, {}).get("best_us")
+        change = f"{(result['best_us'] - expected) / expected * 100:+.1f}%" if expected else "-"
+        print(f"{name:<34} {result['best_us']:>12.2f} {result['median_us']:>12.2f} {expected or 0:>12.2f} {change:>8}")
+
+    document = {
+        "meta": {
+            "at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        merged = {**(baseline.get("cases") or {}), **results}
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({**document, "cases": merged}, indent=2) + "\n", encoding="utf-8")
+        print(f"[BENCH] Baseline written to {baseline_path}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for name, expected, actual in regressions:
+        print(f"[BENCH] Regression in {name}: {actual:.2f}us vs baseline {expected:.2f}us (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Cold-start timings: module import (with a `-X importtime` breakdown), app build, warm-up.
+
+    python benchmarks/startup_benchmark.py --runs 5
+
+Every run starts a fresh interpreter, so each one measures a real cold start. A run
+imports `main`, builds the app, enters its lifespan, waits until `/health/ready` would
+report ready, and then serves one request. Pick the storage with STORAGE_BACKEND and
+MONGO_URL, as for the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _child() -> None:
+    """Runs in the fresh interpreter; prints one JSON line with phase timings."""
+    sys.path.insert(0, str(BACKEND_ROOT))
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    import main
+
+    timings["import_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    app = main.create_app()
+    timings["create_app_s"] = time.perf_counter() - started
+
+    async def serve() -> None:
+        import httpx
+
+        from routing.health_routes import get_readiness
+
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["lifespan_start_s"] = time.perf_counter() - started
+            await asyncio.to_thread(get_readiness().ready.wait, 120)
+            timings["ready_s"] = time.perf_counter() - started
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+                first = time.perf_counter()
+                response = await client.get("/health/ready")
+                timings["first_request_s"] = time.perf_counter() - first
+                timings["ready_status"] = response.status_code
+
+    asyncio.run(serve())
+    print(json.dumps(timings))
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    """Rows of `-X importtime` output as {module, self_us, cumulative_us, depth}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": depth,
+            }
+        )
+    return rows
+
+
+def run_once(python: str, env: dict[str, str]) -> dict[str, Any]:
+    process = subprocess.run(
+        [python, "-X", "importtime", str(Path(__file__).resolve()), "--child"],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"startup run failed:\n{process.stderr[-4000:]}")
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(process.stderr)
+    return {"timings": timings, "imports": imports}
+
+
+def summarize(runs: list[dict[str, Any]], top: int) -> dict[str, Any]:
+    phases = [key for key in runs[0]["timings"] if key.endswith("_s")]
+    timings = {
+        phase: {
+            "median_ms": round(statistics.median(run["timings"][phase] for run in runs) * 1000, 2),
+            "min_ms": round(min(run["timings"][phase] for run in runs) * 1000, 2),
+        }
+        for phase in phases
+    }
+
+    # The module breakdown comes from the fastest run, where noise is lowest.
+    fastest = min(runs, key=lambda run: run["timings"]["import_s"])
+    imports = fastest["imports"]
+    by_self = sorted(imports, key=lambda row: row["self_us"], reverse=True)[:top]
+    first_party = ("main", "data", "routing")
+    packages: dict[str, int] = {}
+    for row in imports:
+        if row["depth"] == 0 or row["module"].split(".")[0] in first_party and row["depth"] <= 1:
+            root = row["module"].split(".")[0]
+            packages[root] = max(packages.get(root, 0), row["cumulative_us"])
+    return {
+        "timings": timings,
+        "imported_modules": len(imports),
+        "top_self_ms": [{"module": row["module"], "ms": round(row["self_us"] / 1000, 2)} for row in by_self],
+        "top_level_ms": {
+            name: round(us / 1000, 2) for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure cold-start import and warm-up time.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="modules to list in the import breakdown")
+    parser.add_argument("--output", default="", help="results file (default: benchmarks/results/startup-<time>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child()
+        return {}
+
+    env = dict(os.environ)
+    runs = [run_once(sys.executable, env) for _ in range(max(1, args.runs))]
+    summary = summarize(runs, args.top)
+    document = {
+        "meta": {
+            "at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "storage": env.get("STORAGE_BACKEND") or "mongo",
+            "runs": len(runs),
+        },
+        **summary,
+    }
+
+    for phase, values in summary["timings"].items():
+        print(f"[BENCH] {phase[:-2]:<16} median {values['median_ms']:>9.2f}ms  min {values['min_ms']:>9.2f}ms")
+    print(f"[BENCH] {summary['imported_modules']} modules imported; slowest by self time:")
+    for row in summary["top_self_ms"]:
+        print(f"          {row['ms']:>9.2f}ms  {row['module']}")
+
+    output = Path(args.output or BACKEND_ROOT / "benchmarks" / "results" / f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"[BENCH] Results written to {output}")
+    return document
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, fallback: int) -> int:
+    """Integer environment setting; `fallback` when unset, blank or not a number."""
+    try:
+        return int(str(os.getenv(name) or "").strip() or fallback)
+    except ValueError:
+        return fallback
+
+
+def env_float(name: str, fallback: float) -> float:
+    """Float environment setting; `fallback` when unset, blank or not a number."""
+    try:
+        return float(str(os.getenv(name) or "").strip() or fallback)
+    except ValueError:
+        return fallback
+
+
+def auth_db_name() -> str:
+    """`MONGO_AUTH_DB`: database for users, social data and the server's own bookkeeping."""
+    return str(os.getenv("MONGO_AUTH_DB") or "SpotOnSightAuth").strip() or "SpotOnSightAuth"
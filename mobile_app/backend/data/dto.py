@@ -6,7 +6,9 @@ from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+from data.indexes import index
 from routing.registry import mongo_entity_encrypted
+from routing.spot_tiles import invalidate_spot_tiles
 
 
 def _normalize_email(value: str) -> str:
@@ -17,10 +19,23 @@ def _normalize_username(value: str) -> str:
     return str(value or "").strip().lower()
 
 
+# Shared by the /spots CRUD router and the social spot repository, which use the same collection.
+SPOT_INDEXES = [
+    index("owner_id"),
+    index("visibility"),
+    index("invite_user_ids"),
+    index("lon", "lat"),
+    index("created_at"),
+    index("updated_at"),
+]
+
+
 @mongo_entity_encrypted(
     collection="spots",
     tags=["Spots"],
     prefix="/spots",
+    indexes=SPOT_INDEXES,
+    on_change=invalidate_spot_tiles,
 )
 class Spot(BaseModel):
     title: str = Field(min_length=1, max_length=80)
@@ -41,7 +56,12 @@ class Spot(BaseModel):
         return v or datetime.now(UTC)
 
 
-@mongo_entity_encrypted(collection="client_error_reports", tags=["ClientErrors"], prefix="/client-errors")
+@mongo_entity_encrypted(
+    collection="client_error_reports",
+    tags=["ClientErrors"],
+    prefix="/client-errors",
+    indexes=[index("kind", "created_at")],
+)
 class ClientErrorReport(BaseModel):
     kind: str = Field(default="exception", max_length=40)
     source: str = Field(default="app", max_length=80)
@@ -59,6 +79,22 @@ class ClientErrorReport(BaseModel):
         return v or datetime.now(UTC)
 
 
+class ClientErrorBatchRequest(BaseModel):
+    reports: List[ClientErrorReport] = Field(min_length=1, max_length=100)
+
+
+class ClientErrorFingerprintRecord(BaseModel):
+    kind: str
+    source: str
+    exception_type: Optional[str] = None
+    message: str = ""
+    count: int = 0
+    samples: List[Dict[str, Any]] = Field(default_factory=list)
+    first_seen: datetime
+    last_seen: datetime
+    updated_at: Optional[datetime] = None
+
+
 class RegisterRequest(BaseModel):
     username: str = Field(min_length=3, max_length=40)
     email: str = Field(min_length=5, max_length=200)
@@ -141,6 +177,36 @@ class SupportTicketPublic(BaseModel):
     created_at: datetime
 
 
+class SupportTicketPage(BaseModel):
+    items: List[SupportTicketPublic] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class SupportTicketCounts(BaseModel):
+    open: int = 0
+    closed: int = 0
+    total: int = 0
+
+
+class AdminMetricPoint(BaseModel):
+    day: str
+    count: int = 0
+
+
+class AdminMetricsResponse(BaseModel):
+    refreshed_at: Optional[datetime] = None
+    totals: Dict[str, int] = Field(default_factory=dict)
+    series: Dict[str, List[AdminMetricPoint]] = Field(default_factory=dict)
+
+
+class AdminMetricRecord(BaseModel):
+    kind: Literal["daily", "totals"] = "daily"
+    metric: Optional[str] = None
+    day: Optional[str] = None
+    count: int = 0
+    updated_at: datetime
+
+
 class FollowRequestPublic(BaseModel):
     follower: UserPublic
     created_at: datetime
@@ -150,6 +216,35 @@ class AuthTokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserPublic
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(min_length=20, max_length=200)
+
+
+class RefreshTokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    refresh_token: str
+    expires_in: int
+
+
+class StreamTokenResponse(BaseModel):
+    stream_token: str
+    expires_in: int
+
+
+class AuthSessionRecord(BaseModel):
+    user_id: str
+    username: str
+    token_hash: str
+    family_id: str
+    created_at: datetime
+    expires_at: datetime
+    rotated_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
 
 
 class LoginRequest(BaseModel):
@@ -214,6 +309,8 @@ class AuthUserRecord(BaseModel):
 class FavoriteRef(BaseModel):
     spot_id: str
     created_at: datetime
+    # Only with `expand=spot`.
+    spot: Optional[SpotPublic] = None
 
 
 class FollowRef(BaseModel):
@@ -229,3 +326,57 @@ class FollowRequestRef(BaseModel):
 class BlockRef(BaseModel):
     user_id: str
     created_at: datetime
+
+
+class JobRecord(BaseModel):
+    kind: str = Field(min_length=1, max_length=80)
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: Literal["pending", "running", "done", "failed"] = "pending"
+    attempts: int = 0
+    idempotency_key: Optional[str] = Field(default=None, max_length=200)
+    created_at: datetime
+
+
+class MigrationRecord(BaseModel):
+    name: str = Field(min_length=1, max_length=120)
+    status: Literal["running", "done", "failed"] = "running"
+    counts: Dict[str, int] = Field(default_factory=dict)
+    error: Optional[str] = Field(default=None, max_length=2000)
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class CacheInvalidationRecord(BaseModel):
+    channel: str = Field(min_length=1, max_length=40)
+    keys: List[str] = Field(default_factory=list)
+    origin: str
+    created_at: datetime
+
+
+class RateLimitBucketRecord(BaseModel):
+    tokens: float
+    updated_at: float
+    expires_at: datetime
+
+
+class TombstoneRecord(BaseModel):
+    kind: Literal["spot", "favorite", "follow", "block"]
+    entity_id: str
+    user_ids: List[str] = Field(default_factory=list)
+    data: Dict[str, Any] = Field(default_factory=dict)
+    deleted_at: datetime
+
+
+class SyncChange(BaseModel):
+    kind: Literal["spot", "favorite", "follow", "block"]
+    op: Literal["upsert", "delete"]
+    id: str
+    updated_at: Optional[datetime] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+class SyncPage(BaseModel):
+    changes: List[SyncChange] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+    sync_token: str
+    full_resync: bool = False
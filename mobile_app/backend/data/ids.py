@@ -0,0 +1,91 @@
+"""How user and spot references are stored, and how to query them during the move to ObjectId.
+
+`ID_STORAGE_MODE`:
+
+* `string`: the old layout. References are written as hex strings.
+* `compat` (default): references are written as ObjectIds and queries match either
+  form, so rows written before the move keep working. Run `python migrate.py` to
+  convert them.
+* `objectid`: once the migration has run. Queries are single equalities on ObjectIds.
+
+Values that are not valid ObjectId hex stay strings in every mode.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Iterable
+
+from bson import ObjectId
+
+
+ID_STORAGE_MODES = ("string", "compat", "objectid")
+
+
+def id_storage_mode() -> str:
+    value = str(os.getenv("ID_STORAGE_MODE") or "compat").strip().lower() or "compat"
+    if value not in ID_STORAGE_MODES:
+        raise ValueError(f"ID_STORAGE_MODE must be one of {', '.join(ID_STORAGE_MODES)}, got {value!r}")
+    return value
+
+
+def _text(value: Any) -> str:
+    return str(value or "").strip()
+
+
+def _forms(value: Any) -> list[Any]:
+    """The stored forms a reference may have in the current mode."""
+    text = _text(value)
+    if not ObjectId.is_valid(text):
+        return [text]
+    mode = id_storage_mode()
+    if mode == "string":
+        return [text]
+    if mode == "objectid":
+        return [ObjectId(text)]
+    return [ObjectId(text), text]
+
+
+def stored_ref(value: Any) -> Any:
+    """Form to write a user or spot reference in."""
+    return _forms(value)[0]
+
+
+def stored_refs(values: Iterable[Any]) -> list[Any]:
+    return [stored_ref(value) for value in values]
+
+
+def ref_filter(value: Any) -> Any:
+    """Query value matching a reference field equal to `value`."""
+    forms = _forms(value)
+    return forms[0] if len(forms) == 1 else {"$in": forms}
+
+
+def refs_filter(values: Iterable[Any]) -> dict[str, Any]:
+    """Query value matching a reference field equal to any of `values`."""
+    return {"$in": [form for value in values for form in _forms(value)]}
+
+
+def doc_id_filter(value: Any) -> Any:
+    """Query value for a spot `_id`. Legacy spots may have string ids until the
+    migration rewrote them, so only `objectid` mode trusts a single form."""
+    text = _text(value)
+    if not ObjectId.is_valid(text):
+        return text
+    if id_storage_mode() == "objectid":
+        return ObjectId(text)
+    return {"$in": [ObjectId(text), text]}
+
+
+def doc_ids_filter(values: Iterable[Any]) -> dict[str, Any]:
+    out: list[Any] = []
+    for value in values:
+        condition = doc_id_filter(value)
+        out.extend(condition["$in"] if isinstance(condition, dict) else [condition])
+    return {"$in": out}
+
+
+def pair_key(user_a: Any, user_b: Any) -> str:
+    """Order-independent key of two users, stored on blocks, follows and follow requests
+    so "any edge between a and b" is one indexed equality."""
+    return ":".join(sorted((_text(user_a), _text(user_b))))
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from threading import Event, Lock, Thread
+from typing import Any
+
+from pymongo import ASCENDING, IndexModel
+
+
+IndexKey = tuple[str, Any]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Declared index on a collection.
+
+    Key directions follow pymongo: 1 / -1, "2dsphere", "text" or "hashed".
+    """
+
+    keys: tuple[IndexKey, ...]
+    unique: bool = False
+    sparse: bool = False
+    ttl_seconds: int | None = None
+    name: str | None = None
+    partial_filter: dict[str, Any] | None = field(default=None, hash=False, compare=False)
+
+    @property
+    def index_name(self) -> str:
+        return self.name or "_".join(f"{key}_{direction}" for key, direction in self.keys)
+
+    def to_model(self) -> IndexModel:
+        options: dict[str, Any] = {"name": self.index_name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.ttl_seconds is not None:
+            options["expireAfterSeconds"] = int(self.ttl_seconds)
+        if self.partial_filter:
+            options["partialFilterExpression"] = self.partial_filter
+        return IndexModel(list(self.keys), **options)
+
+    def option_drift(self, info: dict[str, Any]) -> list[str]:
+        """Option differences between this spec and an existing index description."""
+        drift: list[str] = []
+        if bool(info.get("unique", False)) != self.unique:
+            drift.append("unique")
+        if bool(info.get("sparse", False)) != self.sparse:
+            drift.append("sparse")
+        existing_ttl = info.get("expireAfterSeconds")
+        if (None if existing_ttl is None else int(existing_ttl)) != self.ttl_seconds:
+            drift.append("ttl_seconds")
+        return drift
+
+
+def index(*keys: str | IndexKey, unique: bool = False, sparse: bool = False,
+          ttl_seconds: int | None = None, name: str | None = None,
+          partial_filter: dict[str, Any] | None = None) -> IndexSpec:
+    """Shorthand for IndexSpec: plain field names are ascending keys."""
+    normalized = tuple((key, ASCENDING) if isinstance(key, str) else (str(key[0]), key[1]) for key in keys)
+    if not normalized:
+        raise ValueError("index() requires at least one key")
+    return IndexSpec(
+        keys=normalized,
+        unique=unique,
+        sparse=sparse,
+        ttl_seconds=ttl_seconds,
+        name=name,
+        partial_filter=partial_filter,
+    )
+
+
+def _normalize_key(keys: Any) -> tuple[IndexKey, ...]:
+    out: list[IndexKey] = []
+    text_keys: list[IndexKey] = []
+    for key, direction in keys:
+        if direction == "text":
+            text_keys.append((str(key), "text"))
+            continue
+        out.append((str(key), int(direction) if isinstance(direction, (int, float)) else str(direction)))
+    return tuple(out + sorted(text_keys))
+
+
+def _existing_key(info: dict[str, Any]) -> tuple[IndexKey, ...]:
+    """Key of an existing index; text indexes are stored as _fts/_ftsx plus weights."""
+    keys = list(info.get("key", []))
+    if any(key == "_fts" for key, _ in keys):
+        keys = [(key, direction) for key, direction in keys if key not in {"_fts", "_ftsx"}]
+        keys += [(name, "text") for name in info.get("weights", {})]
+    return _normalize_key(keys)
+
+
+class IndexManager:
+    """Collects declared indexes per collection and reconciles them with the database.
+
+    Missing indexes are created; indexes whose options differ from the declaration and
+    undeclared indexes are only reported, since dropping them is an operator decision.
+    """
+
+    def __init__(self) -> None:
+        self._declared: dict[tuple[str, str], tuple[Any, dict[tuple[IndexKey, ...], IndexSpec]]] = {}
+        self._lock = Lock()
+        self._thread: Thread | None = None
+        self.ready = Event()
+        self.last_report: dict[str, Any] = {}
+
+    def register(self, repository: Any, specs: list[IndexSpec] | tuple[IndexSpec, ...]) -> None:
+        if not specs:
+            return
+        key = (repository.db_name, repository.collection_name)
+        with self._lock:
+            _, declared = self._declared.setdefault(key, (repository, {}))
+            for spec in specs:
+                declared[_normalize_key(spec.keys)] = spec
+
+    def declared(self) -> dict[str, list[IndexSpec]]:
+        with self._lock:
+            return {f"{db}.{name}": list(specs.values()) for (db, name), (_, specs) in self._declared.items()}
+
+    def _reconcile_collection(self, repository: Any, specs: dict[tuple[IndexKey, ...], IndexSpec], create: bool) -> dict[str, Any]:
+        collection = repository.collection
+        existing = {
+            _existing_key(info): (name, info)
+            for name, info in collection.index_information().items()
+        }
+
+        missing = [spec for key, spec in specs.items() if key not in existing]
+        mismatched = []
+        for key, spec in specs.items():
+            if key in existing:
+                name, info = existing[key]
+                drift = spec.option_drift(info)
+                if drift:
+                    mismatched.append({"index": name, "options": drift})
+        extra = [name for key, (name, _) in existing.items() if key not in specs and name != "_id_"]
+
+        created: list[str] = []
+        if create and missing:
+            created = list(collection.create_indexes([spec.to_model() for spec in missing]))
+
+        return {
+            "missing": [spec.index_name for spec in missing if spec.index_name not in created],
+            "created": created,
+            "mismatched": mismatched,
+            "extra": extra,
+        }
+
+    def reconcile(self, create: bool = True, unique_only: bool = False) -> dict[str, Any]:
+        """Compare declared indexes with the database and create missing ones.
+
+        `unique_only` checks just the unique indexes; startup builds those before serving,
+        since writes rely on them to reject duplicates. It does not touch `last_report`.
+        """
+        with self._lock:
+            targets = list(self._declared.items())
+
+        collections: dict[str, Any] = {}
+        for (db_name, collection_name), (repository, specs) in targets:
+            if unique_only:
+                specs = {key: spec for key, spec in specs.items() if spec.unique}
+                if not specs:
+                    continue
+            label = f"{db_name}.{collection_name}"
+            try:
+                collections[label] = self._reconcile_collection(repository, specs, create)
+            except Exception as e:
+                collections[label] = {"error": f"{e.__class__.__name__}: {e}"}
+
+        report = {
+            "checked_at": datetime.now(UTC).isoformat(),
+            "collections": collections,
+            "drift": any(
+                entry.get("error") or entry.get("missing") or entry.get("mismatched") or entry.get("extra")
+                for entry in collections.values()
+            ),
+        }
+        if not unique_only:
+            self.last_report = report
+        return report
+
+    def _run(self) -> None:
+        from data.mongo_metrics import command_scope
+
+        try:
+            with command_scope("task:index_reconcile"):
+                report = self.reconcile(create=True)
+            for label, entry in report["collections"].items():
+                if entry.get("created"):
+                    print(f"[INDEXES] {label}: created {', '.join(entry['created'])}")
+                if entry.get("error") or entry.get("mismatched") or entry.get("extra"):
+                    print(f"[INDEXES] {label}: drift {entry}")
+        finally:
+            self.ready.set()
+
+    def start(self) -> None:
+        """Reconcile all declared indexes on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.ready.clear()
+        self._thread = Thread(target=self._run, name="index-manager", daemon=True)
+        self._thread.start()
+
+
+_INDEX_MANAGER = IndexManager()
+
+
+def get_index_manager() -> IndexManager:
+    return _INDEX_MANAGER
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import os
+from threading import Event, Lock, Thread
+from typing import Any, Callable
+import uuid
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from data.config import auth_db_name
+from data.dto import JobRecord
+from data.indexes import index
+from data.mongo_metrics import command_scope
+from data.mongo_repository import MongoRepository
+
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# A handler receives the payloads of one claimed batch. If it raises, the batch is re-run
+# one job at a time and only the jobs that raise again are retried later, so handlers
+# must be idempotent.
+JobHandler = Callable[[list[dict[str, Any]]], None]
+
+
+@dataclass(frozen=True)
+class _HandlerSpec:
+    handler: JobHandler
+    batch_size: int
+    max_attempts: int
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """Exponential backoff between attempts, capped at five minutes."""
+    return min(300, 2 ** max(0, int(attempts)))
+
+
+class JobQueue:
+    """Durable job queue stored in a Mongo collection and run by in-process worker threads."""
+
+    def __init__(
+        self,
+        repository: MongoRepository,
+        *,
+        poll_interval: float = 0.5,
+        lease_seconds: int = 60,
+        retention_seconds: int = 86400,
+    ) -> None:
+        self.repository = repository
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._handlers: dict[str, _HandlerSpec] = {}
+        self._threads: list[Thread] = []
+        self._stop = Event()
+        self._lock = Lock()
+        self.repository.declare_indexes(
+            [
+                index("status", "kind", "run_after"),
+                index("status", "locked_until"),
+                index("idempotency_key", unique=True, sparse=True),
+                index("completed_at", ttl_seconds=self.retention_seconds),
+            ]
+        )
+
+    def register(self, kind: str, handler: JobHandler, *, batch_size: int = 1, max_attempts: int = 5) -> None:
+        self._handlers[kind] = _HandlerSpec(
+            handler=handler,
+            batch_size=max(1, int(batch_size)),
+            max_attempts=max(1, int(max_attempts)),
+        )
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        idempotency_key: str | None = None,
+        delay_seconds: int = 0,
+    ) -> str:
+        """Persist a job and return its id. Re-enqueueing an idempotency key returns the existing job."""
+        now = datetime.now(UTC)
+        doc: dict[str, Any] = {
+            "kind": kind,
+            "payload": payload,
+            "status": JOB_PENDING,
+            "attempts": 0,
+            "run_after": now + timedelta(seconds=max(0, delay_seconds)),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if idempotency_key:
+            doc["idempotency_key"] = idempotency_key
+
+        try:
+            return self.repository.insert_one(doc)
+        except DuplicateKeyError:
+            existing = self.repository.find_one({"idempotency_key": idempotency_key}, {"_id": 1})
+            return str(existing["_id"]) if existing else ""
+
+    def _claim(self, kinds: list[str], worker_id: str) -> dict[str, Any] | None:
+        now = datetime.now(UTC)
+        return self.repository.find_one_and_update(
+            {
+                "kind": {"$in": kinds},
+                "$or": [
+                    {"status": JOB_PENDING, "run_after": {"$lte": now}},
+                    {"status": JOB_RUNNING, "locked_until": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "worker": worker_id,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_after", ASCENDING)],
+        )
+
+    def run_once(self, worker_id: str = "inline") -> int:
+        """Claim and process one batch. Returns the number of jobs handled."""
+        if not self._handlers:
+            return 0
+
+        first = self._claim(list(self._handlers), worker_id)
+        if not first:
+            return 0
+
+        kind = str(first.get("kind"))
+        spec = self._handlers[kind]
+        batch = [first]
+        while len(batch) < spec.batch_size:
+            job = self._claim([kind], worker_id)
+            if not job:
+                break
+            batch.append(job)
+
+        with command_scope(f"job:{kind}"):
+            try:
+                spec.handler([job.get("payload") or {} for job in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch, spec, e)
+                else:
+                    print(f"[JOBS] Batch of {len(batch)} '{kind}' job(s) failed, retrying one at a time: {e}")
+                    self._run_singly(batch, spec)
+            else:
+                self._complete(batch)
+        return len(batch)
+
+    def _run_singly(self, batch: list[dict[str, Any]], spec: _HandlerSpec) -> None:
+        """Re-run a failed batch job by job, so one bad payload does not cost the others an attempt."""
+        for job in batch:
+            try:
+                spec.handler([job.get("payload") or {}])
+            except Exception as e:
+                self._fail([job], spec, e)
+            else:
+                self._complete([job])
+
+    def _complete(self, batch: list[dict[str, Any]]) -> None:
+        now = datetime.now(UTC)
+        self.repository.update_many_fields(
+            {"_id": {"$in": [job["_id"] for job in batch]}},
+            {"status": JOB_DONE, "completed_at": now, "updated_at": now},
+        )
+
+    def _fail(self, batch: list[dict[str, Any]], spec: _HandlerSpec, error: Exception) -> None:
+        now = datetime.now(UTC)
+        message = f"{error.__class__.__name__}: {error}"[:2000]
+        for job in batch:
+            attempts = int(job.get("attempts") or 1)
+            if attempts >= spec.max_attempts:
+                fields = {"status": JOB_FAILED, "last_error": message, "updated_at": now}
+            else:
+                fields = {
+                    "status": JOB_PENDING,
+                    "run_after": now + timedelta(seconds=retry_delay_seconds(attempts)),
+                    "last_error": message,
+                    "updated_at": now,
+                }
+            self.repository.update_fields({"_id": job["_id"]}, fields)
+        print(f"[JOBS] Batch of {len(batch)} '{batch[0].get('kind')}' job(s) failed: {message}")
+
+    def drain(self, max_batches: int = 1000) -> int:
+        """Process ready jobs on the calling thread until none are left."""
+        handled = 0
+        for _ in range(max_batches):
+            count = self.run_once()
+            if not count:
+                break
+            handled += count
+        return handled
+
+    def _worker_loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                handled = self.run_once(worker_id)
+            except Exception as e:
+                print(f"[JOBS] Worker {worker_id} error: {e}")
+                handled = 0
+            if not handled:
+                self._stop.wait(self.poll_interval)
+
+    def start(self, workers: int = 2) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            prefix = uuid.uuid4().hex[:8]
+            for worker_number in range(max(0, int(workers))):
+                thread = Thread(
+                    target=self._worker_loop,
+                    args=(f"{prefix}-{worker_number}",),
+                    name=f"job-worker-{worker_number}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join(timeout=timeout)
+            self._threads = []
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and lag per kind, for operators."""
+        now = datetime.now(UTC)
+        rows = self.repository.aggregate(
+            [
+                {"$match": {"status": {"$in": [JOB_PENDING, JOB_RUNNING, JOB_FAILED]}}},
+                {
+                    "$group": {
+                        "_id": {"kind": "$kind", "status": "$status"},
+                        "count": {"$sum": 1},
+                        "oldest": {"$min": "$created_at"},
+                    }
+                },
+            ]
+        )
+
+        kinds: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            key = row.get("_id") or {}
+            entry = kinds.setdefault(
+                str(key.get("kind")),
+                {JOB_PENDING: 0, JOB_RUNNING: 0, JOB_FAILED: 0, "oldest_pending_age_seconds": 0.0},
+            )
+            job_status = str(key.get("status"))
+            entry[job_status] = int(row.get("count") or 0)
+            oldest = row.get("oldest")
+            if job_status == JOB_PENDING and isinstance(oldest, datetime):
+                if oldest.tzinfo is None:
+                    oldest = oldest.replace(tzinfo=UTC)
+                entry["oldest_pending_age_seconds"] = round((now - oldest).total_seconds(), 3)
+
+        return {
+            "workers": len(self._threads),
+            "registered_kinds": sorted(self._handlers),
+            "depth": sum(entry[JOB_PENDING] + entry[JOB_RUNNING] for entry in kinds.values()),
+            "kinds": kinds,
+        }
+
+
+_JOB_QUEUE: JobQueue | None = None
+
+
+def job_worker_count() -> int:
+    try:
+        return max(0, int(str(os.getenv("JOB_WORKERS") or "2").strip() or "2"))
+    except ValueError:
+        return 2
+
+
+def get_job_queue() -> JobQueue:
+    global _JOB_QUEUE
+    if _JOB_QUEUE is None:
+        _JOB_QUEUE = JobQueue(
+            MongoRepository(collection_name="jobs", model_type=JobRecord, db_name=auth_db_name()),
+        )
+    return _JOB_QUEUE
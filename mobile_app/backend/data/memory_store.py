@@ -0,0 +1,1151 @@
+"""Dict-backed stand-in for the parts of pymongo this backend uses.
+
+Selected with STORAGE_BACKEND=memory for tests and benchmarks. Documents go through a
+BSON round trip on the way in and out, so ids, datetimes (naive UTC, millisecond
+precision) and copy semantics match a real server. Supported: the query operators,
+update operators, cursor methods and aggregation stages used in `routing/` and `data/`,
+unique/sparse/partial indexes and TTL expiry. Anything else raises NotImplementedError
+instead of silently returning wrong results.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import math
+import re
+from threading import RLock
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.operations import DeleteMany, DeleteOne, IndexModel, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from data.mongo_metrics import get_mongo_command_metrics
+
+
+_MISSING = object()
+_DEFAULT_FIRST_BATCH = 101
+_TTL_SWEEP_SECONDS = 1.0
+
+
+def _bson_copy(doc: dict[str, Any]) -> dict[str, Any]:
+    return bson.decode(bson.encode(doc))
+
+
+def _normalize(value: Any) -> Any:
+    """Bring query arguments into the same shape stored documents have after BSON."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, tuple):
+        return [_normalize(item) for item in value]
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ("__doc__", tuple((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("__list__", tuple(_hashable(item) for item in value))
+    if value is _MISSING:
+        return None
+    return value
+
+
+# --- value ordering -----------------------------------------------------------------
+
+def _type_rank(value: Any) -> int:
+    if value is _MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank == 1:
+        return rank, 0
+    if rank in (4, 5, 10):
+        return rank, repr(value)
+    if isinstance(value, float) and math.isnan(value):
+        return rank, -math.inf
+    return rank, value
+
+
+def _compare(a: Any, b: Any) -> int | None:
+    """Three-way compare for same-type values; None when Mongo's type bracketing says no match."""
+    a, b = _normalize(a), _normalize(b)
+    if a is _MISSING or b is _MISSING:
+        return None
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b or rank_a in (4, 5, 10):
+        return None
+    if rank_a == 1:
+        return 0
+    return (a > b) - (a < b)
+
+
+# --- paths --------------------------------------------------------------------------
+
+def _resolve(doc: Any, path: str) -> list[Any]:
+    """All values at a dotted path, descending into arrays like Mongo does."""
+    values = [doc]
+    for part in path.split("."):
+        found: list[Any] = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    found.append(value[int(part)])
+                else:
+                    found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        values = found
+        if not values:
+            return [_MISSING]
+    return values
+
+
+def _get_path(doc: dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+    return value
+
+
+def _set_path(doc: dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    target = doc
+    for part in parts[:-1]:
+        nxt = target.get(part)
+        if not isinstance(nxt, dict):
+            nxt = target[part] = {}
+        target = nxt
+    target[parts[-1]] = value
+
+
+def _unset_path(doc: dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    target: Any = doc
+    for part in parts[:-1]:
+        target = target.get(part) if isinstance(target, dict) else None
+        if target is None:
+            return
+    if isinstance(target, dict):
+        target.pop(parts[-1], None)
+
+
+# --- query matching -----------------------------------------------------------------
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and all(str(key).startswith("$") for key in value)
+
+
+def _regex(pattern: Any, options: str = "") -> re.Pattern[str]:
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    if isinstance(pattern, bson.regex.Regex):
+        return pattern.try_compile()
+    flags = 0
+    for flag, value in (("i", re.IGNORECASE), ("m", re.MULTILINE), ("s", re.DOTALL), ("x", re.VERBOSE)):
+        if flag in options:
+            flags |= value
+    return re.compile(str(pattern), flags)
+
+
+def _equals(candidate: Any, expected: Any) -> bool:
+    expected = _normalize(expected)
+    if isinstance(expected, (re.Pattern, bson.regex.Regex)):
+        return _regex_matches(candidate, _regex(expected))
+    if candidate is _MISSING:
+        return expected is None
+    if isinstance(candidate, list) and not isinstance(expected, list):
+        return any(_equals(item, expected) for item in candidate)
+    if isinstance(candidate, list) and isinstance(expected, list):
+        return candidate == expected or any(item == expected for item in candidate)
+    if isinstance(candidate, bool) != isinstance(expected, bool):
+        return False
+    return candidate == expected
+
+
+def _regex_matches(candidate: Any, pattern: re.Pattern[str]) -> bool:
+    if isinstance(candidate, list):
+        return any(_regex_matches(item, pattern) for item in candidate)
+    return isinstance(candidate, str) and pattern.search(candidate) is not None
+
+
+def _compare_matches(candidate: Any, expected: Any, accept: Callable[[int], bool]) -> bool:
+    if isinstance(candidate, list):
+        return any(_compare_matches(item, expected, accept) for item in candidate)
+    result = _compare(candidate, expected)
+    return result is not None and accept(result)
+
+
+_COMPARISONS: dict[str, Callable[[int], bool]] = {
+    "$gt": lambda r: r > 0,
+    "$gte": lambda r: r >= 0,
+    "$lt": lambda r: r < 0,
+    "$lte": lambda r: r <= 0,
+}
+
+
+_BSON_TYPES: dict[str, tuple[type, ...]] = {
+    "double": (float,),
+    "string": (str,),
+    "object": (dict,),
+    "array": (list,),
+    "objectId": (ObjectId,),
+    "bool": (bool,),
+    "date": (datetime,),
+    "int": (int,),
+    "long": (int,),
+}
+
+
+def _type_candidates(value: Any) -> list[Any]:
+    # Like Mongo, an array matches by its own type or by any element's.
+    if isinstance(value, list):
+        return [value, *value]
+    return [] if value is _MISSING else [value]
+
+
+def _has_type(value: Any, name: str) -> bool:
+    if name == "null":
+        return value is None
+    if isinstance(value, bool) and name in ("int", "long"):
+        return False
+    return isinstance(value, _BSON_TYPES.get(name, ()))
+
+
+def _match_operator(candidates: list[Any], op: str, arg: Any, spec: dict[str, Any]) -> bool:
+    if op == "$eq":
+        return any(_equals(value, arg) for value in candidates)
+    if op == "$ne":
+        return not any(_equals(value, arg) for value in candidates)
+    if op in _COMPARISONS:
+        return any(_compare_matches(value, arg, _COMPARISONS[op]) for value in candidates)
+    if op == "$in":
+        return any(_equals(value, option) for value in candidates for option in arg)
+    if op == "$nin":
+        return not any(_equals(value, option) for value in candidates for option in arg)
+    if op == "$exists":
+        present = any(value is not _MISSING for value in candidates)
+        return present == bool(arg)
+    if op == "$regex":
+        pattern = _regex(arg, str(spec.get("$options") or ""))
+        return any(_regex_matches(value, pattern) for value in candidates)
+    if op == "$options":
+        return True
+    if op == "$not":
+        return not _match_candidates(candidates, arg)
+    if op == "$size":
+        return any(isinstance(value, list) and len(value) == int(arg) for value in candidates)
+    if op == "$type":
+        names = arg if isinstance(arg, list) else [arg]
+        return any(_has_type(item, str(name)) for value in candidates for item in _type_candidates(value) for name in names)
+    if op == "$all":
+        return any(
+            isinstance(value, list) and all(_equals(value, item) for item in arg)
+            for value in candidates
+        )
+    if op == "$elemMatch":
+        for value in candidates:
+            if not isinstance(value, list):
+                continue
+            for item in value:
+                if _is_operator_dict(arg):
+                    if _match_candidates([item], arg):
+                        return True
+                elif isinstance(item, dict) and matches(item, arg):
+                    return True
+        return False
+    raise NotImplementedError(f"Query operator {op} is not supported by the memory backend")
+
+
+def _match_candidates(candidates: list[Any], condition: Any) -> bool:
+    if _is_operator_dict(condition):
+        return all(_match_operator(candidates, op, arg, condition) for op, arg in condition.items())
+    return any(_equals(value, condition) for value in candidates)
+
+
+def matches(doc: dict[str, Any], query: dict[str, Any] | None) -> bool:
+    """True if `doc` satisfies the Mongo filter `query`."""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, part) for part in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Top-level operator {key} is not supported by the memory backend")
+        elif not _match_candidates(_resolve(doc, key), condition):
+            return False
+    return True
+
+
+# --- projection and sorting ---------------------------------------------------------
+
+def _project(doc: dict[str, Any], projection: Any) -> dict[str, Any]:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    slices = {key: value["$slice"] for key, value in projection.items() if isinstance(value, dict) and "$slice" in value}
+    fields = {key: value for key, value in projection.items() if key != "_id" and key not in slices}
+    if fields and all(bool(value) for value in fields.values()):
+        out: dict[str, Any] = {}
+        if include_id and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for field in [*fields, *slices]:
+            value = _get_path(doc, field)
+            if value is not _MISSING:
+                _set_path(out, field, value)
+    else:
+        out = dict(doc)
+        for field, value in fields.items():
+            if not value:
+                _unset_path(out, field)
+        if not include_id:
+            out.pop("_id", None)
+    for field, spec in slices.items():
+        value = _get_path(out, field)
+        if isinstance(value, list):
+            _set_path(out, field, _slice(value, spec))
+    return out
+
+
+def _slice(values: list[Any], spec: Any) -> list[Any]:
+    """`{"$slice": n}` (first n, or last n if negative) or `{"$slice": [skip, n]}`."""
+    if isinstance(spec, (list, tuple)):
+        skip, count = int(spec[0]), int(spec[1])
+        start = skip if skip >= 0 else max(0, len(values) + skip)
+        return values[start : start + count]
+    count = int(spec)
+    return values[:count] if count >= 0 else values[count:]
+
+
+def _normalize_sort(sort: Any, direction: Any = None) -> list[tuple[str, int]]:
+    if sort is None:
+        return []
+    if isinstance(sort, str):
+        return [(sort, int(direction or 1))]
+    if isinstance(sort, dict):
+        return [(str(key), int(value)) for key, value in sort.items()]
+    return [(str(key), int(value)) for key, value in sort]
+
+
+def _sorted(docs: list[dict[str, Any]], sort: list[tuple[str, int]]) -> list[dict[str, Any]]:
+    out = list(docs)
+    for field, direction in reversed(sort):
+        out.sort(key=lambda doc: _sort_key(_get_path(doc, field)), reverse=direction < 0)
+    return out
+
+
+# --- updates ------------------------------------------------------------------------
+
+def _push_values(spec: Any) -> tuple[list[Any], int | None, int | None]:
+    if isinstance(spec, dict) and "$each" in spec:
+        return list(spec["$each"]), spec.get("$slice"), spec.get("$position")
+    return [spec], None, None
+
+
+def _apply_update(doc: dict[str, Any], update: dict[str, Any], inserting: bool) -> dict[str, Any]:
+    update = _normalize(update)
+    if not _is_operator_dict(update):
+        replacement = dict(update)
+        if "_id" in doc:
+            replacement["_id"] = doc["_id"]
+        return replacement
+
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = _get_path(doc, path)
+            if op == "$set":
+                _set_path(doc, path, value)
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, path, value)
+            elif op == "$unset":
+                _unset_path(doc, path)
+            elif op == "$inc":
+                _set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ("$min", "$max"):
+                result = _compare(value, current)
+                if current is _MISSING or current is None or (result is not None and (result < 0 if op == "$min" else result > 0)):
+                    _set_path(doc, path, value)
+            elif op == "$currentDate":
+                _set_path(doc, path, _normalize(datetime.now(UTC)))
+            elif op in ("$push", "$addToSet"):
+                items = [] if current is _MISSING else list(current)
+                values, slice_count, position = _push_values(value)
+                if op == "$addToSet":
+                    values = [item for item in values if not any(_equals(existing, item) for existing in items)]
+                if position is None:
+                    items.extend(values)
+                else:
+                    items[position:position] = values
+                if slice_count is not None:
+                    items = items[slice_count:] if slice_count < 0 else items[:slice_count]
+                _set_path(doc, path, items)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    if _is_operator_dict(value):
+                        kept = [item for item in current if not _match_candidates([item], value)]
+                    elif isinstance(value, dict):
+                        kept = [item for item in current if not (isinstance(item, dict) and matches(item, value))]
+                    else:
+                        kept = [item for item in current if not _equals(item, value)]
+                    _set_path(doc, path, kept)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the memory backend")
+    return doc
+
+
+def _upsert_seed(query: dict[str, Any]) -> dict[str, Any]:
+    seed: dict[str, Any] = {}
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            for part in condition:
+                seed.update(_upsert_seed(part))
+        elif key.startswith("$"):
+            continue
+        elif _is_operator_dict(condition):
+            if "$eq" in condition:
+                _set_path(seed, key, _normalize(condition["$eq"]))
+        elif not isinstance(condition, (re.Pattern, bson.regex.Regex)):
+            _set_path(seed, key, _normalize(condition))
+    return seed
+
+
+# --- aggregation --------------------------------------------------------------------
+
+def _expression(doc: dict[str, Any], expr: Any) -> Any:
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = _get_path(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict):
+        if "$dateToString" in expr:
+            spec = expr["$dateToString"]
+            value = _expression(doc, spec.get("date"))
+            if not isinstance(value, datetime):
+                return None
+            fmt = str(spec.get("format") or "%Y-%m-%dT%H:%M:%S.%LZ").replace("%L", f"{value.microsecond // 1000:03d}")
+            return value.strftime(fmt)
+        if "$literal" in expr:
+            return expr["$literal"]
+        if _is_operator_dict(expr):
+            raise NotImplementedError(f"Expression {next(iter(expr))} is not supported by the memory backend")
+        return {key: _expression(doc, value) for key, value in expr.items()}
+    return expr
+
+
+def _accumulate(op: str, values: list[Any]) -> Any:
+    present = [value for value in values if value is not None]
+    if op == "$sum":
+        return sum(value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool))
+    if op == "$avg":
+        numbers = [value for value in present if isinstance(value, (int, float))]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$min", "$max"):
+        if not present:
+            return None
+        ordered = sorted(present, key=_sort_key)
+        return ordered[0] if op == "$min" else ordered[-1]
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$last":
+        return values[-1] if values else None
+    if op == "$push":
+        return list(values)
+    if op == "$addToSet":
+        out: list[Any] = []
+        for value in values:
+            if value not in out:
+                out.append(value)
+        return out
+    raise NotImplementedError(f"Accumulator {op} is not supported by the memory backend")
+
+
+def _group(docs: list[dict[str, Any]], spec: dict[str, Any]) -> list[dict[str, Any]]:
+    groups: dict[Any, tuple[Any, list[dict[str, Any]]]] = {}
+    for doc in docs:
+        key = _expression(doc, spec.get("_id"))
+        groups.setdefault(_hashable(key), (key, []))[1].append(doc)
+
+    out = []
+    for key, members in groups.values():
+        row: dict[str, Any] = {"_id": key}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, expr), = accumulator.items()
+            row[field] = _accumulate(op, [_expression(member, expr) for member in members])
+        out.append(row)
+    return out
+
+
+def run_pipeline(docs: list[dict[str, Any]], pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [doc for doc in docs if matches(doc, spec)]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$sort":
+            docs = _sorted(docs, _normalize_sort(spec))
+        elif name == "$limit":
+            docs = docs[: int(spec)]
+        elif name == "$skip":
+            docs = docs[int(spec):]
+        elif name == "$project":
+            if any(isinstance(value, (str, dict)) for value in spec.values()):
+                docs = [
+                    {
+                        **({"_id": doc.get("_id")} if spec.get("_id", 1) else {}),
+                        **{
+                            field: _expression(doc, value if not isinstance(value, (int, bool)) else f"${field}")
+                            for field, value in spec.items()
+                            if field != "_id" and value
+                        },
+                    }
+                    for doc in docs
+                ]
+            else:
+                docs = [_project(doc, spec) for doc in docs]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$unwind":
+            path = (spec["path"] if isinstance(spec, dict) else spec)[1:]
+            unwound = []
+            for doc in docs:
+                value = _get_path(doc, path)
+                for item in value if isinstance(value, list) else []:
+                    copy = dict(doc)
+                    _set_path(copy, path, item)
+                    unwound.append(copy)
+            docs = unwound
+        else:
+            raise NotImplementedError(f"Aggregation stage {name} is not supported by the memory backend")
+    return docs
+
+
+# --- client / database / collection -------------------------------------------------
+
+def _report(collection: "MemoryCollection", command: str, started: float, documents: int = 0, failed: bool = False) -> None:
+    get_mongo_command_metrics().record_command(
+        command,
+        collection.database.name,
+        collection.name,
+        time.perf_counter() - started,
+        documents=documents,
+        failed=failed,
+    )
+
+
+def _batch_commands(returned: int, batch_size: int) -> int:
+    """How many getMore round trips a real cursor would need after the first batch."""
+    first = batch_size or _DEFAULT_FIRST_BATCH
+    if returned <= first:
+        return 0
+    if not batch_size:
+        return 1
+    return math.ceil((returned - first) / batch_size)
+
+
+class MemoryCursor:
+    """Lazy cursor supporting the chained methods the routes use."""
+
+    def __init__(self, collection: "MemoryCollection", query: dict[str, Any] | None, projection: Any) -> None:
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: list[tuple[str, int]] = []
+        self._limit = 0
+        self._skip = 0
+        self._batch_size = 0
+        self._results: Iterator[dict[str, Any]] | None = None
+
+    def sort(self, key_or_list: Any, direction: Any = None) -> "MemoryCursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._limit = max(0, int(limit))
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self._skip = max(0, int(skip))
+        return self
+
+    def batch_size(self, batch_size: int) -> "MemoryCursor":
+        self._batch_size = max(0, int(batch_size))
+        return self
+
+    def _execute(self) -> Iterator[dict[str, Any]]:
+        started = time.perf_counter()
+        docs = self._collection._select(self._query, self._sort, self._skip, self._limit)
+        out = [_project(doc, self._projection) for doc in docs]
+        _report(self._collection, "find", started, documents=len(out))
+        for _ in range(_batch_commands(len(out), self._batch_size)):
+            _report(self._collection, "getMore", time.perf_counter())
+        return iter(out)
+
+    def __iter__(self) -> "MemoryCursor":
+        return self
+
+    def __next__(self) -> dict[str, Any]:
+        if self._results is None:
+            self._results = self._execute()
+        return next(self._results)
+
+    def to_list(self, length: int | None = None) -> list[dict[str, Any]]:
+        items = list(self)
+        return items if length is None else items[:length]
+
+    def close(self) -> None:
+        self._results = iter(())
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self._docs: dict[Any, dict[str, Any]] = {}
+        self._indexes: dict[str, dict[str, Any]] = {"_id_": {"key": [("_id", 1)], "v": 2}}
+        self._unique: dict[str, dict[Any, Any]] = {}
+        self._lock = RLock()
+        self._last_ttl_sweep = 0.0
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.database.name}.{self.name}"
+
+    # internal helpers
+
+    def _candidates(self, query: dict[str, Any]) -> Iterable[dict[str, Any]]:
+        id_condition = query.get("_id", _MISSING)
+        if id_condition is not _MISSING and not _is_operator_dict(id_condition) and not isinstance(id_condition, dict):
+            doc = self._docs.get(_hashable(_normalize(id_condition)))
+            return [doc] if doc is not None else []
+        if _is_operator_dict(id_condition) and set(id_condition) == {"$in"}:
+            keys = dict.fromkeys(_hashable(_normalize(value)) for value in id_condition["$in"])
+            return [self._docs[key] for key in keys if key in self._docs]
+        return list(self._docs.values())
+
+    def _select(
+        self,
+        query: dict[str, Any] | None,
+        sort: list[tuple[str, int]] | None = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            self._expire_ttl()
+            query = query or {}
+            docs = [doc for doc in self._candidates(query) if matches(doc, query)]
+            if sort:
+                docs = _sorted(docs, sort)
+            if skip:
+                docs = docs[skip:]
+            if limit:
+                docs = docs[:limit]
+            return [_bson_copy(doc) for doc in docs]
+
+    def _index_key(self, name: str, doc: dict[str, Any]) -> Any:
+        info = self._indexes[name]
+        values = [_get_path(doc, field) for field, _ in info["key"]]
+        if info.get("sparse") and all(value is _MISSING for value in values):
+            return _MISSING
+        partial = info.get("partialFilterExpression")
+        if partial and not matches(doc, partial):
+            return _MISSING
+        return tuple(_hashable(value) for value in values)
+
+    def _check_unique(self, doc: dict[str, Any], replacing: Any = _MISSING) -> None:
+        for name, entries in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is _MISSING:
+                continue
+            owner = entries.get(key, _MISSING)
+            if owner is not _MISSING and owner != replacing:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {name} dup key: {key}",
+                    11000,
+                )
+
+    def _index_add(self, doc_key: Any, doc: dict[str, Any]) -> None:
+        for name, entries in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is not _MISSING:
+                entries[key] = doc_key
+
+    def _index_remove(self, doc: dict[str, Any]) -> None:
+        for name, entries in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is not _MISSING:
+                entries.pop(key, None)
+
+    def _store(self, doc: dict[str, Any]) -> Any:
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        stored = _bson_copy(doc)
+        doc_key = _hashable(stored["_id"])
+        if doc_key in self._docs:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.full_name} index: _id_ dup key: {stored['_id']}",
+                11000,
+            )
+        self._check_unique(stored)
+        self._docs[doc_key] = stored
+        self._index_add(doc_key, stored)
+        return stored["_id"]
+
+    def _replace(self, current: dict[str, Any], updated: dict[str, Any]) -> bool:
+        updated = _bson_copy(updated)
+        if updated == current:
+            return False
+        doc_key = _hashable(current["_id"])
+        self._index_remove(current)
+        try:
+            self._check_unique(updated, replacing=doc_key)
+        except DuplicateKeyError:
+            self._index_add(doc_key, current)
+            raise
+        self._docs[doc_key] = updated
+        self._index_add(doc_key, updated)
+        return True
+
+    def _remove(self, doc: dict[str, Any]) -> None:
+        self._index_remove(doc)
+        self._docs.pop(_hashable(doc["_id"]), None)
+
+    def _expire_ttl(self) -> None:
+        now = time.monotonic()
+        if now - self._last_ttl_sweep < _TTL_SWEEP_SECONDS:
+            return
+        self._last_ttl_sweep = now
+        for info in self._indexes.values():
+            ttl = info.get("expireAfterSeconds")
+            if ttl is None:
+                continue
+            field = info["key"][0][0]
+            cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=int(ttl))
+            for doc in list(self._docs.values()):
+                value = doc.get(field)
+                if isinstance(value, datetime) and value < cutoff:
+                    self._remove(doc)
+
+    def _update(self, query: dict[str, Any], update: Any, upsert: bool, multi: bool, sort: Any = None) -> dict[str, Any]:
+        with self._lock:
+            self._expire_ttl()
+            docs = [doc for doc in self._candidates(query) if matches(doc, query)]
+            if sort:
+                docs = _sorted(docs, _normalize_sort(sort))
+            if not multi:
+                docs = docs[:1]
+
+            modified = 0
+            for current in docs:
+                updated = _apply_update(_bson_copy(current), update, inserting=False)
+                if self._replace(current, updated):
+                    modified += 1
+            result: dict[str, Any] = {"n": len(docs), "nModified": modified, "matched": docs}
+
+            if not docs and upsert:
+                seed = _upsert_seed(query)
+                if _is_operator_dict(update):
+                    doc = _apply_update(seed, update, inserting=True)
+                else:
+                    doc = {**({"_id": seed["_id"]} if "_id" in seed else {}), **_normalize(update)}
+                result["upserted"] = self._store(doc)
+                result["n"] = 1
+            return result
+
+    # pymongo Collection API
+
+    def insert_one(self, document: dict[str, Any], *args: Any, **kwargs: Any) -> InsertOneResult:
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                inserted_id = self._store(document)
+            except DuplicateKeyError:
+                _report(self, "insert", started, failed=True)
+                raise
+        _report(self, "insert", started, documents=1)
+        return InsertOneResult(inserted_id, True)
+
+    def insert_many(self, documents: Iterable[dict[str, Any]], ordered: bool = True, *args: Any, **kwargs: Any) -> InsertManyResult:
+        started = time.perf_counter()
+        inserted: list[Any] = []
+        errors: list[dict[str, Any]] = []
+        with self._lock:
+            for index, document in enumerate(documents):
+                try:
+                    inserted.append(self._store(document))
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": document})
+                    if ordered:
+                        break
+        _report(self, "insert", started, documents=len(inserted), failed=bool(errors))
+        if errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": errors,
+                    "writeConcernErrors": [],
+                    "nInserted": len(inserted),
+                    "nUpserted": 0,
+                    "nMatched": 0,
+                    "nModified": 0,
+                    "nRemoved": 0,
+                    "upserted": [],
+                }
+            )
+        return InsertManyResult(inserted, True)
+
+    def find(self, filter: dict[str, Any] | None = None, projection: Any = None, *args: Any, **kwargs: Any) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection)
+        if kwargs.get("sort") is not None:
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("skip"):
+            cursor.skip(kwargs["skip"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        if kwargs.get("batch_size"):
+            cursor.batch_size(kwargs["batch_size"])
+        return cursor
+
+    def find_one(self, filter: Any = None, projection: Any = None, *args: Any, **kwargs: Any) -> dict[str, Any] | None:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        cursor = self.find(filter, projection, sort=kwargs.get("sort")).limit(1).batch_size(1)
+        return next(cursor, None)
+
+    def count_documents(self, filter: dict[str, Any], *args: Any, limit: int = 0, skip: int = 0, **kwargs: Any) -> int:
+        started = time.perf_counter()
+        count = len(self._select(filter, skip=skip, limit=limit))
+        _report(self, "aggregate", started, documents=1)
+        return count
+
+    def estimated_document_count(self, *args: Any, **kwargs: Any) -> int:
+        started = time.perf_counter()
+        with self._lock:
+            count = len(self._docs)
+        _report(self, "count", started)
+        return count
+
+    def distinct(self, key: str, filter: dict[str, Any] | None = None, *args: Any, **kwargs: Any) -> list[Any]:
+        started = time.perf_counter()
+        values: list[Any] = []
+        for doc in self._select(filter):
+            for value in _resolve(doc, key):
+                for item in value if isinstance(value, list) else [value]:
+                    if item is not _MISSING and item not in values:
+                        values.append(item)
+        _report(self, "distinct", started)
+        return values
+
+    def update_one(self, filter: dict[str, Any], update: dict[str, Any], upsert: bool = False, *args: Any, **kwargs: Any) -> UpdateResult:
+        started = time.perf_counter()
+        result = self._update(filter, update, upsert, multi=False, sort=kwargs.get("sort"))
+        _report(self, "update", started, documents=result["n"])
+        return UpdateResult({key: value for key, value in result.items() if key != "matched"}, True)
+
+    def update_many(self, filter: dict[str, Any], update: dict[str, Any], upsert: bool = False, *args: Any, **kwargs: Any) -> UpdateResult:
+        started = time.perf_counter()
+        result = self._update(filter, update, upsert, multi=True)
+        _report(self, "update", started, documents=result["n"])
+        return UpdateResult({key: value for key, value in result.items() if key != "matched"}, True)
+
+    def replace_one(self, filter: dict[str, Any], replacement: dict[str, Any], upsert: bool = False, *args: Any, **kwargs: Any) -> UpdateResult:
+        if _is_operator_dict(replacement):
+            raise ValueError("replacement can not include $ operators")
+        return self.update_one(filter, replacement, upsert=upsert)
+
+    def _delete(self, filter: dict[str, Any], multi: bool) -> int:
+        with self._lock:
+            docs = [doc for doc in self._candidates(filter) if matches(doc, filter)]
+            if not multi:
+                docs = docs[:1]
+            for doc in docs:
+                self._remove(doc)
+            return len(docs)
+
+    def delete_one(self, filter: dict[str, Any], *args: Any, **kwargs: Any) -> DeleteResult:
+        started = time.perf_counter()
+        deleted = self._delete(filter, multi=False)
+        _report(self, "delete", started, documents=deleted)
+        return DeleteResult({"n": deleted}, True)
+
+    def delete_many(self, filter: dict[str, Any], *args: Any, **kwargs: Any) -> DeleteResult:
+        started = time.perf_counter()
+        deleted = self._delete(filter, multi=True)
+        _report(self, "delete", started, documents=deleted)
+        return DeleteResult({"n": deleted}, True)
+
+    def find_one_and_update(
+        self,
+        filter: dict[str, Any],
+        update: dict[str, Any],
+        projection: Any = None,
+        sort: Any = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        *args: Any,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        with self._lock:
+            before = self._select(filter, _normalize_sort(sort), limit=1)
+            result = self._update(filter, update, upsert, multi=False, sort=sort)
+            if return_document == ReturnDocument.AFTER:
+                if result["matched"]:
+                    after_query = {"_id": result["matched"][0]["_id"]}
+                elif "upserted" in result:
+                    after_query = {"_id": result["upserted"]}
+                else:
+                    after_query = None
+                found = self._select(after_query, limit=1) if after_query else []
+            else:
+                found = before
+        _report(self, "findAndModify", started, documents=len(found))
+        return _project(found[0], projection) if found else None
+
+    def find_one_and_delete(self, filter: dict[str, Any], projection: Any = None, sort: Any = None, *args: Any, **kwargs: Any) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        with self._lock:
+            found = self._select(filter, _normalize_sort(sort), limit=1)
+            if found:
+                self._remove(self._docs[_hashable(found[0]["_id"])])
+        _report(self, "findAndModify", started, documents=len(found))
+        return _project(found[0], projection) if found else None
+
+    def bulk_write(self, requests: list[Any], ordered: bool = True, *args: Any, **kwargs: Any) -> BulkWriteResult:
+        totals = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+        errors: list[dict[str, Any]] = []
+        previous_command = None
+        started = time.perf_counter()
+        with self._lock:
+            for index, request in enumerate(requests):
+                if isinstance(request, InsertOne):
+                    command = "insert"
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    command = "delete"
+                else:
+                    command = "update"
+                if command != previous_command:
+                    # A real server receives one command per run of same-typed operations.
+                    if previous_command is not None:
+                        _report(self, previous_command, started)
+                    started = time.perf_counter()
+                    previous_command = command
+
+                try:
+                    if isinstance(request, InsertOne):
+                        self._store(request._doc)
+                        totals["nInserted"] += 1
+                    elif isinstance(request, (DeleteOne, DeleteMany)):
+                        totals["nRemoved"] += self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                    elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                        result = self._update(
+                            request._filter,
+                            request._doc,
+                            bool(request._upsert),
+                            multi=isinstance(request, UpdateMany),
+                        )
+                        if "upserted" in result:
+                            totals["nUpserted"] += 1
+                            totals["upserted"].append({"index": index, "_id": result["upserted"]})
+                        else:
+                            totals["nMatched"] += result["n"]
+                            totals["nModified"] += result["nModified"]
+                    else:
+                        raise NotImplementedError(f"{type(request).__name__} is not supported by the memory backend")
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if previous_command is not None:
+            _report(self, previous_command, started, failed=bool(errors))
+        if errors:
+            raise BulkWriteError({**totals, "writeErrors": errors, "writeConcernErrors": []})
+        return BulkWriteResult(totals, True)
+
+    def aggregate(self, pipeline: list[dict[str, Any]], *args: Any, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        started = time.perf_counter()
+        docs = run_pipeline(self._select({}), pipeline)
+        _report(self, "aggregate", started, documents=len(docs))
+        for _ in range(_batch_commands(len(docs), 0)):
+            _report(self, "getMore", time.perf_counter())
+        return iter(docs)
+
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        return self.create_indexes([IndexModel(keys, **kwargs)])[0]
+
+    def create_indexes(self, indexes: list[IndexModel], *args: Any, **kwargs: Any) -> list[str]:
+        started = time.perf_counter()
+        names = []
+        with self._lock:
+            for model in indexes:
+                document = dict(model.document)
+                name = str(document.pop("name"))
+                info: dict[str, Any] = {"key": list(document.pop("key").items()), "v": 2, **document}
+                existing = self._indexes.get(name)
+                if existing is not None and existing != info:
+                    raise OperationFailure(f"Index with name: {name} already exists with different options", 86)
+                self._indexes[name] = info
+                if info.get("unique") and name not in self._unique:
+                    entries: dict[Any, Any] = {}
+                    self._unique[name] = entries
+                    for doc_key, doc in self._docs.items():
+                        key = self._index_key(name, doc)
+                        if key is _MISSING:
+                            continue
+                        if key in entries:
+                            del self._unique[name]
+                            del self._indexes[name]
+                            raise DuplicateKeyError(f"E11000 duplicate key error building index {name}", 11000)
+                        entries[key] = doc_key
+                names.append(name)
+        _report(self, "createIndexes", started)
+        return names
+
+    def index_information(self) -> dict[str, dict[str, Any]]:
+        started = time.perf_counter()
+        with self._lock:
+            info = {name: dict(value) for name, value in self._indexes.items()}
+        _report(self, "listIndexes", started)
+        return info
+
+    def drop_index(self, name: str, *args: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self._indexes.pop(name, None)
+            self._unique.pop(name, None)
+
+    def drop(self, *args: Any, **kwargs: Any) -> None:
+        self.database.drop_collection(self.name)
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str) -> None:
+        self.client = client
+        self.name = name
+        self._collections: dict[str, MemoryCollection] = {}
+        self._lock = RLock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, *args: Any, **kwargs: Any) -> MemoryCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(self, name)
+            return collection
+
+    def list_collection_names(self, *args: Any, **kwargs: Any) -> list[str]:
+        with self._lock:
+            return sorted(name for name, collection in self._collections.items() if collection._docs)
+
+    def drop_collection(self, name: str, *args: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def command(self, command: Any, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name in ("ping", "hello", "isMaster", "ismaster"):
+            return {"ok": 1.0}
+        raise NotImplementedError(f"Command {name} is not supported by the memory backend")
+
+
+class MemoryClient:
+    """In-process replacement for `MongoClient`; all repositories share one instance."""
+
+    def __init__(self) -> None:
+        self._databases: dict[str, MemoryDatabase] = {}
+        self._lock = RLock()
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_database(name)
+
+    def get_database(self, name: str, *args: Any, **kwargs: Any) -> MemoryDatabase:
+        with self._lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = MemoryDatabase(self, name)
+            return database
+
+    def list_database_names(self) -> list[str]:
+        with self._lock:
+            return sorted(self._databases)
+
+    def drop_database(self, name: str) -> None:
+        with self._lock:
+            self._databases.pop(getattr(name, "name", name), None)
+
+    def close(self) -> None:
+        return None
+
+
+_MEMORY_CLIENT: MemoryClient | None = None
+_MEMORY_CLIENT_LOCK = RLock()
+
+
+def get_memory_client() -> MemoryClient:
+    global _MEMORY_CLIENT
+    with _MEMORY_CLIENT_LOCK:
+        if _MEMORY_CLIENT is None:
+            _MEMORY_CLIENT = MemoryClient()
+        return _MEMORY_CLIENT
+
+
+def reset_memory_client() -> None:
+    """Drop every in-memory database (test isolation)."""
+    with _MEMORY_CLIENT_LOCK:
+        if _MEMORY_CLIENT is not None:
+            with _MEMORY_CLIENT._lock:
+                _MEMORY_CLIENT._databases.clear()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable
+import uuid
+
+from pymongo.errors import DuplicateKeyError
+
+from data.config import auth_db_name
+from data.dto import MigrationRecord
+from data.mongo_repository import MongoRepository
+
+
+MIGRATION_RUNNING = "running"
+MIGRATION_DONE = "done"
+MIGRATION_FAILED = "failed"
+
+# Runs one migration with the given batch size and returns counts to record. Must be
+# safe to run again after a crash: a failed or interrupted migration restarts from scratch.
+# Steps call `renew_lease()` once per batch.
+MigrationStep = Callable[[int], dict[str, int]]
+
+_CURRENT_LEASE: ContextVar[Callable[[], None] | None] = ContextVar("migration_lease", default=None)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    up: MigrationStep
+
+
+class MigrationLocked(RuntimeError):
+    """Another runner holds the lease on this migration."""
+
+
+def renew_lease() -> None:
+    """Extend the lease of the migration running in this context; a no-op outside one.
+
+    Raises `MigrationLocked` when the lease expired and another runner claimed the
+    migration, so the step stops instead of racing the new owner.
+    """
+    renew = _CURRENT_LEASE.get()
+    if renew is not None:
+        renew()
+
+
+class MigrationRunner:
+    """Versioned data migrations, applied in version order and recorded in a collection.
+
+    Each migration is claimed with a lease before it runs, so two deploys starting the
+    runner at once do not both apply it; a crashed runner's lease expires. Steps renew the
+    lease every batch, so only a stalled runner loses it.
+    """
+
+    def __init__(self, repository: MongoRepository, *, lease_seconds: int = 3600) -> None:
+        self.repository = repository
+        self.lease_seconds = lease_seconds
+        self._migrations: dict[int, Migration] = {}
+
+    def register(self, version: int, name: str, up: MigrationStep) -> None:
+        version = int(version)
+        if version < 1:
+            raise ValueError("Migration versions start at 1")
+        existing = self._migrations.get(version)
+        if existing is not None and existing.name != name:
+            raise ValueError(f"Migration {version} is already registered as {existing.name!r}")
+        self._migrations[version] = Migration(version=version, name=name, up=up)
+
+    def migrations(self) -> list[Migration]:
+        return [self._migrations[version] for version in sorted(self._migrations)]
+
+    def records(self) -> dict[int, dict[str, Any]]:
+        return {int(row["_id"]): row for row in self.repository.find_many({})}
+
+    def pending(self, target: int | None = None) -> list[Migration]:
+        done = {version for version, row in self.records().items() if row.get("status") == MIGRATION_DONE}
+        return [
+            migration
+            for migration in self.migrations()
+            if migration.version not in done and (target is None or migration.version <= target)
+        ]
+
+    def _claim(self, migration: Migration, owner: str) -> None:
+        now = datetime.now(UTC)
+        try:
+            self.repository.collection.find_one_and_update(
+                {
+                    "_id": migration.version,
+                    "status": {"$ne": MIGRATION_DONE},
+                    "$or": [{"status": {"$ne": MIGRATION_RUNNING}}, {"locked_until": {"$lte": now}}],
+                },
+                {
+                    "$set": {
+                        "name": migration.name,
+                        "status": MIGRATION_RUNNING,
+                        "owner": owner,
+                        "locked_until": now + timedelta(seconds=self.lease_seconds),
+                        "started_at": now,
+                        "error": None,
+                    },
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError as e:
+            # The row exists but did not match: done meanwhile, or leased by someone else.
+            raise MigrationLocked(f"Migration {migration.version} ({migration.name}) is running elsewhere") from e
+
+    def _renew(self, migration: Migration, owner: str) -> None:
+        now = datetime.now(UTC)
+        result = self.repository.collection.update_one(
+            {"_id": migration.version, "owner": owner, "status": MIGRATION_RUNNING},
+            {"$set": {"locked_until": now + timedelta(seconds=self.lease_seconds)}},
+        )
+        if result.matched_count == 0:
+            raise MigrationLocked(f"Lost the lease on migration {migration.version} ({migration.name}) to another runner")
+
+    def _finish(self, migration: Migration, owner: str, fields: dict[str, Any]) -> bool:
+        """Record the outcome; False if another runner took the lease over meanwhile."""
+        result = self.repository.collection.update_one(
+            {"_id": migration.version, "owner": owner},
+            {"$set": {**fields, "finished_at": datetime.now(UTC)}, "$unset": {"locked_until": ""}},
+        )
+        return result.matched_count > 0
+
+    def run(
+        self,
+        target: int | None = None,
+        batch_size: int = 1000,
+        log: Callable[[str], None] = print,
+    ) -> list[int]:
+        """Apply pending migrations up to `target` (all by default); returns the versions applied.
+
+        Stops at the first failure, which is recorded and re-raised.
+        """
+        owner = uuid.uuid4().hex
+        applied: list[int] = []
+        for migration in self.pending(target):
+            self._claim(migration, owner)
+            log(f"[MIGRATIONS] Applying {migration.version} {migration.name}")
+            lease = _CURRENT_LEASE.set(lambda: self._renew(migration, owner))
+            try:
+                counts = migration.up(max(1, int(batch_size)))
+            except MigrationLocked as e:
+                log(f"[MIGRATIONS] {migration.version} {migration.name} stopped: {e}")
+                raise
+            except Exception as e:
+                if not self._finish(migration, owner, {"status": MIGRATION_FAILED, "error": str(e)[:2000]}):
+                    log(f"[MIGRATIONS] Lost the lease on {migration.version}; its failure is not recorded")
+                log(f"[MIGRATIONS] {migration.version} {migration.name} failed: {e}")
+                raise
+            finally:
+                _CURRENT_LEASE.reset(lease)
+            if not self._finish(migration, owner, {"status": MIGRATION_DONE, "counts": dict(counts or {})}):
+                raise MigrationLocked(f"Lost the lease on migration {migration.version} ({migration.name}) before it finished")
+            log(f"[MIGRATIONS] Applied {migration.version} {migration.name}: {dict(counts or {})}")
+            applied.append(migration.version)
+        return applied
+
+
+_MIGRATION_RUNNER: MigrationRunner | None = None
+
+
+def get_migration_runner() -> MigrationRunner:
+    global _MIGRATION_RUNNER
+    if _MIGRATION_RUNNER is None:
+        _MIGRATION_RUNNER = MigrationRunner(
+            MongoRepository(collection_name="migrations", model_type=MigrationRecord, db_name=auth_db_name()),
+        )
+    return _MIGRATION_RUNNER
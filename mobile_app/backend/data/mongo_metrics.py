@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import os
+from threading import Lock
+from typing import Any, Callable, Iterator
+
+import bson
+from pymongo import monitoring
+
+from data.config import env_float
+from data.prometheus import get_metrics_registry
+
+
+BACKGROUND_LABEL = "background"
+_MAX_IN_FLIGHT = 10000
+_COMMANDS_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+
+@dataclass
+class CommandScope:
+    """What the Mongo commands issued in the current context are attributed to.
+
+    `label` may be a callable so middleware can resolve the route template lazily,
+    after the router has matched the request.
+    """
+
+    label: str | Callable[[], str]
+    commands: int = 0
+
+    def resolve(self) -> str:
+        label = self.label() if callable(self.label) else self.label
+        return label or BACKGROUND_LABEL
+
+
+_CURRENT_SCOPE: ContextVar[CommandScope | None] = ContextVar("mongo_command_scope", default=None)
+
+
+def current_command_label() -> str:
+    scope = _CURRENT_SCOPE.get()
+    return scope.resolve() if scope is not None else BACKGROUND_LABEL
+
+
+@contextmanager
+def command_scope(label: str | Callable[[], str]) -> Iterator[CommandScope]:
+    """Attribute Mongo commands issued inside the block (and threads it spawns via anyio) to `label`."""
+    scope = CommandScope(label=label)
+    token = _CURRENT_SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _CURRENT_SCOPE.reset(token)
+
+
+def _command_collection(command_name: str, command: Any) -> str:
+    value = command.get(command_name) if hasattr(command, "get") else None
+    if isinstance(value, str):
+        return value
+    # getMore carries the cursor id under the command name and the collection separately.
+    return str(command.get("collection") or "") if hasattr(command, "get") else ""
+
+
+def _returned_documents(reply: Any) -> int:
+    if not hasattr(reply, "get"):
+        return 0
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if isinstance(batch, list) else 0
+    count = reply.get("n")
+    return int(count) if isinstance(count, (int, float)) else 0
+
+
+def _reply_bytes(reply: Any) -> int:
+    """BSON size of a reply. pymongo hands listeners decoded replies, so this re-encodes
+    them on the request thread; only used when reply sizes are enabled."""
+    raw = getattr(reply, "raw", None)
+    if isinstance(raw, bytes):
+        return len(raw)
+    try:
+        return len(bson.encode(reply))
+    except Exception:
+        return 0
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener that attributes every command to the active route or job.
+
+    pymongo calls listeners synchronously on the thread that issued the command, so the
+    context variable set by the request middleware (copied into threadpool workers) is
+    visible here.
+    """
+
+    def __init__(self, slow_command_ms: float = 100.0, slow_log_size: int = 50, reply_bytes: bool = False) -> None:
+        registry = get_metrics_registry()
+        labels = ("route", "command", "collection")
+        self.commands = registry.counter("mongo_commands_total", "Mongo commands issued.", labels)
+        self.errors = registry.counter("mongo_command_errors_total", "Mongo commands that failed.", labels)
+        self.documents = registry.counter(
+            "mongo_command_documents_total",
+            "Documents returned (cursor batches) or affected (n) by Mongo commands.",
+            labels,
+        )
+        self.reply_bytes = registry.counter("mongo_command_reply_bytes_total", "BSON size of command replies.", labels)
+        self.duration = registry.histogram(
+            "mongo_command_duration_seconds",
+            "Mongo command round-trip time.",
+            ("route", "command"),
+        )
+        self.per_request = registry.histogram(
+            "mongo_commands_per_request",
+            "Mongo commands issued while serving one request.",
+            ("route",),
+            buckets=_COMMANDS_PER_REQUEST_BUCKETS,
+        )
+        self.slow_command_ms = slow_command_ms
+        self.count_reply_bytes = reply_bytes
+        self._slow: deque[dict[str, Any]] = deque(maxlen=max(1, slow_log_size))
+        self._in_flight: dict[tuple[int, Any], tuple[str, str]] = {}
+        self._request_observers: list[list[tuple[str, int]]] = []
+        self._lock = Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        scope = _CURRENT_SCOPE.get()
+        label = BACKGROUND_LABEL
+        if scope is not None:
+            scope.commands += 1
+            label = scope.resolve()
+        collection = _command_collection(event.command_name, event.command)
+        with self._lock:
+            if len(self._in_flight) >= _MAX_IN_FLIGHT:
+                self._in_flight.clear()
+            self._in_flight[(event.request_id, event.connection_id)] = (label, collection)
+
+    def _finish(self, event: Any) -> tuple[str, str, float]:
+        with self._lock:
+            label, collection = self._in_flight.pop(
+                (event.request_id, event.connection_id),
+                (current_command_label(), ""),
+            )
+        seconds = event.duration_micros / 1_000_000
+        self._observe(label, event.command_name, event.database_name, collection, seconds)
+        return label, collection, seconds
+
+    def _observe(self, label: str, command_name: str, database: str, collection: str, seconds: float) -> None:
+        self.commands.inc(label, command_name, collection)
+        self.duration.observe(seconds, label, command_name)
+        if seconds * 1000 >= self.slow_command_ms:
+            entry = {
+                "at": datetime.now(UTC).isoformat(),
+                "route": label,
+                "command": command_name,
+                "collection": f"{database}.{collection}",
+                "duration_ms": round(seconds * 1000, 3),
+            }
+            self._slow.append(entry)
+            print(f"[MONGO] Slow {command_name} on {entry['collection']}: {entry['duration_ms']}ms ({label})")
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        label, collection, _ = self._finish(event)
+        self.documents.inc(label, event.command_name, collection, amount=_returned_documents(event.reply))
+        if self.count_reply_bytes:
+            self.reply_bytes.inc(label, event.command_name, collection, amount=_reply_bytes(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        label, collection, _ = self._finish(event)
+        self.errors.inc(label, event.command_name, collection)
+
+    def record_command(
+        self,
+        command_name: str,
+        database: str,
+        collection: str,
+        seconds: float,
+        documents: int = 0,
+        failed: bool = False,
+    ) -> None:
+        """Account for a command that did not go through pymongo (the in-memory backend)."""
+        scope = _CURRENT_SCOPE.get()
+        label = BACKGROUND_LABEL
+        if scope is not None:
+            scope.commands += 1
+            label = scope.resolve()
+        self._observe(label, command_name, database, collection, seconds)
+        if failed:
+            self.errors.inc(label, command_name, collection)
+        else:
+            self.documents.inc(label, command_name, collection, amount=documents)
+
+    def record_request(self, scope: CommandScope) -> None:
+        """Observe how many commands one request needed; called by the request middleware."""
+        label = scope.resolve()
+        self.per_request.observe(scope.commands, label)
+        for observer in self._request_observers:
+            observer.append((label, scope.commands))
+
+    @contextmanager
+    def capture_requests(self) -> Iterator[list[tuple[str, int]]]:
+        """Collect `(route, commands)` for every request finished inside the block (used by query-budget tests)."""
+        captured: list[tuple[str, int]] = []
+        self._request_observers.append(captured)
+        try:
+            yield captured
+        finally:
+            self._request_observers.remove(captured)
+
+    def recent_slow_commands(self) -> list[dict[str, Any]]:
+        return list(self._slow)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-route command counts, latency percentiles and commands-per-request."""
+        routes: dict[str, dict[str, Any]] = {}
+
+        def route_entry(label: str) -> dict[str, Any]:
+            return routes.setdefault(label, {"requests": 0, "commands_per_request": {}, "commands": {}})
+
+        for (label,), snap in self.per_request.snapshot().items():
+            entry = route_entry(label)
+            entry["requests"] = snap.count
+            entry["commands_per_request"] = {
+                "mean": round(snap.sum / snap.count, 2) if snap.count else 0.0,
+                "p95": round(snap.quantile(0.95), 2),
+            }
+
+        durations = self.duration.snapshot()
+        documents = self.documents.values()
+        reply_bytes = self.reply_bytes.values()
+        errors = self.errors.values()
+        for key, count in self.commands.values().items():
+            label, command, collection = key
+            stats = route_entry(label)["commands"].setdefault(
+                command,
+                {"count": 0, "errors": 0, "documents": 0, "bytes": 0, "collections": {}},
+            )
+            stats["count"] += int(count)
+            stats["errors"] += int(errors.get(key, 0))
+            stats["documents"] += int(documents.get(key, 0))
+            stats["bytes"] += int(reply_bytes.get(key, 0))
+            stats["collections"][collection or "-"] = int(count)
+
+            latency = durations.get((label, command))
+            if latency is not None:
+                stats["total_ms"] = round(latency.sum * 1000, 3)
+                stats["p50_ms"] = round(latency.quantile(0.5) * 1000, 3)
+                stats["p95_ms"] = round(latency.quantile(0.95) * 1000, 3)
+
+        return {"slow_command_ms": self.slow_command_ms, "routes": routes, "slow": self.recent_slow_commands()}
+
+    def reset(self) -> None:
+        for metric in (self.commands, self.errors, self.documents, self.reply_bytes, self.duration, self.per_request):
+            metric.clear()
+        self._slow.clear()
+
+
+_COMMAND_METRICS: MongoCommandMetrics | None = None
+
+
+def get_mongo_command_metrics() -> MongoCommandMetrics:
+    global _COMMAND_METRICS
+    if _COMMAND_METRICS is None:
+        _COMMAND_METRICS = MongoCommandMetrics(
+            slow_command_ms=max(0.0, env_float("MONGO_SLOW_COMMAND_MS", 100.0)),
+            reply_bytes=str(os.getenv("MONGO_REPLY_BYTES") or "0").strip().lower() in ("1", "true", "yes", "on"),
+        )
+    return _COMMAND_METRICS
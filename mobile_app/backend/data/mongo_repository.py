@@ -1,22 +1,57 @@
 from bson import ObjectId
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 from pydantic import BaseModel
 from typing import Any, TypeVar, Type, Optional
 import os
 
+from data.indexes import IndexSpec, get_index_manager
+from data.storage import client_generation, get_client
+
 T = TypeVar('T', bound=BaseModel)
 
 class MongoRepository:
     """Generic MongoDB repository for CRUD operations"""
     
-    def __init__(self, collection_name: str, model_type: Type[T], db_name: str | None = None):
-        """Initialize repository with collection and model type"""
-        mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-        self.client = MongoClient(mongo_url)
+    def __init__(
+        self,
+        collection_name: str,
+        model_type: Type[T],
+        db_name: str | None = None,
+        indexes: list[IndexSpec] | None = None,
+    ):
+        """Initialize repository with collection and model type.
+
+        No client is created here; it is looked up on first access to `collection`.
+        """
         resolved_db = str(db_name or os.getenv("MONGO_DB", "spot_on_sight")).strip() or "spot_on_sight"
-        self.db = self.client[resolved_db]
-        self.collection = self.db[collection_name]
+        self.db_name = resolved_db
+        self.collection_name = collection_name
         self.model_type = model_type
+        self._collection: Any = None
+        self._generation = -1
+        self.declare_indexes(indexes or [])
+
+    @property
+    def client(self) -> Any:
+        return get_client()
+
+    @property
+    def db(self) -> Any:
+        return self.client[self.db_name]
+
+    @property
+    def collection(self) -> Any:
+        collection = self._collection
+        generation = client_generation()
+        if collection is None or self._generation != generation:
+            # Re-resolved after `reset_clients()`, e.g. in a worker forked from a parent that had connected.
+            collection = self._collection = self.db[self.collection_name]
+            self._generation = generation
+        return collection
+
+    def declare_indexes(self, indexes: list[IndexSpec]) -> None:
+        """Register indexes this collection needs; the startup index manager creates them."""
+        get_index_manager().register(self, indexes)
 
     @staticmethod
     def _to_object_id(entity_id: ObjectId | str) -> ObjectId:
@@ -37,9 +72,23 @@ class MongoRepository:
         oid = self._to_object_id(entity_id)
         return self.collection.find_one({"_id": oid})
 
-    def read_all(self):
-        """Retrieve all entities in collection"""
-        return self.collection.find()
+    def declared_indexes(self) -> list[IndexSpec]:
+        return get_index_manager().declared().get(f"{self.db_name}.{self.collection_name}", [])
+
+    def read_all(
+        self,
+        query: dict[str, Any] | None = None,
+        projection: dict[str, int] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+    ):
+        """Retrieve entities in collection, all of them by default"""
+        cursor = self.collection.find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit and limit > 0:
+            cursor = cursor.limit(int(limit))
+        return cursor
 
     def update(self, entity_id: ObjectId | str, entity: T):
         """Update existing entity"""
@@ -67,12 +116,42 @@ class MongoRepository:
         result = self.collection.insert_one(document)
         return str(result.inserted_id)
 
+    def insert_many(self, documents: list[dict[str, Any]], ordered: bool = False) -> list[str]:
+        if not documents:
+            return []
+        result = self.collection.insert_many(documents, ordered=ordered)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     def update_fields(self, query: dict[str, Any], fields: dict[str, Any], upsert: bool = False):
         return self.collection.update_one(query, {"$set": fields}, upsert=upsert)
 
+    def update_many_fields(self, query: dict[str, Any], fields: dict[str, Any]):
+        return self.collection.update_many(query, {"$set": fields})
+
+    def find_one_and_update(
+        self,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        sort: list[tuple[str, int]] | None = None,
+    ):
+        """Atomically update the first match and return the updated document."""
+        return self.collection.find_one_and_update(query, update, sort=sort, return_document=ReturnDocument.AFTER)
+
+    def bulk_write(self, operations: list[Any], ordered: bool = False):
+        if not operations:
+            return None
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+    def aggregate(self, pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return list(self.collection.aggregate(pipeline))
+
     def delete_many(self, query: dict[str, Any]):
         return self.collection.delete_many(query)
 
+    def estimated_count(self) -> int:
+        """Collection size from metadata, without scanning."""
+        return int(self.collection.estimated_document_count())
+
     def count_documents(self, query: dict[str, Any], limit: int = 0) -> int:
         if limit and limit > 0:
             return self.collection.count_documents(query, limit=int(limit))
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+from threading import Lock
+from typing import Iterable
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Iterable[str]) -> LabelValues:
+        key = tuple(str(value) for value in labels)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        return key
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class HistogramSnapshot:
+    """Cumulative bucket counts of one label set, plus sum and count."""
+
+    def __init__(self, buckets: tuple[float, ...], counts: list[int], total: float) -> None:
+        self.buckets = buckets
+        self.counts = counts
+        self.sum = total
+
+    @property
+    def count(self) -> int:
+        return self.counts[-1] if self.counts else 0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        index = bisect_left(self.counts, rank)
+        if math.isinf(self.buckets[index]):
+            # Beyond the largest finite bound; report that bound like Prometheus does.
+            return self.buckets[index - 1] if index > 0 else 0.0
+        lower = self.buckets[index - 1] if index > 0 else 0.0
+        below = self.counts[index - 1] if index > 0 else 0
+        in_bucket = self.counts[index] - below
+        if in_bucket <= 0:
+            return self.buckets[index]
+        return lower + (self.buckets[index] - lower) * (rank - below) / in_bucket
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        # Per label set: non-cumulative counts per bucket (last slot is +Inf) and the sum.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][slot] += 1
+            series[1][0] += value
+
+    def snapshot(self) -> dict[LabelValues, HistogramSnapshot]:
+        with self._lock:
+            raw = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+
+        out: dict[LabelValues, HistogramSnapshot] = {}
+        for key, (counts, total) in raw.items():
+            cumulative: list[int] = []
+            running = 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            out[key] = HistogramSnapshot(self.buckets + (math.inf,), cumulative, total)
+        return out
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, snap in sorted(self.snapshot().items()):
+            for bound, count in zip(snap.buckets, snap.counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(snap.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {snap.count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Process-local set of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; registering a name twice returns the first instance."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _REGISTRY
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+from threading import Lock
+from typing import Any
+
+from pymongo import MongoClient
+
+from data.mongo_metrics import get_mongo_command_metrics
+
+
+STORAGE_BACKENDS = ("mongo", "memory")
+
+_CLIENTS: dict[tuple[str, str], Any] = {}
+_CLIENTS_LOCK = Lock()
+# Bumped whenever cached clients are dropped, so repositories know their handles are stale.
+_GENERATION = 0
+
+
+def storage_backend() -> str:
+    """`STORAGE_BACKEND`: `mongo` (default) or `memory` for tests and benchmarks."""
+    value = str(os.getenv("STORAGE_BACKEND") or "mongo").strip().lower() or "mongo"
+    if value not in STORAGE_BACKENDS:
+        raise ValueError(f"STORAGE_BACKEND must be one of {', '.join(STORAGE_BACKENDS)}, got {value!r}")
+    return value
+
+
+def _mongo_url() -> str:
+    return os.getenv("MONGO_URL", "mongodb://localhost:27017")
+
+
+def create_client() -> Any:
+    """New client for the configured backend; both expose the pymongo Database/Collection API."""
+    if storage_backend() == "memory":
+        from data.memory_store import get_memory_client
+
+        return get_memory_client()
+    return MongoClient(_mongo_url(), event_listeners=[get_mongo_command_metrics()])
+
+
+def get_client() -> Any:
+    """Process-wide client, created on first use.
+
+    Repositories share it, so the process holds one connection pool and one set of
+    server monitors instead of one per collection.
+    """
+    backend = storage_backend()
+    key = (backend, _mongo_url() if backend == "mongo" else "")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = create_client()
+        return client
+
+
+def client_generation() -> int:
+    return _GENERATION
+
+
+def reset_clients() -> None:
+    """Forget cached clients (without closing them), so the next use connects afresh."""
+    global _GENERATION
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+        _GENERATION += 1
+
+
+def _after_fork_in_child() -> None:
+    # pymongo clients are not fork-safe: their pools and monitor threads belong to the
+    # parent. The lock may have been held by another thread at fork time, so replace it.
+    global _CLIENTS_LOCK
+    _CLIENTS_LOCK = Lock()
+    reset_clients()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
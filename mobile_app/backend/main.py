@@ -1,5 +1,3 @@
-import uvicorn
-
 # Import DTOs so decorators run and routers get registered
 from data import dto  # noqa: F401
 
@@ -11,4 +9,7 @@ def create_app():
 
 
 if __name__ == "__main__":
+    # Imported here so importing the app (tests, workers, benchmarks) does not load the server.
+    import uvicorn
+
     uvicorn.run(create_app(), host="0.0.0.0", port=8000)
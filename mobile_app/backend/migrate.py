@@ -0,0 +1,51 @@
+"""Apply pending data migrations to the configured storage.
+
+    python migrate.py              # apply everything pending
+    python migrate.py --status     # list migrations and whether they ran
+    python migrate.py --to 1       # stop after version 1
+
+Migrations run in batches and are safe to re-run; a version that is already applied
+is skipped. Run it once per deploy, not from every worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Sequence
+
+from data.migrations import MigrationLocked, get_migration_runner
+from routing.social_migrations import register_social_migrations
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply pending data migrations.")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying any")
+    parser.add_argument("--to", type=int, default=None, help="highest version to apply")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    runner = get_migration_runner()
+    register_social_migrations(runner)
+
+    if args.status:
+        records = runner.records()
+        for migration in runner.migrations():
+            row = records.get(migration.version) or {}
+            print(f"{migration.version:>4}  {migration.name:<30} {row.get('status') or 'pending'}")
+        return 0
+
+    try:
+        applied = runner.run(target=args.to, batch_size=args.batch_size)
+    except MigrationLocked as e:
+        print(f"[MIGRATIONS] {e}")
+        return 1
+    pending = [m.version for m in runner.pending(args.to)]
+    print(f"[MIGRATIONS] Applied {applied or 'nothing'}; pending {pending or 'none'}")
+    return 0 if not pending else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import os
+from threading import Event, Lock, Thread
+from typing import Any, Callable
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from data.config import auth_db_name
+from data.dto import AdminMetricPoint, AdminMetricRecord, AdminMetricsResponse
+from data.indexes import index
+from data.mongo_metrics import command_scope
+from data.mongo_repository import MongoRepository
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_DAY_FORMAT = "%Y-%m-%d"
+
+
+@dataclass(frozen=True)
+class MetricSource:
+    """A collection whose documents are counted per UTC day of `time_field`.
+
+    `stamp_field` is set by the server when a row is written (the ObjectId `_id` by
+    default) and is what the watermark follows, so a row written long after its
+    `time_field` still gets its day recounted.
+    """
+
+    name: str
+    repository: Callable[[], MongoRepository]
+    time_field: str = "created_at"
+    stamp_field: str = "_id"
+
+    def stamp_bounds(self, after: datetime, upto: datetime) -> dict[str, Any]:
+        if self.stamp_field == "_id":
+            # ObjectIds carry whole seconds: rows from `upto`'s second are picked up by the next refresh.
+            return {"$gt": ObjectId.from_datetime(after), "$lte": ObjectId.from_datetime(upto)}
+        return {"$gt": after, "$lte": upto}
+
+
+def _day_bounds(day: str) -> tuple[datetime, datetime]:
+    start = datetime.strptime(day, _DAY_FORMAT).replace(tzinfo=UTC)
+    return start, start + timedelta(days=1)
+
+
+def _as_utc(value: Any) -> datetime | None:
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+class AdminMetricsAggregator:
+    """Maintains per-day counters in a metrics collection from write-time watermarks.
+
+    Each refresh only looks at documents written since the source's watermark to find
+    the touched days, then recounts those days from the time index. Recounting (instead
+    of incrementing) keeps a refresh idempotent if it is interrupted halfway.
+    """
+
+    def __init__(
+        self,
+        metrics: MongoRepository,
+        watermarks: MongoRepository,
+        sources: list[MetricSource],
+        totals: dict[str, Callable[[], int]] | None = None,
+        *,
+        interval_seconds: float = 300.0,
+        settle_seconds: float = 5.0,
+    ) -> None:
+        self.metrics = metrics
+        self.watermarks = watermarks
+        self.sources = sources
+        self.totals = totals or {}
+        self.interval_seconds = interval_seconds
+        self.settle_seconds = settle_seconds
+        self._refresh_lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def declare_indexes(self) -> None:
+        """Declare the counter index and the time index every source is recounted from."""
+        self.metrics.declare_indexes([index("kind", "day")])
+        for source in self.sources:
+            specs = [index(source.time_field)]
+            if source.stamp_field != "_id":
+                specs.append(index(source.stamp_field))
+            source.repository().declare_indexes(specs)
+
+    def _watermark(self, name: str) -> datetime:
+        row = self.watermarks.find_one({"_id": name})
+        return _as_utc((row or {}).get("watermark")) or _EPOCH
+
+    def _refresh_source(self, source: MetricSource, upper: datetime) -> int:
+        watermark = self._watermark(source.name)
+        if watermark >= upper:
+            return 0
+
+        repository = source.repository()
+        field = source.time_field
+        touched = repository.aggregate(
+            [
+                {"$match": {source.stamp_field: source.stamp_bounds(watermark, upper)}},
+                {"$group": {"_id": {"$dateToString": {"format": _DAY_FORMAT, "date": f"${field}"}}}},
+            ]
+        )
+
+        now = datetime.now(UTC)
+        operations = []
+        for row in touched:
+            day = str(row.get("_id") or "")
+            if not day:
+                continue
+            start, end = _day_bounds(day)
+            count = repository.count_documents({field: {"$gte": start, "$lt": end}})
+            operations.append(
+                UpdateOne(
+                    {"_id": f"{source.name}:{day}"},
+                    {"$set": {"kind": "daily", "metric": source.name, "day": day, "count": count, "updated_at": now}},
+                    upsert=True,
+                )
+            )
+
+        self.metrics.bulk_write(operations)
+        self.watermarks.update_fields({"_id": source.name}, {"watermark": upper, "updated_at": now}, upsert=True)
+        return len(operations)
+
+    def refresh(self) -> int:
+        """Recount the days of rows written up to `now - settle_seconds`. Returns the number of day rows written."""
+        with self._refresh_lock, command_scope("task:admin_metrics"):
+            upper = datetime.now(UTC) - timedelta(seconds=self.settle_seconds)
+            written = 0
+            for source in self.sources:
+                try:
+                    written += self._refresh_source(source, upper)
+                except Exception as e:
+                    print(f"[METRICS] Refresh of '{source.name}' failed: {e}")
+
+            values: dict[str, int] = {}
+            for name, counter in self.totals.items():
+                try:
+                    values[name] = int(counter())
+                except Exception as e:
+                    print(f"[METRICS] Total '{name}' failed: {e}")
+            if values:
+                self.metrics.update_fields(
+                    {"_id": "totals"},
+                    {"kind": "totals", "values": values, "updated_at": datetime.now(UTC)},
+                    upsert=True,
+                )
+            return written
+
+    def read(self, days: int) -> AdminMetricsResponse:
+        since = (datetime.now(UTC) - timedelta(days=max(1, days) - 1)).strftime(_DAY_FORMAT)
+        rows = self.metrics.find_many({"kind": "daily", "day": {"$gte": since}})
+        totals_row = self.metrics.find_one({"_id": "totals"}) or {}
+
+        series: dict[str, list[AdminMetricPoint]] = {source.name: [] for source in self.sources}
+        refreshed_at = _as_utc(totals_row.get("updated_at"))
+        for row in sorted(rows, key=lambda item: str(item.get("day") or "")):
+            metric = str(row.get("metric") or "")
+            series.setdefault(metric, []).append(AdminMetricPoint(day=str(row.get("day")), count=int(row.get("count") or 0)))
+            updated_at = _as_utc(row.get("updated_at"))
+            if updated_at and (refreshed_at is None or updated_at > refreshed_at):
+                refreshed_at = updated_at
+
+        return AdminMetricsResponse(
+            refreshed_at=refreshed_at,
+            totals={str(k): int(v) for k, v in (totals_row.get("values") or {}).items()},
+            series=series,
+        )
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.declare_indexes()
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name="admin-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+_AGGREGATOR: AdminMetricsAggregator | None = None
+
+
+def _refresh_interval_seconds() -> float:
+    try:
+        return max(5.0, float(str(os.getenv("ADMIN_METRICS_REFRESH_SECONDS") or "300").strip() or "300"))
+    except ValueError:
+        return 300.0
+
+
+def get_admin_metrics_aggregator() -> AdminMetricsAggregator:
+    global _AGGREGATOR
+    if _AGGREGATOR is not None:
+        return _AGGREGATOR
+
+    from routing.auth_routes import get_auth_user_repository
+    from routing.client_error_routes import get_client_error_ingestor
+    from routing.social_routes import get_social_repositories as social
+
+    _AGGREGATOR = AdminMetricsAggregator(
+        metrics=MongoRepository(collection_name="admin_metrics", model_type=AdminMetricRecord, db_name=auth_db_name()),
+        watermarks=MongoRepository(
+            collection_name="admin_metric_watermarks",
+            model_type=AdminMetricRecord,
+            db_name=auth_db_name(),
+        ),
+        sources=[
+            MetricSource("signups", get_auth_user_repository),
+            MetricSource("spots_created", lambda: social().spots),
+            MetricSource("follows", lambda: social().follows),
+            MetricSource("shares", lambda: social().shares, stamp_field="recorded_at"),
+            MetricSource("support_tickets", lambda: social().support_tickets),
+            MetricSource("error_fingerprints", lambda: get_client_error_ingestor().fingerprints, "first_seen", "updated_at"),
+        ],
+        totals={
+            "users": lambda: get_auth_user_repository().estimated_count(),
+            "spots": lambda: social().spots.estimated_count(),
+            "open_tickets": lambda: social().support_tickets.count_documents({"status": "open"}),
+            "error_fingerprints": lambda: get_client_error_ingestor().fingerprints.estimated_count(),
+        },
+        interval_seconds=_refresh_interval_seconds(),
+    )
+    return _AGGREGATOR
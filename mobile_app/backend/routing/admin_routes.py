@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+
+from data.dto import AdminMetricsResponse
+from data.indexes import get_index_manager
+from data.job_queue import get_job_queue
+from data.mongo_metrics import get_mongo_command_metrics
+from routing.admin_metrics import get_admin_metrics_aggregator
+from routing.admin_setup import get_current_admin_user
+from routing.middleware import get_http_metrics, get_threadpool_probe
+
+
+_ADMIN_ROUTER: APIRouter | None = None
+
+
+def get_admin_router() -> APIRouter:
+    global _ADMIN_ROUTER
+    if _ADMIN_ROUTER is not None:
+        return _ADMIN_ROUTER
+
+    _ADMIN_ROUTER = APIRouter(
+        prefix="/admin",
+        tags=["Admin"],
+        dependencies=[Depends(get_current_admin_user)],
+    )
+
+    @_ADMIN_ROUTER.get("/metrics", response_model=AdminMetricsResponse)
+    def admin_metrics(days: int = Query(default=30, ge=1, le=366)):
+        """Precomputed daily counters and totals; refreshed in the background, never aggregated here."""
+        return get_admin_metrics_aggregator().read(days)
+
+    @_ADMIN_ROUTER.get("/jobs")
+    def job_queue_stats() -> dict[str, Any]:
+        """Background job queue depth and lag per job kind."""
+        return get_job_queue().stats()
+
+    @_ADMIN_ROUTER.get("/http")
+    def http_latency() -> dict[str, Any]:
+        """p50/p95/p99 latency per route, method and status, plus threadpool wait percentiles."""
+        summary = get_http_metrics().latency_summary()
+        probe = get_threadpool_probe()
+        wait = probe.wait.snapshot().get(())
+        summary["threadpool"] = {
+            "busy_threads": probe.busy.values().get((), 0.0),
+            "max_threads": probe.capacity.values().get((), 0.0),
+            "wait_p50_ms": round(wait.quantile(0.5) * 1000, 3) if wait else 0.0,
+            "wait_p99_ms": round(wait.quantile(0.99) * 1000, 3) if wait else 0.0,
+        }
+        return summary
+
+    @_ADMIN_ROUTER.get("/mongo/commands")
+    def mongo_command_stats() -> dict[str, Any]:
+        """Mongo commands per route: counts, documents, bytes, latency and recent slow commands."""
+        return get_mongo_command_metrics().snapshot()
+
+    @_ADMIN_ROUTER.get("/indexes")
+    def index_drift(refresh: bool = Query(default=False)) -> dict[str, Any]:
+        """Declared vs. existing indexes per collection. `refresh` re-reads them without creating any."""
+        manager = get_index_manager()
+        if refresh or not manager.last_report:
+            return manager.reconcile(create=False)
+        return manager.last_report
+
+    return _ADMIN_ROUTER
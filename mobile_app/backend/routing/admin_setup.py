@@ -10,7 +10,7 @@ from bson import ObjectId
 from fastapi import Depends, HTTPException, status
 
 from data.dto import AuthUserRecord
-from routing.auth_routes import password_extension, get_auth_user_repository
+from routing.auth_routes import get_auth_user_repository, get_current_user, password_extension
 
 
 ADMIN_DEFAULT_USERNAME = os.getenv("ADMIN_USERNAME", "admin").strip().lower()
@@ -24,7 +24,7 @@ def _is_admin_user(user_doc: dict) -> bool:
     return bool(user_doc.get("is_admin", False))
 
 
-def get_current_admin_user(current_user: dict = Depends(lambda: None)) -> dict:
+def get_current_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
     """Dependency that requires admin privileges.
     
     Usage:
@@ -32,10 +32,6 @@ def get_current_admin_user(current_user: dict = Depends(lambda: None)) -> dict:
         def admin_endpoint(admin: dict = Depends(get_current_admin_user)):
             ...
     """
-    if current_user is None:
-        from routing.auth_routes import get_current_user
-        current_user = get_current_user()
-    
     if not _is_admin_user(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
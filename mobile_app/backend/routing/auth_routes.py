@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime, timedelta
+import hashlib
 import os
+import secrets
 from typing import Any
 
 from bson import ObjectId
 from fastapi import APIRouter
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from pymongo import ASCENDING
 
+from data.config import auth_db_name
+from data.indexes import index
 from data.mongo_repository import MongoRepository
+from routing.rate_limit import rate_limit
 from routing.router import router_create_auth_sessions
 
 
 _PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 _OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl="/auth/login")
+STREAM_TOKEN_SCOPE = "stream"
 
 
 class TokenExtension:
@@ -25,6 +30,7 @@ class TokenExtension:
         self.secret_key = str(os.getenv("JWT_SECRET") or "change-this-secret").strip() or "change-this-secret"
         self.algorithm = str(os.getenv("JWT_ALGORITHM") or "HS256").strip() or "HS256"
         self.expire_minutes = int(os.getenv("JWT_EXPIRE_MINUTES") or "60")
+        self.stream_expire_seconds = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS") or "60")
 
     def issue_access_token(self, *, user_id: str, username: str) -> str:
         now = datetime.now(UTC)
@@ -36,6 +42,18 @@ class TokenExtension:
         }
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
 
+    def issue_stream_token(self, *, user_id: str) -> str:
+        """Short-lived token that only opens GET /social/events. It travels in the query
+        string, so it ends up in access logs; access tokens must never be sent that way."""
+        now = datetime.now(UTC)
+        payload = {
+            "sub": str(user_id),
+            "scope": STREAM_TOKEN_SCOPE,
+            "iat": int(now.timestamp()),
+            "exp": int((now + timedelta(seconds=self.stream_expire_seconds)).timestamp()),
+        }
+        return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+
     def decode_access_token(self, token: str) -> dict[str, Any]:
         return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
 
@@ -50,14 +68,93 @@ class PasswordExtension:
         return _PWD_CONTEXT.verify(str(plain_password or ""), str(hashed_password or ""))
 
 
+class SessionExtension:
+    """Long-lived refresh tokens, so an expired access token does not cost a password login.
+
+    Only a SHA-256 of each token is stored: tokens are 256 random bits, so a fast hash is
+    enough and a refresh costs one indexed update instead of a bcrypt verify. Every
+    refresh rotates the token. Presenting a rotated token again (after a short grace
+    period for concurrent refreshes) revokes the whole chain, since one of the two
+    holders has a stolen copy.
+    """
+
+    def __init__(self) -> None:
+        self.expire_days = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS") or "30")
+        self.reuse_grace_seconds = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS") or "10")
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(str(token or "").encode("utf-8")).hexdigest()
+
+    @property
+    def repository(self) -> MongoRepository:
+        return _session_repository_instance()
+
+    def issue(self, *, user_id: str, username: str, family_id: str | None = None) -> str:
+        token = secrets.token_urlsafe(32)
+        now = datetime.now(UTC)
+        self.repository.insert_one(
+            {
+                "user_id": str(user_id),
+                "username": str(username or ""),
+                "token_hash": self._hash(token),
+                "family_id": family_id or secrets.token_hex(12),
+                "created_at": now,
+                "expires_at": now + timedelta(days=self.expire_days),
+                "rotated_at": None,
+                "revoked_at": None,
+            }
+        )
+        return token
+
+    def rotate(self, token: str) -> tuple[str, dict[str, Any]] | None:
+        """New refresh token and the session it replaces, or None if `token` is not usable."""
+        now = datetime.now(UTC)
+        token_hash = self._hash(token)
+        session = self.repository.find_one_and_update(
+            {"token_hash": token_hash, "rotated_at": None, "revoked_at": None, "expires_at": {"$gt": now}},
+            {"$set": {"rotated_at": now}},
+        )
+        if session is None:
+            self._detect_reuse(token_hash, now)
+            return None
+        new_token = self.issue(user_id=session["user_id"], username=session.get("username", ""), family_id=session["family_id"])
+        return new_token, session
+
+    def _detect_reuse(self, token_hash: str, now: datetime) -> None:
+        session = self.repository.find_one({"token_hash": token_hash})
+        if not session or session.get("revoked_at") or not session.get("rotated_at"):
+            return
+        rotated_at = session["rotated_at"]
+        if rotated_at.tzinfo is None:
+            rotated_at = rotated_at.replace(tzinfo=UTC)
+        if (now - rotated_at).total_seconds() <= self.reuse_grace_seconds:
+            return
+        print(f"[AUTH] Rotated refresh token reused for user {session.get('user_id')}; revoking its session chain")
+        self.revoke_family(session["family_id"])
+
+    def revoke_family(self, family_id: str) -> None:
+        self.repository.update_many_fields({"family_id": family_id, "revoked_at": None}, {"revoked_at": datetime.now(UTC)})
+
+    def revoke(self, token: str) -> bool:
+        """Log out the session chain `token` belongs to."""
+        session = self.repository.find_one({"token_hash": self._hash(token)}, {"family_id": 1})
+        if not session:
+            return False
+        self.revoke_family(session["family_id"])
+        return True
+
+    def revoke_user(self, user_id: str) -> None:
+        """Log out every session of a user, e.g. after a password change."""
+        self.repository.update_many_fields({"user_id": str(user_id), "revoked_at": None}, {"revoked_at": datetime.now(UTC)})
+
+
 token_extension = TokenExtension()
 password_extension = PasswordExtension()
+session_extension = SessionExtension()
 _auth_router: APIRouter | None = None
 _auth_repository: MongoRepository | None = None
-
-
-def _auth_db_name() -> str:
-    return str(os.getenv("MONGO_AUTH_DB") or "SpotOnSightAuth").strip() or "SpotOnSightAuth"
+_session_repository: MongoRepository | None = None
 
 
 def _auth_repository_instance() -> MongoRepository:
@@ -70,16 +167,40 @@ def _auth_repository_instance() -> MongoRepository:
     repo = MongoRepository(
         collection_name="users",
         model_type=AuthUserRecord,
-        db_name=_auth_db_name(),
+        db_name=auth_db_name(),
+        indexes=[
+            index("username", unique=True),
+            index("email", unique=True),
+            index("display_name"),
+            index("created_at"),
+        ],
     )
-    repo.collection.create_index([("username", ASCENDING)], unique=True)
-    repo.collection.create_index([("email", ASCENDING)], unique=True)
-    repo.collection.create_index([("display_name", ASCENDING)])
 
     _auth_repository = repo
     return _auth_repository
 
 
+def _session_repository_instance() -> MongoRepository:
+    global _session_repository
+    if _session_repository is not None:
+        return _session_repository
+
+    from data.dto import AuthSessionRecord
+
+    _session_repository = MongoRepository(
+        collection_name="sessions",
+        model_type=AuthSessionRecord,
+        db_name=auth_db_name(),
+        indexes=[
+            index("token_hash", unique=True),
+            index("family_id"),
+            index("user_id"),
+            index("expires_at", ttl_seconds=0),
+        ],
+    )
+    return _session_repository
+
+
 def get_auth_user_repository() -> MongoRepository:
     return _auth_repository_instance()
 
@@ -91,7 +212,8 @@ def _find_user_by_id(user_id: str) -> dict[str, Any] | None:
     return _auth_repository_instance().find_one({"_id": ObjectId(text)})
 
 
-def get_current_user(token: str = Depends(_OAUTH2_SCHEME)) -> dict[str, Any]:
+def _user_for_token(token: str, scope: str | None = None) -> dict[str, Any]:
+    """User a token belongs to; `scope` None means an access token."""
     credentials_error = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired token",
@@ -102,6 +224,8 @@ def get_current_user(token: str = Depends(_OAUTH2_SCHEME)) -> dict[str, Any]:
         payload = token_extension.decode_access_token(token)
     except JWTError as e:
         raise credentials_error from e
+    if payload.get("scope") != scope:
+        raise credentials_error
 
     user_id = str(payload.get("sub") or "").strip()
     if not user_id:
@@ -114,13 +238,39 @@ def get_current_user(token: str = Depends(_OAUTH2_SCHEME)) -> dict[str, Any]:
     return user_doc
 
 
+def get_current_user(token: str = Depends(_OAUTH2_SCHEME)) -> dict[str, Any]:
+    return _user_for_token(token)
+
+
+def get_current_user_for_stream(
+    authorization: str | None = Header(default=None),
+    stream_token: str | None = Query(default=None, max_length=4096),
+) -> dict[str, Any]:
+    """Like `get_current_user`, but browser EventSource connections cannot set an
+    Authorization header, so they pass a `?stream_token=` from POST /social/events/token
+    instead. Access tokens are not accepted in the query string."""
+    scheme, _, token = str(authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return _user_for_token(token.strip())
+    return _user_for_token(str(stream_token or "").strip(), STREAM_TOKEN_SCOPE)
+
+
 def get_auth_router() -> APIRouter:
     global _auth_router
     if _auth_router is not None:
         return _auth_router
 
-    from data.dto import AuthTokenResponse, LoginRequest, RegisterRequest, UserPublic
+    from data.dto import (
+        AuthTokenResponse,
+        LoginRequest,
+        RefreshRequest,
+        RefreshTokenResponse,
+        RegisterRequest,
+        UserPublic,
+    )
 
+    # Declares the sessions indexes before the startup index reconciliation runs.
+    _session_repository_instance()
     _auth_router = router_create_auth_sessions(
         repository=_auth_repository_instance(),
         register_model=RegisterRequest,
@@ -129,7 +279,14 @@ def get_auth_router() -> APIRouter:
         token_response_model=AuthTokenResponse,
         token_extension=token_extension,
         password_extension=password_extension,
+        session_extension=session_extension,
+        refresh_model=RefreshRequest,
+        refresh_response_model=RefreshTokenResponse,
         prefix="/auth",
         tags=["Auth"],
+        endpoint_dependencies={
+            "register": [Depends(rate_limit("auth.register"))],
+            "login": [Depends(rate_limit("auth.login"))],
+        },
     )
     return _auth_router
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+import os
+from threading import Event, Lock, Thread
+from typing import Callable, Hashable, Iterable
+import uuid
+
+from pymongo.errors import PyMongoError
+
+from data.config import auth_db_name, env_int
+from data.indexes import index
+from data.mongo_repository import MongoRepository
+
+
+CACHE_INVALIDATION_MODES = ("auto", "off", "mongo")
+
+
+class InvalidationClock:
+    """Per-key invalidation times, so a cache fill only loses to invalidations of its own key.
+
+    Callers read `now()` before loading and pass it to `is_current()` before storing.
+    Only the most recently invalidated `max_keys` keys are remembered; forgetting one
+    raises a floor that rejects every fill started before it, which errs on the side
+    of not caching. Not thread-safe; callers hold their cache lock.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max(1, int(max_keys))
+        self._now = 0
+        self._floor = 0
+        self._touched: OrderedDict[Hashable, int] = OrderedDict()
+
+    def now(self) -> int:
+        return self._now
+
+    def touch(self, keys: Iterable[Hashable]) -> None:
+        self._now += 1
+        for key in keys:
+            self._touched[key] = self._now
+            self._touched.move_to_end(key)
+        while len(self._touched) > self.max_keys:
+            _, touched_at = self._touched.popitem(last=False)
+            self._floor = max(self._floor, touched_at)
+
+    def reset(self) -> None:
+        self._now += 1
+        self._floor = self._now
+        self._touched.clear()
+
+    def is_current(self, key: Hashable, started: int) -> bool:
+        return started >= self._floor and self._touched.get(key, 0) <= started
+
+
+class CacheInvalidationRelay:
+    """Cross-worker cache invalidation through a small Mongo collection.
+
+    Each cache subscribes on its own channel (`graph`, `tiles`). Local invalidations
+    are written as `{channel, keys}` messages; every worker polls for messages from
+    other workers and hands the keys to the channel's handler. Messages expire after
+    an hour.
+    """
+
+    def __init__(self, repository: MongoRepository, poll_seconds: float = 1.0) -> None:
+        self.repository = repository
+        self.poll_seconds = max(0.1, float(poll_seconds))
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, Callable[[list[str]], None]] = {}
+        self._since = datetime.now(UTC)
+        self._thread: Thread | None = None
+        self._stop = Event()
+        self._lock = Lock()
+        self.repository.declare_indexes([index("created_at", ttl_seconds=3600)])
+
+    def subscribe(self, channel: str, apply: Callable[[list[str]], None]) -> Callable[[Iterable[str]], None]:
+        """Route `channel` messages from other workers to `apply`; returns the channel's publisher."""
+        self._handlers[channel] = apply
+        return lambda keys: self.publish(channel, keys)
+
+    def publish(self, channel: str, keys: Iterable[str]) -> None:
+        try:
+            self.repository.insert_one(
+                {"channel": channel, "keys": sorted(set(keys)), "origin": self.origin, "created_at": datetime.now(UTC)}
+            )
+        except PyMongoError as e:
+            print(f"[CACHE] Could not publish {channel} cache invalidation: {e}")
+
+    def poll_once(self) -> int:
+        """Apply messages from other workers written since the last poll; returns how many."""
+        started = datetime.now(UTC)
+        # Reach back a little for messages committed after a concurrent poll read past them;
+        # applying one twice only costs a reload.
+        rows = self.repository.find_many(
+            {"created_at": {"$gte": self._since - timedelta(seconds=2)}, "origin": {"$ne": self.origin}},
+            {"channel": 1, "keys": 1},
+        )
+        for row in rows:
+            apply = self._handlers.get(str(row.get("channel") or ""))
+            if apply is not None:
+                apply([str(key) for key in row.get("keys") or []])
+        self._since = started
+        return len(rows)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll_once()
+            except PyMongoError as e:
+                print(f"[CACHE] Could not poll cache invalidations: {e}")
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._since = datetime.now(UTC)
+            self._thread = Thread(target=self._poll_loop, name="cache-invalidations", daemon=True)
+            self._thread.start()
+            print(f"[CACHE] Relaying {', '.join(sorted(self._handlers))} cache invalidations through Mongo")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=timeout)
+                self._thread = None
+
+
+def cache_invalidation_mode() -> str:
+    """`CACHE_INVALIDATION`: `auto` (default; `mongo` when serve.py runs several workers), `off` or `mongo`."""
+    value = str(os.getenv("CACHE_INVALIDATION") or "auto").strip().lower() or "auto"
+    if value not in CACHE_INVALIDATION_MODES:
+        raise ValueError(f"CACHE_INVALIDATION must be one of {', '.join(CACHE_INVALIDATION_MODES)}, got {value!r}")
+    if value == "auto":
+        return "mongo" if env_int("SERVER_WORKERS", 1) > 1 else "off"
+    return value
+
+
+_CACHE_RELAY: CacheInvalidationRelay | None = None
+
+
+def get_cache_invalidation_relay() -> CacheInvalidationRelay | None:
+    """The relay when cross-worker invalidation is on, wired into the graph and tile caches; otherwise None."""
+    global _CACHE_RELAY
+    if _CACHE_RELAY is None and cache_invalidation_mode() == "mongo":
+        from data.dto import CacheInvalidationRecord
+        from routing.social_graph import get_social_graph_cache
+        from routing.spot_tiles import get_spot_tile_cache, parse_tile_key, tile_key_text
+
+        _CACHE_RELAY = CacheInvalidationRelay(
+            MongoRepository(
+                collection_name="cache_invalidations",
+                model_type=CacheInvalidationRecord,
+                db_name=auth_db_name(),
+            ),
+            poll_seconds=env_int("CACHE_INVALIDATION_POLL_MS", 1000) / 1000,
+        )
+        graph_cache = get_social_graph_cache()
+        publish_graph = _CACHE_RELAY.subscribe("graph", lambda keys: graph_cache.invalidate(*keys, broadcast=False))
+        graph_cache.add_listener(publish_graph)
+
+        tile_cache = get_spot_tile_cache()
+        publish_tiles = _CACHE_RELAY.subscribe(
+            "tiles",
+            lambda keys: tile_cache.invalidate_tiles(
+                [key for key in map(parse_tile_key, keys) if key is not None], broadcast=False
+            ),
+        )
+        tile_cache.add_listener(lambda keys: publish_tiles(tile_key_text(key) for key in keys))
+    return _CACHE_RELAY
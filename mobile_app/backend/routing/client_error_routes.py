@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import hashlib
+import re
+from threading import Event, Lock, Thread
+from typing import Any
+
+from fastapi import APIRouter, Depends, status
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from data.config import env_int
+from data.dto import ClientErrorBatchRequest, ClientErrorFingerprintRecord, ClientErrorReport
+from data.indexes import index
+from data.mongo_metrics import command_scope
+from data.mongo_repository import MongoRepository
+from routing.auth_routes import get_current_user
+
+
+_MAX_FINGERPRINT_FRAMES = 12
+_SAMPLES_PER_FINGERPRINT = 5
+_SAMPLE_STACKTRACE_CHARS = 8000
+
+_URL_HOST_RE = re.compile(r"\b[a-z][a-z0-9+.-]*://[^/\s)]+", re.IGNORECASE)
+_QUERY_RE = re.compile(r"[?#][^\s:)]*")
+_BUNDLE_HASH_RE = re.compile(r"[-.][0-9a-f]{6,}(?=\.(?:js|mjs|css)\b)", re.IGNORECASE)
+_HEX_RE = re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def normalize_stacktrace(stacktrace: str, max_frames: int = _MAX_FINGERPRINT_FRAMES) -> str:
+    """Top frames with hosts, query strings, bundle hashes, addresses and line numbers removed."""
+    frames: list[str] = []
+    for raw_line in str(stacktrace or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        line = _URL_HOST_RE.sub("", line)
+        line = _QUERY_RE.sub("", line)
+        line = _BUNDLE_HASH_RE.sub("", line)
+        line = _HEX_RE.sub("0x?", line)
+        line = _NUMBER_RE.sub("N", line)
+        frames.append(line)
+        if len(frames) >= max_frames:
+            break
+    return "\n".join(frames)
+
+
+def error_fingerprint(report: ClientErrorReport) -> str:
+    normalized = normalize_stacktrace(report.stacktrace) or _NUMBER_RE.sub("N", report.message.strip())
+    key = "\x1f".join([report.kind, report.source, report.exception_type or "", normalized])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _reported_at(report: ClientErrorReport, received_at: datetime) -> datetime:
+    reported_at = report.created_at or received_at
+    return reported_at if reported_at.tzinfo is not None else reported_at.replace(tzinfo=UTC)
+
+
+def _sample(report: ClientErrorReport, received_at: datetime) -> dict[str, Any]:
+    return {
+        "message": report.message,
+        "stacktrace": report.stacktrace[:_SAMPLE_STACKTRACE_CHARS],
+        "context": report.context,
+        "platform": report.platform,
+        "python_version": report.python_version,
+        "created_at": received_at,
+        "reported_at": _reported_at(report, received_at),
+    }
+
+
+@dataclass
+class _PendingFingerprint:
+    first: ClientErrorReport
+    count: int = 0
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ClientErrorIngestor:
+    """Write-behind buffer that aggregates client error reports by fingerprint.
+
+    Identical reports only bump an in-memory counter until the next flush, which
+    writes one upsert per fingerprint and one raw sample report per fingerprint.
+    `created_at`, `first_seen` and `last_seen` are server receive times, since the
+    retention TTL runs on `created_at`; the client's own timestamp is kept as `reported_at`.
+    """
+
+    def __init__(
+        self,
+        reports: MongoRepository,
+        fingerprints: MongoRepository,
+        *,
+        flush_interval: float = 2.0,
+        max_pending: int = 2000,
+        retention_days: int = 30,
+    ) -> None:
+        self.reports = reports
+        self.fingerprints = fingerprints
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, int(max_pending))
+        self.retention_days = max(1, int(retention_days))
+        self._pending: dict[str, _PendingFingerprint] = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self.reports.declare_indexes(
+            [
+                index("created_at", ttl_seconds=self.retention_days * 86400),
+                index("fingerprint", "created_at"),
+            ]
+        )
+        self.fingerprints.declare_indexes([index("last_seen"), index("first_seen")])
+
+    def submit(self, reports: list[ClientErrorReport]) -> int:
+        flush_now = False
+        received_at = datetime.now(UTC)
+        with self._lock:
+            for report in reports:
+                fingerprint = error_fingerprint(report)
+                entry = self._pending.get(fingerprint)
+                if entry is None:
+                    entry = self._pending[fingerprint] = _PendingFingerprint(first=report, first_seen=received_at)
+                entry.count += 1
+                entry.last_seen = max(entry.last_seen or received_at, received_at)
+                if len(entry.samples) < _SAMPLES_PER_FINGERPRINT:
+                    entry.samples.append(_sample(report, received_at))
+            flush_now = len(self._pending) >= self.max_pending
+
+        if flush_now:
+            self.flush()
+        return len(reports)
+
+    def flush(self) -> int:
+        """Write buffered aggregates. Returns the number of reports written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            now = datetime.now(UTC)
+            operations = []
+            raw_samples = []
+            for fingerprint, entry in pending.items():
+                report = entry.first
+                operations.append(
+                    UpdateOne(
+                        {"_id": fingerprint},
+                        {
+                            "$inc": {"count": entry.count},
+                            "$max": {"last_seen": entry.last_seen},
+                            "$min": {"first_seen": entry.first_seen},
+                            "$set": {"message": report.message[:2000], "updated_at": now},
+                            "$setOnInsert": {
+                                "kind": report.kind,
+                                "source": report.source,
+                                "exception_type": report.exception_type,
+                                "normalized_stacktrace": normalize_stacktrace(report.stacktrace),
+                            },
+                            "$push": {
+                                "samples": {"$each": entry.samples, "$slice": -_SAMPLES_PER_FINGERPRINT},
+                            },
+                        },
+                        upsert=True,
+                    )
+                )
+                raw = report.model_dump(exclude_none=True)
+                raw["message"] = report.message[:2000]
+                raw["stacktrace"] = report.stacktrace[:_SAMPLE_STACKTRACE_CHARS]
+                raw["fingerprint"] = fingerprint
+                raw["occurrences"] = entry.count
+                raw["reported_at"] = _reported_at(report, entry.last_seen)
+                raw["created_at"] = entry.last_seen
+                raw_samples.append(raw)
+
+            # Counts first. Only the upserts that failed are requeued, so the ones that
+            # succeeded are not counted again on the next flush.
+            fingerprints = list(pending)
+            try:
+                with command_scope("task:client_error_flush"):
+                    self.fingerprints.bulk_write(operations)
+            except BulkWriteError as e:
+                failed = {fingerprints[int(error["index"])] for error in (e.details or {}).get("writeErrors") or []}
+                print(f"[CLIENT-ERRORS] Flush of {len(failed)} of {len(pending)} fingerprint(s) failed: {e}")
+                self._requeue({fingerprint: pending[fingerprint] for fingerprint in failed})
+                pending = {fingerprint: entry for fingerprint, entry in pending.items() if fingerprint not in failed}
+                raw_samples = [raw for raw in raw_samples if raw["fingerprint"] not in failed]
+            except Exception as e:
+                print(f"[CLIENT-ERRORS] Flush of {len(pending)} fingerprint(s) failed: {e}")
+                self._requeue(pending)
+                return 0
+
+            # Raw samples are best-effort once their counts are stored; requeueing them
+            # would add the same reports to the counts again.
+            try:
+                with command_scope("task:client_error_flush"):
+                    self.reports.insert_many(raw_samples)
+            except Exception as e:
+                print(f"[CLIENT-ERRORS] Writing {len(raw_samples)} sample report(s) failed: {e}")
+            return sum(entry.count for entry in pending.values())
+
+    def _requeue(self, pending: dict[str, _PendingFingerprint]) -> None:
+        with self._lock:
+            for fingerprint, entry in pending.items():
+                current = self._pending.get(fingerprint)
+                if current is None:
+                    self._pending[fingerprint] = entry
+                    continue
+                current.count += entry.count
+                current.first_seen = min(current.first_seen or entry.first_seen, entry.first_seen)
+                current.last_seen = max(current.last_seen or entry.last_seen, entry.last_seen)
+                current.samples = (entry.samples + current.samples)[:_SAMPLES_PER_FINGERPRINT]
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._flush_loop, name="client-error-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            self.flush()
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+_INGESTOR: ClientErrorIngestor | None = None
+_CLIENT_ERROR_ROUTER: APIRouter | None = None
+
+
+def get_client_error_ingestor() -> ClientErrorIngestor:
+    global _INGESTOR
+    if _INGESTOR is None:
+        _INGESTOR = ClientErrorIngestor(
+            reports=MongoRepository(collection_name="client_error_reports", model_type=ClientErrorReport),
+            fingerprints=MongoRepository(
+                collection_name="client_error_fingerprints",
+                model_type=ClientErrorFingerprintRecord,
+            ),
+            flush_interval=max(1, env_int("CLIENT_ERROR_FLUSH_SECONDS", 2)),
+            max_pending=env_int("CLIENT_ERROR_MAX_PENDING", 2000),
+            retention_days=env_int("CLIENT_ERROR_RETENTION_DAYS", 30),
+        )
+    return _INGESTOR
+
+
+def get_client_error_router() -> APIRouter:
+    global _CLIENT_ERROR_ROUTER
+    if _CLIENT_ERROR_ROUTER is not None:
+        return _CLIENT_ERROR_ROUTER
+
+    _CLIENT_ERROR_ROUTER = APIRouter(
+        prefix="/client-errors",
+        tags=["ClientErrors"],
+        dependencies=[Depends(get_current_user)],
+    )
+
+    @_CLIENT_ERROR_ROUTER.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+    def ingest_client_errors(req: ClientErrorBatchRequest):
+        """Buffer a batch of reports; they are written asynchronously, grouped by fingerprint."""
+        accepted = get_client_error_ingestor().submit(req.reports)
+        return {"accepted": accepted}
+
+    return _CLIENT_ERROR_ROUTER
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Type, Union, get_args, get_origin
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from data.indexes import IndexSpec
+
+
+CRUD_QUERY_DEFAULT_LIMIT = 100
+CRUD_QUERY_MAX_LIMIT = 1000
+
+# `field__op=value` range and set filters; a bare `field=value` is equality.
+_OPERATORS = {"gt": "$gt", "gte": "$gte", "lt": "$lt", "lte": "$lte", "ne": "$ne", "in": "$in"}
+# Shorthands for the common "what happened recently" query on timestamped models.
+_TIME_ALIASES = {"since": ("created_at", "$gte"), "until": ("created_at", "$lt")}
+_RESERVED = ("sort", "fields", "limit", "after")
+
+
+@dataclass(frozen=True)
+class CrudQuery:
+    filter: dict[str, Any]
+    sort: list[tuple[str, int]]
+    projection: dict[str, int] | None
+    limit: int
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _scalar_annotation(annotation: Any) -> Any:
+    """Type a single query value is parsed as: list fields match by element, Optional is unwrapped."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _scalar_annotation(args[0]) if len(args) == 1 else annotation
+    if origin in (list, tuple, set, frozenset):
+        args = get_args(annotation)
+        return _scalar_annotation(args[0]) if args else Any
+    return annotation
+
+
+def _parse_value(model: Type[BaseModel], field: str, raw: str) -> Any:
+    annotation = _scalar_annotation(model.model_fields[field].annotation)
+    if get_origin(annotation) is dict or annotation is dict:
+        raise _bad_request(f"Cannot filter on {field}")
+    try:
+        return TypeAdapter(annotation).validate_python(raw)
+    except ValidationError as e:
+        raise _bad_request(f"Invalid value for {field}: {raw!r}") from e
+
+
+def _index_serves_sort(spec: IndexSpec, equality_fields: set[str], sort: list[tuple[str, int]]) -> bool:
+    """Whether walking `spec` returns rows in `sort` order: leading keys pinned by equality
+    filters may be skipped, then the sort keys must follow in order, all in the index's
+    direction or all reversed."""
+    keys = [(field, direction) for field, direction in spec.keys if direction in (1, -1)]
+    if len(keys) != len(spec.keys):
+        return False
+    position = 0
+    while position < len(keys) and keys[position][0] in equality_fields and keys[position][0] != sort[0][0]:
+        position += 1
+    remaining = keys[position:position + len(sort)]
+    if [field for field, _ in remaining] != [field for field, _ in sort]:
+        return False
+    flips = {index_direction * direction for (_, index_direction), (_, direction) in zip(remaining, sort)}
+    return len(flips) == 1
+
+
+def _index_bounds_filter(spec: IndexSpec, query: dict[str, Any]) -> bool:
+    """Whether `spec` narrows the scan for `query`: its leading field is filtered, by
+    anything but `$ne`. Other filters are then checked only on the rows it returns."""
+    if not spec.keys or spec.keys[0][0] not in query:
+        return False
+    condition = query[spec.keys[0][0]]
+    return not isinstance(condition, dict) or any(op != "$ne" for op in condition)
+
+
+def parse_crud_query(
+    params: Iterable[tuple[str, str]] | Mapping[str, str],
+    model: Type[BaseModel],
+    indexes: list[IndexSpec],
+) -> CrudQuery:
+    """Query parameters of a generic list route, validated against `model` and `indexes`.
+
+        ?kind=exception&created_at__gte=2026-01-01&sort=-created_at&fields=kind,message&limit=50
+
+    Filters are equality (`field=value`) or `field__gt|gte|lt|lte|ne|in` on model fields,
+    with values parsed as the field's type; `since`/`until` filter `created_at`. At least
+    one filter must be on the leading field of a declared index, so a filter never scans
+    the collection; further filters, indexed or not, only check the rows that index
+    returns. `sort` takes comma-separated fields (`-` for descending) and is rejected
+    unless a declared index returns rows in that order, so a sort never scans and sorts
+    in memory. Without `sort`, rows come in `_id` order, and `after=<_id>` (with no sort,
+    `sort=_id` or `sort=-_id`) continues from the last row of the previous page.
+    """
+    items = list(params.items()) if isinstance(params, Mapping) else list(params)
+    fields = model.model_fields
+    query: dict[str, Any] = {}
+    sort_spec = fields_spec = limit_spec = after_spec = None
+
+    for name, raw in items:
+        if name in _RESERVED:
+            if name == "sort":
+                sort_spec = raw
+            elif name == "fields":
+                fields_spec = raw
+            elif name == "after":
+                after_spec = raw
+            else:
+                limit_spec = raw
+            continue
+        if name in _TIME_ALIASES and "created_at" in fields:
+            field, op = _TIME_ALIASES[name]
+        else:
+            field, _, suffix = name.partition("__")
+            if suffix and suffix not in _OPERATORS:
+                raise _bad_request(f"Unknown filter operator {suffix!r}")
+            op = _OPERATORS[suffix] if suffix else "$eq"
+        if field not in fields:
+            raise _bad_request(f"Unknown filter field {field!r}")
+
+        if op == "$in":
+            value: Any = [_parse_value(model, field, part.strip()) for part in raw.split(",") if part.strip()]
+        else:
+            value = _parse_value(model, field, raw)
+        condition = query.setdefault(field, {})
+        if op in condition:
+            raise _bad_request(f"Duplicate filter on {field}")
+        condition[op] = value
+
+    # Plain equalities stay plain values, which is also what lets them pin an index prefix.
+    for field, condition in list(query.items()):
+        if list(condition) == ["$eq"]:
+            query[field] = condition["$eq"]
+    equality_fields = {field for field, condition in query.items() if not isinstance(condition, dict)}
+    if query and not any(_index_bounds_filter(spec, query) for spec in indexes):
+        leading = sorted({spec.keys[0][0] for spec in indexes if spec.keys})
+        raise _bad_request(f"Filters need one of the indexed fields: {', '.join(leading) or 'none declared'}")
+
+    sort: list[tuple[str, int]] = []
+    if sort_spec:
+        for part in sort_spec.split(","):
+            part = part.strip()
+            field = part.lstrip("-")
+            if not field:
+                continue
+            if field not in fields and field != "_id":
+                raise _bad_request(f"Unknown sort field {field!r}")
+            sort.append((field, -1 if part.startswith("-") else 1))
+    if sort and sort != [("_id", sort[0][1])]:
+        if not any(_index_serves_sort(spec, equality_fields, sort) for spec in indexes):
+            raise _bad_request(f"No declared index supports sort {sort_spec!r}")
+    if not sort:
+        sort = [("_id", 1)]
+
+    if after_spec is not None:
+        if sort != [("_id", sort[0][1])]:
+            raise _bad_request("after pages by _id; use it without sort or with sort=_id or sort=-_id")
+        if not ObjectId.is_valid(after_spec.strip()):
+            raise _bad_request(f"Invalid after id: {after_spec!r}")
+        query["_id"] = {"$gt" if sort[0][1] == 1 else "$lt": ObjectId(after_spec.strip())}
+
+    projection: dict[str, int] | None = None
+    if fields_spec:
+        wanted = [part.strip() for part in fields_spec.split(",") if part.strip()]
+        unknown = [field for field in wanted if field not in fields]
+        if unknown:
+            raise _bad_request(f"Unknown fields {', '.join(unknown)}")
+        projection = {field: 1 for field in wanted}
+
+    limit = CRUD_QUERY_DEFAULT_LIMIT
+    if limit_spec is not None:
+        try:
+            limit = int(limit_spec)
+        except ValueError as e:
+            raise _bad_request("limit must be an integer") from e
+        if not 1 <= limit <= CRUD_QUERY_MAX_LIMIT:
+            raise _bad_request(f"limit must be between 1 and {CRUD_QUERY_MAX_LIMIT}")
+
+    return CrudQuery(filter=query, sort=sort, projection=projection, limit=limit)
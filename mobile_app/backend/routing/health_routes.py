@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+import os
+from pathlib import Path
+from threading import Event, Lock, Thread
+import time
+from typing import Any
+
+from fastapi import APIRouter, Response, status
+
+from data.config import env_float, env_int
+from data.indexes import get_index_manager
+from data.mongo_metrics import command_scope
+from data.storage import get_client
+
+
+_HEALTH_ROUTER: APIRouter | None = None
+
+
+def _ready_dir() -> str:
+    return str(os.getenv("SERVER_READY_DIR") or "").strip()
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process there; rely on markers removed at shutdown.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Readiness:
+    """Warm-up run once per process before it reports ready.
+
+    Opens storage connections up front (so the first requests do not pay for the
+    handshake and server selection) and waits for the index reconciliation that the
+    lifespan started. Storage failures are retried; a slow index build only delays
+    readiness up to `index_timeout_seconds`.
+    """
+
+    def __init__(self, pool_connections: int = 4, index_timeout_seconds: float = 30.0, retry_seconds: float = 2.0) -> None:
+        self.pool_connections = max(1, pool_connections)
+        self.index_timeout_seconds = max(0.0, index_timeout_seconds)
+        self.retry_seconds = max(0.1, retry_seconds)
+        self.ready = Event()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._lock = Lock()
+        self._steps: dict[str, dict[str, Any]] = {}
+        self.started_at: datetime | None = None
+
+    def _record(self, step: str, started: float, **details: Any) -> None:
+        with self._lock:
+            self._steps[step] = {"ms": round((time.perf_counter() - started) * 1000, 3), **details}
+
+    def _open_connections(self) -> None:
+        client = get_client()
+        # Concurrent pings check out distinct pooled connections, leaving them open.
+        with ThreadPoolExecutor(max_workers=self.pool_connections, thread_name_prefix="warmup") as pool:
+            list(pool.map(lambda _: client.admin.command("ping"), range(self.pool_connections)))
+
+    def warm_up(self) -> None:
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                with command_scope("task:warmup"):
+                    self._open_connections()
+                self._record("storage", started, connections=self.pool_connections)
+                break
+            except Exception as e:
+                self._record("storage", started, error=f"{e.__class__.__name__}: {e}")
+                print(f"[STARTUP] Storage not reachable yet: {e}")
+                self._stop.wait(self.retry_seconds)
+        if self._stop.is_set():
+            return
+
+        started = time.perf_counter()
+        finished = get_index_manager().ready.wait(self.index_timeout_seconds)
+        self._record("indexes", started, finished=finished)
+        if not finished:
+            print(f"[STARTUP] Index reconciliation still running after {self.index_timeout_seconds}s; reporting ready anyway")
+
+        self.ready.set()
+        self._mark_worker_ready()
+        print(f"[STARTUP] Ready after {self.uptime_seconds():.2f}s")
+
+    def _mark_worker_ready(self) -> None:
+        ready_dir = _ready_dir()
+        if not ready_dir:
+            return
+        try:
+            Path(ready_dir, str(os.getpid())).touch()
+        except OSError as e:
+            print(f"[STARTUP] Could not record worker readiness in {ready_dir}: {e}")
+
+    def _clear_worker_ready(self) -> None:
+        ready_dir = _ready_dir()
+        if ready_dir:
+            Path(ready_dir, str(os.getpid())).unlink(missing_ok=True)
+
+    def workers(self) -> dict[str, int]:
+        """Running workers started by serve.py that completed a warm-up; 1/1 when running single-process.
+
+        Markers of workers that exited (recycled by MAX_REQUESTS, or crashed before they
+        could remove their own) are not counted and are deleted.
+        """
+        expected = max(1, env_int("SERVER_WORKERS", 1))
+        ready_dir = _ready_dir()
+        if not ready_dir:
+            return {"expected": 1, "warmed_up": int(self.ready.is_set())}
+        warmed_up = 0
+        try:
+            for entry in Path(ready_dir).iterdir():
+                if not entry.name.isdigit():
+                    continue
+                if _pid_alive(int(entry.name)):
+                    warmed_up += 1
+                else:
+                    entry.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return {"expected": expected, "warmed_up": warmed_up}
+
+    def is_ready(self) -> bool:
+        if not self.ready.is_set():
+            return False
+        workers = self.workers()
+        return workers["warmed_up"] >= workers["expected"]
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.ready.clear()
+        self._stop.clear()
+        with self._lock:
+            self._steps = {}
+        self.started_at = datetime.now(UTC)
+        self._thread = Thread(target=self.warm_up, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            self._clear_worker_ready()
+        except OSError as e:
+            print(f"[SHUTDOWN] Could not clear worker readiness: {e}")
+
+    def uptime_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (datetime.now(UTC) - self.started_at).total_seconds()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._steps.items()}
+        return {
+            "ready": self.is_ready(),
+            "pid": os.getpid(),
+            "workers": self.workers(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "steps": steps,
+        }
+
+
+_READINESS: Readiness | None = None
+
+
+def get_readiness() -> Readiness:
+    global _READINESS
+    if _READINESS is None:
+        _READINESS = Readiness(
+            pool_connections=env_int("WARMUP_CONNECTIONS", 4),
+            index_timeout_seconds=env_float("READY_INDEX_TIMEOUT_SECONDS", 30.0),
+        )
+    return _READINESS
+
+
+def get_health_router() -> APIRouter:
+    global _HEALTH_ROUTER
+    if _HEALTH_ROUTER is not None:
+        return _HEALTH_ROUTER
+
+    _HEALTH_ROUTER = APIRouter(prefix="/health", tags=["Health"])
+
+    @_HEALTH_ROUTER.get("/live")
+    async def live():
+        """The process is serving requests."""
+        return {"ok": True}
+
+    @_HEALTH_ROUTER.get("/ready")
+    async def ready(response: Response):
+        """503 until this process and, under serve.py, every running worker finished its first warm-up."""
+        readiness = get_readiness()
+        if not readiness.is_ready():
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return readiness.status()
+
+    return _HEALTH_ROUTER
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import json
+import os
+from threading import Event, Lock, Thread
+from typing import Any, AsyncIterator, Callable, Iterable
+
+from bson import json_util
+from pymongo.errors import OperationFailure, PyMongoError
+
+from data.config import env_int
+from data.mongo_repository import MongoRepository
+from data.prometheus import get_metrics_registry
+from data.storage import get_client, storage_backend
+
+
+LIVE_EVENT_SOURCES = ("auto", "bus", "change_streams")
+
+# Turns a written document into the users to notify and the event payload, or None.
+LiveEventRoute = Callable[[dict[str, Any]], tuple[Iterable[str], dict[str, Any]] | None]
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    type: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def encode(self) -> str:
+        """One server-sent event frame."""
+        data = json.dumps({"type": self.type, **self.data}, default=json_util.default, separators=(",", ":"))
+        return f"event: {self.type}\ndata: {data}\n\n"
+
+
+# Sent instead of a backlog the client did not read in time; it should call /social/sync.
+RESYNC_EVENT = LiveEvent("resync")
+_CLOSED = object()
+
+
+class Subscription:
+    """One open stream. Its queue belongs to the event loop that serves the connection."""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, queue_size: int) -> None:
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max(1, queue_size))
+        self.dropped = 0
+
+    def _deliver(self, item: Any) -> None:
+        # Runs on `loop`. A full queue means the client stopped reading; replace the
+        # backlog with one resync marker instead of buffering without bound.
+        if self.queue.full():
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            item = _CLOSED if item is _CLOSED else RESYNC_EVENT
+        self.queue.put_nowait(item)
+
+    def put(self, item: Any) -> bool:
+        """Thread-safe; False when the connection's loop is gone."""
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, item)
+        except RuntimeError:
+            return False
+        return True
+
+    async def next(self, timeout: float) -> Any:
+        """Next queued item, or None when `timeout` passes without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class EventBus:
+    """Fan-out of live events to the streams open in this process.
+
+    Publishing is thread-safe, so the sync route handlers (threadpool) and the change
+    stream thread can publish; delivery happens on each connection's event loop. An idle
+    connection is one parked coroutine and an empty queue, so a worker holds thousands.
+    """
+
+    def __init__(self, queue_size: int = 100, max_connections: int = 10_000) -> None:
+        self.queue_size = queue_size
+        self.max_connections = max(1, max_connections)
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._count = 0
+        self._lock = Lock()
+        registry = get_metrics_registry()
+        self.connections = registry.gauge("live_event_connections", "Open live event streams in this process.")
+        self.delivered = registry.counter(
+            "live_events_delivered_total",
+            "Live events handed to open streams.",
+            ("type",),
+        )
+        self.rejected = registry.counter(
+            "live_event_connections_rejected_total",
+            "Live event streams refused because the process was at LIVE_EVENTS_MAX_CONNECTIONS.",
+        )
+
+    def has_capacity(self) -> bool:
+        return self._count < self.max_connections
+
+    def has_subscribers(self) -> bool:
+        return self._count > 0
+
+    def connected_user_ids(self) -> set[str]:
+        with self._lock:
+            return set(self._subscriptions)
+
+    def subscribe(self, user_id: str) -> Subscription | None:
+        """Must be called on the event loop that will read the subscription."""
+        subscription = Subscription(str(user_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if self._count >= self.max_connections:
+                self.rejected.inc()
+                return None
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+            self._count += 1
+        self.connections.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if not subscriptions or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+            self._count -= 1
+        self.connections.dec()
+
+    def publish(self, user_ids: Iterable[str], event: LiveEvent) -> int:
+        """Queue `event` on every open stream of `user_ids`; returns how many streams got it."""
+        with self._lock:
+            targets = [sub for user_id in set(user_ids) for sub in self._subscriptions.get(str(user_id), ())]
+        delivered = sum(1 for subscription in targets if subscription.put(event))
+        if delivered:
+            self.delivered.inc(event.type, amount=delivered)
+        return delivered
+
+    def close_all(self) -> None:
+        """End every open stream, so shutdown does not wait for idle clients."""
+        with self._lock:
+            targets = [sub for subscriptions in self._subscriptions.values() for sub in subscriptions]
+        for subscription in targets:
+            subscription.put(_CLOSED)
+
+
+async def event_stream(bus: EventBus, user_id: str, heartbeat_seconds: float) -> AsyncIterator[str]:
+    """Body of a text/event-stream response for `user_id`.
+
+    Subscribes when the response starts and unsubscribes when it ends, including when
+    the client disconnects and the server cancels the stream. Comment lines keep idle
+    connections alive through proxies.
+    """
+    subscription = bus.subscribe(user_id)
+    if subscription is None:
+        return
+    try:
+        yield "retry: 5000\n: connected\n\n"
+        while True:
+            item = await subscription.next(heartbeat_seconds)
+            if item is _CLOSED:
+                return
+            yield ": ping\n\n" if item is None else item.encode()
+    finally:
+        bus.unsubscribe(subscription)
+
+
+@dataclass(frozen=True)
+class _Source:
+    repository: MongoRepository
+    operations: tuple[str, ...]
+    route: LiveEventRoute
+
+
+class LiveEvents:
+    """Turns writes into live events, from one of two sources:
+
+    * `bus`: route handlers call `notify()` after a write. Events only reach streams in
+      the same process, so with several workers a client may miss events written by
+      another worker until its next sync.
+    * `change_streams`: one Mongo change stream per worker watches the registered
+      collections, so every worker sees every write. Needs a replica set or sharded
+      cluster; handlers' `notify()` calls are then ignored.
+
+    `auto` (the default) uses change streams when the server supports them.
+    """
+
+    def __init__(self, bus: EventBus, source: str = "auto", retry_seconds: float = 5.0) -> None:
+        self.bus = bus
+        self.configured_source = source
+        self.source = "bus"
+        self.retry_seconds = retry_seconds
+        self._sources: dict[str, _Source] = {}
+        self._thread: Thread | None = None
+        self._stop = Event()
+        self._lock = Lock()
+        self.errors = get_metrics_registry().counter(
+            "live_event_errors_total",
+            "Writes whose live event could not be routed, and change stream restarts.",
+            ("kind",),
+        )
+
+    def register(
+        self,
+        kind: str,
+        repository: MongoRepository,
+        operations: tuple[str, ...],
+        route: LiveEventRoute,
+    ) -> None:
+        """`route` runs for each write of `kind`; `operations` are the change stream operation types to watch."""
+        self._sources[kind] = _Source(repository, tuple(operations), route)
+
+    def notify(self, kind: str, doc: dict[str, Any]) -> None:
+        """Called by a route handler after writing `doc`. Never raises."""
+        if self.source == "bus":
+            self.dispatch(kind, doc)
+
+    def dispatch(self, kind: str, doc: dict[str, Any]) -> None:
+        source = self._sources.get(kind)
+        if source is None or not self.bus.has_subscribers():
+            return
+        try:
+            routed = source.route(doc)
+            if routed is None:
+                return
+            user_ids, data = routed
+            self.bus.publish(user_ids, LiveEvent(kind, {**data, "at": datetime.now(UTC).isoformat()}))
+        except Exception as e:
+            self.errors.inc(kind)
+            print(f"[EVENTS] Could not route {kind} event: {e}")
+
+    def _change_streams_supported(self) -> bool:
+        if storage_backend() != "mongo":
+            return False
+        try:
+            hello = get_client().admin.command("hello")
+        except PyMongoError as e:
+            print(f"[EVENTS] Could not check for change stream support: {e}")
+            return False
+        return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+    def _pipeline(self) -> list[dict[str, Any]]:
+        clauses = [
+            {
+                "ns.db": source.repository.db_name,
+                "ns.coll": source.repository.collection_name,
+                "operationType": {"$in": list(source.operations)},
+            }
+            for source in self._sources.values()
+        ]
+        return [{"$match": {"$or": clauses}}]
+
+    def _kind_for(self, namespace: dict[str, Any]) -> str | None:
+        for kind, source in self._sources.items():
+            if source.repository.db_name == namespace.get("db") and source.repository.collection_name == namespace.get("coll"):
+                return kind
+        return None
+
+    def _watch_loop(self) -> None:
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                with get_client().watch(
+                    self._pipeline(),
+                    full_document="updateLookup",
+                    resume_after=resume_token,
+                    max_await_time_ms=1000,
+                ) as stream:
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        resume_token = stream.resume_token
+                        if change is None:
+                            continue
+                        kind = self._kind_for(change.get("ns") or {})
+                        doc = change.get("fullDocument")
+                        if kind and doc:
+                            self.dispatch(kind, doc)
+            except PyMongoError as e:
+                if isinstance(e, OperationFailure):
+                    # Typically the resume point fell off the oplog; start from now.
+                    resume_token = None
+                self.errors.inc("change_stream")
+                print(f"[EVENTS] Change stream failed, restarting in {self.retry_seconds:g}s: {e}")
+                self._stop.wait(self.retry_seconds)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            wanted = self.configured_source
+            if wanted != "bus" and self._sources and self._change_streams_supported():
+                self.source = "change_streams"
+                self._thread = Thread(target=self._watch_loop, name="live-events", daemon=True)
+                self._thread.start()
+            else:
+                if wanted == "change_streams":
+                    print("[EVENTS] Change streams need a replica set; falling back to the in-process bus")
+                self.source = "bus"
+            print(f"[EVENTS] Live events from {self.source}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=timeout)
+                self._thread = None
+            self.bus.close_all()
+
+
+def live_events_source() -> str:
+    """`LIVE_EVENTS_SOURCE`: `auto` (default), `bus` or `change_streams`."""
+    value = str(os.getenv("LIVE_EVENTS_SOURCE") or "auto").strip().lower() or "auto"
+    if value not in LIVE_EVENT_SOURCES:
+        raise ValueError(f"LIVE_EVENTS_SOURCE must be one of {', '.join(LIVE_EVENT_SOURCES)}, got {value!r}")
+    return value
+
+
+def heartbeat_seconds() -> float:
+    return float(max(1, env_int("LIVE_EVENTS_HEARTBEAT_SECONDS", 20)))
+
+
+_LIVE_EVENTS: LiveEvents | None = None
+
+
+def get_live_events() -> LiveEvents:
+    global _LIVE_EVENTS
+    if _LIVE_EVENTS is None:
+        bus = EventBus(
+            queue_size=env_int("LIVE_EVENTS_QUEUE_SIZE", 100),
+            max_connections=env_int("LIVE_EVENTS_MAX_CONNECTIONS", 10_000),
+        )
+        _LIVE_EVENTS = LiveEvents(bus, source=live_events_source())
+    return _LIVE_EVENTS
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import hmac
+import os
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from data.prometheus import CONTENT_TYPE, get_metrics_registry
+
+
+_METRICS_ROUTER: APIRouter | None = None
+
+
+def _metrics_token() -> str:
+    return str(os.getenv("METRICS_TOKEN") or "").strip()
+
+
+def get_metrics_router() -> APIRouter:
+    global _METRICS_ROUTER
+    if _METRICS_ROUTER is not None:
+        return _METRICS_ROUTER
+
+    _METRICS_ROUTER = APIRouter(tags=["Metrics"])
+
+    @_METRICS_ROUTER.get("/metrics", include_in_schema=False)
+    def prometheus_metrics(authorization: str | None = Header(default=None)):
+        """Prometheus text exposition of this process' metrics. Set METRICS_TOKEN to require a bearer token."""
+        token = _metrics_token()
+        if token and not hmac.compare_digest(str(authorization or ""), f"Bearer {token}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+        return Response(content=get_metrics_registry().render(), media_type=CONTENT_TYPE)
+
+    return _METRICS_ROUTER
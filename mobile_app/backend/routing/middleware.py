@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import anyio.to_thread
+
+from data.config import env_float
+from data.mongo_metrics import command_scope, get_mongo_command_metrics
+from data.prometheus import get_metrics_registry
+
+
+_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def route_template(scope: dict[str, Any]) -> str:
+    """Path template of the matched route (e.g. `/social/spots/{spot_id}`), never the raw path."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return str(template) if template else "unmatched"
+
+
+def route_label(scope: dict[str, Any]) -> str:
+    return f"{scope.get('method', '-')} {route_template(scope)}"
+
+
+class MongoCommandScopeMiddleware:
+    """Attributes the Mongo commands issued while handling a request to its route.
+
+    Pure ASGI so the context variable is set in the request's own task; sync endpoints
+    and dependencies inherit it when Starlette runs them in the threadpool. The router
+    writes the matched route into the shared scope dict, so the label is resolved lazily.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = get_mongo_command_metrics()
+        with command_scope(lambda: route_label(scope)) as commands:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                metrics.record_request(commands)
+
+
+class HttpMetrics:
+    """Request metrics shared by the middleware and the admin latency summary."""
+
+    def __init__(self) -> None:
+        registry = get_metrics_registry()
+        self.duration = registry.histogram(
+            "http_request_duration_seconds",
+            "Time from receiving a request to sending the last response byte.",
+            ("method", "route", "status"),
+        )
+        self.request_size = registry.histogram(
+            "http_request_size_bytes",
+            "Request body size.",
+            ("method", "route"),
+            buckets=_SIZE_BUCKETS,
+        )
+        self.response_size = registry.histogram(
+            "http_response_size_bytes",
+            "Response body size.",
+            ("method", "route", "status"),
+            buckets=_SIZE_BUCKETS,
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "Requests currently being handled.", ("method",))
+
+    def latency_summary(self) -> dict[str, Any]:
+        """p50/p95/p99 per (method, route, status), busiest first by total time spent."""
+        rows = []
+        for (method, route, status_code), snap in self.duration.snapshot().items():
+            rows.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "status": int(status_code),
+                    "count": snap.count,
+                    "mean_ms": round(snap.sum / snap.count * 1000, 3) if snap.count else 0.0,
+                    "p50_ms": round(snap.quantile(0.5) * 1000, 3),
+                    "p95_ms": round(snap.quantile(0.95) * 1000, 3),
+                    "p99_ms": round(snap.quantile(0.99) * 1000, 3),
+                }
+            )
+        rows.sort(key=lambda row: row["mean_ms"] * row["count"], reverse=True)
+        return {"routes": rows}
+
+
+_HTTP_METRICS: HttpMetrics | None = None
+
+
+def get_http_metrics() -> HttpMetrics:
+    global _HTTP_METRICS
+    if _HTTP_METRICS is None:
+        _HTTP_METRICS = HttpMetrics()
+    return _HTTP_METRICS
+
+
+class RequestMetricsMiddleware:
+    """Per-route latency histograms, in-flight gauge and request/response body sizes.
+
+    Labels use the route template so path parameters do not explode cardinality.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self.metrics = get_http_metrics()
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = str(scope.get("method") or "-")
+        started = time.perf_counter()
+        received = 0
+        sent = 0
+        status_code = 500
+
+        async def counting_receive() -> dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message.get("type") == "http.request":
+                received += len(message.get("body") or b"")
+            return message
+
+        async def counting_send(message: dict[str, Any]) -> None:
+            nonlocal sent, status_code
+            if message.get("type") == "http.response.start":
+                status_code = int(message.get("status") or 500)
+            elif message.get("type") == "http.response.body":
+                sent += len(message.get("body") or b"")
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight.inc(method)
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            metrics.in_flight.dec(method)
+            route = route_template(scope)
+            status_label = str(status_code)
+            metrics.duration.observe(time.perf_counter() - started, method, route, status_label)
+            metrics.request_size.observe(received, method, route)
+            metrics.response_size.observe(sent, method, route, status_label)
+
+
+class ThreadpoolProbe:
+    """Measures how long work waits for a threadpool slot.
+
+    Sync endpoints and sync dependencies (so nearly every request-path pymongo call)
+    run on AnyIO's default threadpool. A canary task periodically submits a no-op and records the delay until
+    it starts, alongside the number of busy threads, without adding a hop to requests.
+    """
+
+    def __init__(self, interval_seconds: float = 1.0) -> None:
+        registry = get_metrics_registry()
+        self.interval_seconds = max(0.05, interval_seconds)
+        self.wait = registry.histogram(
+            "threadpool_wait_seconds",
+            "Delay before a job submitted to the request threadpool starts running.",
+        )
+        self.busy = registry.gauge("threadpool_busy_threads", "Threadpool slots in use.")
+        self.capacity = registry.gauge("threadpool_max_threads", "Threadpool size.")
+        self._task: asyncio.Task[None] | None = None
+
+    async def sample(self) -> float:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        self.busy.set(value=limiter.borrowed_tokens)
+        self.capacity.set(value=limiter.total_tokens)
+
+        submitted = time.perf_counter()
+        started = await anyio.to_thread.run_sync(time.perf_counter)
+        waited = max(0.0, started - submitted)
+        self.wait.observe(waited)
+        return waited
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                print(f"[METRICS] Threadpool probe failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+_THREADPOOL_PROBE: ThreadpoolProbe | None = None
+
+
+def get_threadpool_probe() -> ThreadpoolProbe:
+    global _THREADPOOL_PROBE
+    if _THREADPOOL_PROBE is None:
+        _THREADPOOL_PROBE = ThreadpoolProbe(interval_seconds=env_float("THREADPOOL_PROBE_SECONDS", 1.0))
+    return _THREADPOOL_PROBE
+
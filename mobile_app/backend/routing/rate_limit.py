@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import math
+import os
+from threading import Lock
+import time
+from typing import Any, Callable
+
+from fastapi import HTTPException, Request, status
+from pymongo.errors import DuplicateKeyError
+
+from data.config import auth_db_name, env_int
+from data.indexes import index
+from data.mongo_repository import MongoRepository
+from data.prometheus import get_metrics_registry
+
+
+RATE_LIMIT_BACKENDS = ("memory", "storage")
+SCOPES = ("user", "ip")
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Token bucket: bursts of up to `capacity` requests, refilled evenly over `period_seconds`."""
+
+    capacity: float
+    period_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, text: str) -> RateLimitRule:
+        """`<requests>/<seconds>`, e.g. `10/60`."""
+        capacity, _, period = str(text).partition("/")
+        rule = cls(capacity=float(capacity), period_seconds=float(period or 1))
+        if rule.capacity < 1 or rule.period_seconds <= 0:
+            raise ValueError(f"invalid rate limit {text!r}")
+        return rule
+
+
+# Per named limit and key scope. The expensive endpoints: bcrypt on login/register,
+# regex scans on user search, and the full visible-spot scan on the spot listing.
+DEFAULT_RULES: dict[str, dict[str, RateLimitRule]] = {
+    "auth.login": {"ip": RateLimitRule(10, 60)},
+    "auth.register": {"ip": RateLimitRule(5, 300)},
+    "users.search": {"user": RateLimitRule(30, 60), "ip": RateLimitRule(120, 60)},
+    "spots.list": {"user": RateLimitRule(20, 60), "ip": RateLimitRule(120, 60)},
+}
+
+
+def _refill(tokens: float, updated_at: float, now: float, rule: RateLimitRule) -> float:
+    elapsed = max(0.0, now - updated_at)
+    return min(rule.capacity, tokens + elapsed * rule.refill_per_second)
+
+
+def _wait_seconds(tokens: float, rule: RateLimitRule, cost: float) -> float:
+    return (cost - tokens) / rule.refill_per_second
+
+
+def _seconds_until_full(tokens: float, rule: RateLimitRule) -> float:
+    return (rule.capacity - tokens) / rule.refill_per_second
+
+
+class MemoryRateLimitBackend:
+    """Buckets in this process. Each worker under serve.py limits on its own.
+
+    At most `max_keys` buckets are kept; the least recently used one is dropped first,
+    which forgets the bucket most likely to have refilled anyway.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        # key -> (tokens, updated_at), least recently used first
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> float:
+        """Spend `cost` tokens; 0.0 when allowed, otherwise the seconds until it would be."""
+        now = self.clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (rule.capacity, now))
+            tokens = _refill(tokens, updated_at, now, rule)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0 if allowed else _wait_seconds(tokens, rule, cost)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RateLimitContention(RuntimeError):
+    """A storage bucket kept changing under every compare-and-set attempt."""
+
+
+class StorageRateLimitBackend:
+    """Buckets shared by all workers and instances, kept in the storage backend.
+
+    Each take is a read followed by a compare-and-set on the previous `updated_at` and
+    `tokens`, retried when another process updated the bucket in between. Works with
+    any storage that has the pymongo collection API, including STORAGE_BACKEND=memory.
+    Documents expire through a TTL index once the bucket has refilled completely.
+    """
+
+    def __init__(self, repository: MongoRepository, max_attempts: int = 5, clock: Callable[[], float] = time.time) -> None:
+        self.repository = repository
+        self.max_attempts = max(1, max_attempts)
+        self.clock = clock
+
+    def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> float:
+        collection = self.repository.collection
+        for _ in range(self.max_attempts):
+            now = self.clock()
+            doc = collection.find_one({"_id": key})
+            if doc is None:
+                tokens, updated_at = rule.capacity, now
+            else:
+                tokens, updated_at = float(doc.get("tokens", 0.0)), float(doc.get("updated_at", now))
+            tokens = _refill(tokens, updated_at, now, rule)
+            allowed = tokens >= cost
+            remaining = tokens - cost if allowed else tokens
+            fields = {
+                "tokens": remaining,
+                "updated_at": now,
+                "expires_at": datetime.now(UTC) + timedelta(seconds=_seconds_until_full(remaining, rule)),
+            }
+
+            if doc is None:
+                try:
+                    collection.insert_one({"_id": key, **fields})
+                except DuplicateKeyError:
+                    continue
+            else:
+                result = collection.update_one(
+                    {"_id": key, "updated_at": doc.get("updated_at"), "tokens": doc.get("tokens")},
+                    {"$set": fields},
+                )
+                if not result.matched_count:
+                    continue
+            return 0.0 if allowed else _wait_seconds(tokens, rule, cost)
+
+        # RateLimiter lets the request through and counts it as a backend error.
+        raise RateLimitContention(f"bucket {key!r} changed on each of {self.max_attempts} attempts")
+
+    def clear(self) -> None:
+        self.repository.delete_many({})
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend: Any,
+        rules: dict[str, dict[str, RateLimitRule]],
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.rules = rules
+        self.enabled = enabled
+        registry = get_metrics_registry()
+        self.rejections = registry.counter(
+            "rate_limit_rejections_total",
+            "Requests rejected with 429 by a rate limit.",
+            ("limit", "scope"),
+        )
+        self.backend_errors = registry.counter(
+            "rate_limit_backend_errors_total",
+            "Rate limit checks that failed or hit storage contention and let the request through.",
+            ("limit",),
+        )
+
+    def check(self, name: str, keys: dict[str, str]) -> float:
+        """Take one token from each configured bucket; the wait of the first empty one.
+
+        Buckets are taken narrowest scope first (`SCOPES` order) and the check stops at
+        the first rejection, so a user over their own limit does not also drain the
+        shared `ip` bucket.
+        """
+        if not self.enabled:
+            return 0.0
+        rules = self.rules.get(name) or {}
+        for scope in SCOPES:
+            rule = rules.get(scope)
+            key = keys.get(scope)
+            if rule is None or not key:
+                continue
+            try:
+                wait = self.backend.take(f"{name}:{scope}:{key}", rule)
+            except Exception as e:
+                # Storage trouble must not take the endpoints down with it.
+                self.backend_errors.inc(name)
+                print(f"[RATELIMIT] Check for {name} failed, allowing request: {e}")
+                continue
+            if wait > 0:
+                self.rejections.inc(name, scope)
+                return wait
+        return 0.0
+
+
+def parse_rules(text: str, base: dict[str, dict[str, RateLimitRule]] | None = None) -> dict[str, dict[str, RateLimitRule]]:
+    """Apply `RATE_LIMITS` overrides: `auth.login:ip=20/60,spots.list:user=off`."""
+    rules = {name: dict(scopes) for name, scopes in (base if base is not None else DEFAULT_RULES).items()}
+    for entry in str(text or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        target, _, value = entry.partition("=")
+        name, _, scope = target.strip().rpartition(":")
+        if not name or scope not in SCOPES:
+            raise ValueError(f"RATE_LIMITS entry {entry!r} must look like <limit>:<user|ip>=<requests>/<seconds>")
+        if value.strip().lower() == "off":
+            rules.get(name, {}).pop(scope, None)
+        else:
+            rules.setdefault(name, {})[scope] = RateLimitRule.parse(value.strip())
+    return rules
+
+
+def rate_limit_backend() -> str:
+    """`RATE_LIMIT_BACKEND`: `memory` (default, per process) or `storage` (shared)."""
+    value = str(os.getenv("RATE_LIMIT_BACKEND") or "memory").strip().lower() or "memory"
+    if value not in RATE_LIMIT_BACKENDS:
+        raise ValueError(f"RATE_LIMIT_BACKEND must be one of {', '.join(RATE_LIMIT_BACKENDS)}, got {value!r}")
+    return value
+
+
+def _create_backend() -> Any:
+    if rate_limit_backend() == "memory":
+        return MemoryRateLimitBackend(max_keys=env_int("RATE_LIMIT_MAX_KEYS", 100_000))
+
+    from data.dto import RateLimitBucketRecord
+
+    repository = MongoRepository(
+        collection_name="rate_limits",
+        model_type=RateLimitBucketRecord,
+        db_name=auth_db_name(),
+        indexes=[index("expires_at", ttl_seconds=0)],
+    )
+    return StorageRateLimitBackend(repository)
+
+
+_RATE_LIMITER: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        enabled = str(os.getenv("RATE_LIMIT_ENABLED") or "1").strip().lower() not in ("0", "false", "no", "off")
+        _RATE_LIMITER = RateLimiter(
+            backend=_create_backend(),
+            rules=parse_rules(str(os.getenv("RATE_LIMITS") or "")),
+            enabled=enabled,
+        )
+    return _RATE_LIMITER
+
+
+def _request_user_id(request: Request) -> str:
+    """`sub` of a valid bearer token, checked without a database lookup."""
+    header = str(request.headers.get("authorization") or "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return ""
+
+    from routing.auth_routes import token_extension
+
+    try:
+        payload = token_extension.decode_access_token(token.strip())
+    except Exception:
+        return ""
+    return str(payload.get("sub") or "").strip()
+
+
+def rate_limit(name: str) -> Callable[[Request], None]:
+    """Route dependency enforcing the `name` limit per user (bearer token) and per client IP.
+
+    Declared on the route decorator so it runs before the user lookup and the handler.
+    The client IP is the one uvicorn resolved, which honours X-Forwarded-For from
+    FORWARDED_ALLOW_IPS.
+    """
+
+    def dependency(request: Request) -> None:
+        limiter = get_rate_limiter()
+        if not limiter.enabled:
+            return
+        keys = {
+            "ip": request.client.host if request.client else "unknown",
+            "user": _request_user_id(request),
+        }
+        retry_after = limiter.check(name, keys)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
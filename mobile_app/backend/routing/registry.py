@@ -6,8 +6,9 @@ from typing import Any, Callable, Type, TypeVar
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from data.indexes import IndexSpec
 from data.mongo_repository import MongoRepository
-from routing.router import router_create, router_create_authenticated
+from routing.router import ChangeHook, router_create, router_create_authenticated
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -36,14 +37,20 @@ def mongo_entity(
     tags: list[str] | None = None,
     authenticated: bool = False,
     auth_dependency: Callable[..., Any] | None = None,
+    indexes: list[IndexSpec] | None = None,
+    on_change: ChangeHook | None = None,
 ) -> Callable[[Type[T]], Type[T]]:
-    """Class decorator that registers a model and auto-creates its CRUD router."""
+    """Class decorator that registers a model and auto-creates its CRUD router.
+
+    `indexes` are declared on the collection and built in the background at startup.
+    `on_change(before, after)` is called after each successful CRUD write.
+    """
 
     def decorator(model_cls: Type[T]) -> Type[T]:
         effective_prefix = prefix or f"/{collection}"
         effective_tags = tags or [collection]
 
-        repo = MongoRepository(collection_name=collection, model_type=model_cls)
+        repo = MongoRepository(collection_name=collection, model_type=model_cls, indexes=indexes)
         if authenticated:
             if auth_dependency is None:
                 raise ValueError(
@@ -55,6 +62,7 @@ def mongo_entity(
                 prefix=effective_prefix,
                 tags=effective_tags,
                 auth_dependency=auth_dependency,
+                on_change=on_change,
             )
         else:
             router = router_create(
@@ -62,6 +70,7 @@ def mongo_entity(
                 repository=repo,
                 prefix=effective_prefix,
                 tags=effective_tags,
+                on_change=on_change,
             )
 
         _REGISTRY.append(
@@ -84,6 +93,8 @@ def mongo_entity_encrypted(
     collection: str,
     prefix: str | None = None,
     tags: list[str] | None = None,
+    indexes: list[IndexSpec] | None = None,
+    on_change: ChangeHook | None = None,
 ) -> Callable[[Type[T]], Type[T]]:
     """Convenience decorator: authenticated mongo entity with auth/jwt checks.
 
@@ -98,4 +109,6 @@ def mongo_entity_encrypted(
         tags=tags,
         authenticated=True,
         auth_dependency=get_current_user,
+        indexes=indexes,
+        on_change=on_change,
     )
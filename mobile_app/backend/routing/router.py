@@ -4,16 +4,25 @@ from datetime import UTC, datetime
 from typing import Any, Callable, Dict, Type, TypeVar
 
 from bson import ObjectId, json_util
-from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, ValidationError
 from pymongo.errors import DuplicateKeyError
 
+from routing.crud_query import parse_crud_query
+
 # Generic type for Pydantic models
 T = TypeVar('T', bound=BaseModel)
 
 
+ChangeHook = Callable[[dict[str, Any] | None, dict[str, Any] | None], None]
+
+
 class GenericCrudRouter:
-    """Generic CRUD router builder with model validation and ObjectId handling."""
+    """Generic CRUD router builder with model validation and ObjectId handling.
+
+    `on_change(before, after)` runs after each successful write, with `None` for the
+    missing side on create and delete, so derived caches can follow CRUD writes.
+    """
 
     def __init__(
         self,
@@ -21,11 +30,13 @@ class GenericCrudRouter:
         repository,
         prefix: str,
         tags: list[str] | None = None,
+        on_change: ChangeHook | None = None,
     ) -> None:
         self.model = model
         self.repository = repository
         self.prefix = prefix
         self.tags = tags or [prefix.strip('/')]
+        self.on_change = on_change
 
     def route_dependencies(self) -> list[Any]:
         return []
@@ -67,6 +78,7 @@ class GenericCrudRouter:
     def build(self) -> APIRouter:
         model = self.model
         repository = self.repository
+        on_change = self.on_change
 
         router = APIRouter(
             prefix=self.prefix,
@@ -85,12 +97,16 @@ class GenericCrudRouter:
                     detail=e.errors(),
                 ) from e
             entity_id = repository.create(entity)
+            if on_change is not None:
+                on_change(None, entity.model_dump(exclude_none=True))
             return {"id": str(entity_id)}
 
         @router.get("/")
         @self.handle_exceptions
-        async def read_all():
-            entities = repository.read_all()
+        async def read_all(request: Request):
+            """Filter, sort, project and limit with query parameters; see `parse_crud_query`."""
+            query = parse_crud_query(request.query_params.multi_items(), model, repository.declared_indexes())
+            entities = repository.read_all(query.filter, query.projection, query.sort, query.limit)
             return json.loads(json_util.dumps(entities))
 
         @router.get("/{entity_id}")
@@ -113,18 +129,24 @@ class GenericCrudRouter:
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail=e.errors(),
                 ) from e
+            before = repository.read(entity_id) if on_change is not None else None
             result = repository.update(entity_id, entity)
             if not result.modified_count:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, "Entity not found")
+            if on_change is not None:
+                on_change(before, {**(before or {}), **entity.model_dump(exclude_none=True)})
             return {"modified_count": result.modified_count}
 
         @router.delete("/{entity_id}")
         @self.handle_exceptions
         @self.with_object_id_validation
         async def delete(entity_id: str):
+            before = repository.read(entity_id) if on_change is not None else None
             result = repository.delete(entity_id)
             if result.deleted_count == 0:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, "Entity not found")
+            if on_change is not None:
+                on_change(before, None)
             return Response(status_code=status.HTTP_204_NO_CONTENT)
 
         return router
@@ -140,8 +162,9 @@ class AuthenticatedCrudRouter(GenericCrudRouter):
         prefix: str,
         tags: list[str] | None = None,
         auth_dependency: Callable[..., Any] | None = None,
+        on_change: ChangeHook | None = None,
     ) -> None:
-        super().__init__(model=model, repository=repository, prefix=prefix, tags=tags)
+        super().__init__(model=model, repository=repository, prefix=prefix, tags=tags, on_change=on_change)
         if auth_dependency is None:
             raise ValueError("AuthenticatedCrudRouter requires an auth dependency")
         self.auth_dependency = auth_dependency
@@ -164,6 +187,10 @@ class AuthSessionRouter(GenericCrudRouter):
         password_extension,
         prefix: str = "/auth",
         tags: list[str] | None = None,
+        endpoint_dependencies: dict[str, list[Any]] | None = None,
+        session_extension=None,
+        refresh_model: Type[BaseModel] | None = None,
+        refresh_response_model: Type[BaseModel] | None = None,
     ) -> None:
         super().__init__(model=register_model, repository=repository, prefix=prefix, tags=tags or ["Auth"])
         self.register_model = register_model
@@ -172,6 +199,12 @@ class AuthSessionRouter(GenericCrudRouter):
         self.token_response_model = token_response_model
         self.token_extension = token_extension
         self.password_extension = password_extension
+        # Extra dependencies per endpoint name ("register", "login"), e.g. rate limits.
+        self.endpoint_dependencies = endpoint_dependencies or {}
+        # With a session extension, logins also return a refresh token and /refresh, /logout exist.
+        self.session_extension = session_extension
+        self.refresh_model = refresh_model
+        self.refresh_response_model = refresh_response_model
 
     @staticmethod
     def _as_text(value: Any) -> str:
@@ -217,6 +250,9 @@ class AuthSessionRouter(GenericCrudRouter):
             "token_type": "bearer",
             "user": self._to_user_public(user_doc),
         }
+        if self.session_extension is not None:
+            payload["refresh_token"] = self.session_extension.issue(user_id=user_id, username=username)
+            payload["expires_in"] = self.token_extension.expire_minutes * 60
         return self.token_response_model.model_validate(payload)
 
     def _build_auth_user_document(self, req: BaseModel, password_hash: str) -> dict[str, Any]:
@@ -252,7 +288,11 @@ class AuthSessionRouter(GenericCrudRouter):
 
         router = APIRouter(prefix=self.prefix, tags=self.tags)
 
-        @router.post("/register", response_model=self.token_response_model)
+        @router.post(
+            "/register",
+            response_model=self.token_response_model,
+            dependencies=self.endpoint_dependencies.get("register", []),
+        )
         @self.handle_exceptions
         async def register(payload: Dict[str, Any] = Body(...)):
             try:
@@ -278,7 +318,11 @@ class AuthSessionRouter(GenericCrudRouter):
 
             return self._to_auth_response(user_doc)
 
-        @router.post("/login", response_model=self.token_response_model)
+        @router.post(
+            "/login",
+            response_model=self.token_response_model,
+            dependencies=self.endpoint_dependencies.get("login", []),
+        )
         @self.handle_exceptions
         async def login(payload: Dict[str, Any] = Body(...)):
             try:
@@ -302,20 +346,58 @@ class AuthSessionRouter(GenericCrudRouter):
 
             return self._to_auth_response(user_doc)
 
+        if self.session_extension is not None and self.refresh_model is not None:
+            self._add_session_routes(router)
+
         return router
 
+    def _add_session_routes(self, router: APIRouter) -> None:
+        session_extension = self.session_extension
+        refresh_model = self.refresh_model
+
+        @router.post("/refresh", response_model=self.refresh_response_model)
+        def refresh(req: refresh_model):  # type: ignore[valid-type]
+            """Exchange a refresh token for a new access token and a new refresh token."""
+            rotated = session_extension.rotate(req.refresh_token)
+            if rotated is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired refresh token",
+                )
+            refresh_token, session = rotated
+            access_token = self.token_extension.issue_access_token(
+                user_id=session["user_id"],
+                username=session.get("username", ""),
+            )
+            return self.refresh_response_model.model_validate(
+                {
+                    "access_token": access_token,
+                    "token_type": "bearer",
+                    "refresh_token": refresh_token,
+                    "expires_in": self.token_extension.expire_minutes * 60,
+                }
+            )
+
+        @router.post("/logout")
+        def logout(req: refresh_model):  # type: ignore[valid-type]
+            """Revoke the refresh token and the tokens rotated from the same login."""
+            session_extension.revoke(req.refresh_token)
+            return {"ok": True}
+
 
 def router_create(
     model: Type[T],
     repository,
     prefix: str,
     tags: list[str] | None = None,
+    on_change: ChangeHook | None = None,
 ) -> APIRouter:
     return GenericCrudRouter(
         model=model,
         repository=repository,
         prefix=prefix,
         tags=tags,
+        on_change=on_change,
     ).build()
 
 
@@ -325,6 +407,7 @@ def router_create_authenticated(
     prefix: str,
     auth_dependency: Callable[..., Any],
     tags: list[str] | None = None,
+    on_change: ChangeHook | None = None,
 ) -> APIRouter:
     return AuthenticatedCrudRouter(
         model=model,
@@ -332,6 +415,7 @@ def router_create_authenticated(
         prefix=prefix,
         tags=tags,
         auth_dependency=auth_dependency,
+        on_change=on_change,
     ).build()
 
 
@@ -345,6 +429,10 @@ def router_create_auth_sessions(
     password_extension,
     prefix: str = "/auth",
     tags: list[str] | None = None,
+    endpoint_dependencies: dict[str, list[Any]] | None = None,
+    session_extension=None,
+    refresh_model: Type[BaseModel] | None = None,
+    refresh_response_model: Type[BaseModel] | None = None,
 ) -> APIRouter:
     return AuthSessionRouter(
         repository=repository,
@@ -356,4 +444,8 @@ def router_create_auth_sessions(
         password_extension=password_extension,
         prefix=prefix,
         tags=tags,
+        endpoint_dependencies=endpoint_dependencies,
+        session_extension=session_extension,
+        refresh_model=refresh_model,
+        refresh_response_model=refresh_response_model,
     ).build()
@@ -6,7 +6,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routing.auth_routes import get_auth_router, get_auth_user_repository
+from data.indexes import get_index_manager
+from data.job_queue import get_job_queue, job_worker_count
+from routing.admin_metrics import get_admin_metrics_aggregator
+from routing.admin_routes import get_admin_router
+from routing.auth_routes import get_auth_router
+from routing.cache_relay import get_cache_invalidation_relay
+from routing.client_error_routes import get_client_error_ingestor, get_client_error_router
+from routing.health_routes import get_health_router, get_readiness
+from routing.live_events import get_live_events
+from routing.metrics_routes import get_metrics_router
+from routing.middleware import MongoCommandScopeMiddleware, RequestMetricsMiddleware, get_threadpool_probe
 from routing.social_routes import get_social_router
 from routing.registry import get_routers
 from routing.admin_setup import ensure_admin_user
@@ -32,13 +42,62 @@ def _cors_origins() -> list[str]:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown lifecycle handler."""
+    # Registration and follow writes rely on unique indexes to reject duplicates, so those
+    # are built before the first request; everything else is built in the background below.
+    print("[STARTUP] Building unique indexes...")
+    for label, entry in get_index_manager().reconcile(create=True, unique_only=True)["collections"].items():
+        if entry.get("created"):
+            print(f"[STARTUP] {label}: created {', '.join(entry['created'])}")
+        if entry.get("error") or entry.get("mismatched"):
+            print(f"[STARTUP] Warning: {label}: unique indexes not in place, duplicates are not rejected: {entry}")
+
     print("[STARTUP] Ensuring admin user exists...")
     try:
         ensure_admin_user()
     except Exception as e:
         print(f"[STARTUP] Warning: Could not ensure admin user: {e}")
+
+    print("[STARTUP] Starting background job workers...")
+    try:
+        get_job_queue().start(workers=job_worker_count())
+    except Exception as e:
+        print(f"[STARTUP] Warning: Could not start job workers: {e}")
+
+    try:
+        get_client_error_ingestor().start()
+    except Exception as e:
+        print(f"[STARTUP] Warning: Could not start client error ingestion: {e}")
+
+    try:
+        get_admin_metrics_aggregator().start()
+    except Exception as e:
+        print(f"[STARTUP] Warning: Could not start admin metrics aggregation: {e}")
+
+    try:
+        get_live_events().start()
+    except Exception as e:
+        print(f"[STARTUP] Warning: Could not start live events: {e}")
+
+    cache_relay = get_cache_invalidation_relay()
+    if cache_relay is not None:
+        cache_relay.start()
+
+    # Every repository has declared its indexes by now; build missing ones off the request path.
+    print("[STARTUP] Reconciling declared indexes in the background...")
+    get_index_manager().start()
+    # /health/ready reports 503 until connections are open and the index check is done.
+    get_readiness().start()
+    get_threadpool_probe().start()
     yield
     print("[SHUTDOWN] Application shutting down...")
+    get_live_events().stop()
+    if cache_relay is not None:
+        cache_relay.stop()
+    get_readiness().stop()
+    await get_threadpool_probe().stop()
+    get_job_queue().stop()
+    get_client_error_ingestor().stop()
+    get_admin_metrics_aggregator().stop()
 
 
 class Routing:
@@ -56,12 +115,19 @@ class Routing:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        self._app.add_middleware(MongoCommandScopeMiddleware)
+        # Added last so it is outermost and times the whole stack, CORS included.
+        self._app.add_middleware(RequestMetricsMiddleware)
 
+        self._app.include_router(get_health_router())
+        self._app.include_router(get_client_error_router())
         for router in get_routers():
             self._app.include_router(router)
 
         self._app.include_router(get_auth_router())
         self._app.include_router(get_social_router())
+        self._app.include_router(get_admin_router())
+        self._app.include_router(get_metrics_router())
 
     def get_app(self) -> FastAPI:
         return self._app
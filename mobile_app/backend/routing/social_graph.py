@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import sys
+from threading import Lock
+import time
+from typing import Callable, Iterable
+
+from data.config import env_int
+from data.prometheus import get_metrics_registry
+from routing.cache_relay import InvalidationClock
+
+
+GRAPH_RELATIONS = ("following", "blocked")
+
+GraphKey = tuple[str, str]
+
+
+class SocialGraphCache:
+    """LRU cache of per-user follow and block sets, so visibility checks are set lookups.
+
+    Keys are `(relation, user_id)`: `following` holds the ids a user follows, `blocked`
+    the ids on either side of a block with them. Ids are interned, so a user that
+    appears in many sets is stored once. Route handlers that change an edge call
+    `invalidate()` for both users; entries also expire after `ttl_seconds`, which bounds
+    staleness for writes from other workers when cross-worker invalidation is off.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self._entries: OrderedDict[GraphKey, tuple[frozenset[str], float]] = OrderedDict()
+        self._lock = Lock()
+        self._clock = InvalidationClock(max_keys=max(1024, self.max_entries))
+        self._listeners: list[Callable[[set[str]], None]] = []
+        self.requests = get_metrics_registry().counter(
+            "social_graph_cache_requests_total",
+            "Follow and block set lookups, by whether they were served from the cache.",
+            ("relation", "result"),
+        )
+
+    def get(self, relation: str, user_id: str, load: Callable[[], Iterable[str]]) -> frozenset[str]:
+        """Cached set for `(relation, user_id)`, filled by `load()` on a miss."""
+        key = (relation, user_id)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if time.time() - cached[1] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.requests.inc(relation, "hit")
+                    return cached[0]
+                del self._entries[key]
+            epoch = self._clock.now()
+
+        self.requests.inc(relation, "miss")
+        ids = frozenset(sys.intern(str(value)) for value in load() if value)
+        with self._lock:
+            # An invalidation of this user while loading may mean `ids` is already stale; serve it, don't keep it.
+            if self.max_entries and self._clock.is_current(user_id, epoch):
+                self._entries[key] = (ids, time.time())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return ids
+
+    def peek(self, relation: str, user_id: str) -> frozenset[str] | None:
+        """Cached set for `(relation, user_id)` if there is a fresh one; never loads."""
+        with self._lock:
+            cached = self._entries.get((relation, user_id))
+            if cached is None or time.time() - cached[1] >= self.ttl_seconds:
+                return None
+            self._entries.move_to_end((relation, user_id))
+            return cached[0]
+
+    def invalidate(self, *user_ids: str, broadcast: bool = True) -> None:
+        """Forget the sets of `user_ids`; `broadcast` also tells other workers, if configured."""
+        ids = {str(user_id) for user_id in user_ids if user_id}
+        if not ids:
+            return
+        with self._lock:
+            self._clock.touch(ids)
+            for user_id in ids:
+                for relation in GRAPH_RELATIONS:
+                    self._entries.pop((relation, user_id), None)
+        if broadcast:
+            for listener in self._listeners:
+                listener(ids)
+
+    def add_listener(self, listener: Callable[[set[str]], None]) -> None:
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock.reset()
+            self._entries.clear()
+
+
+_GRAPH_CACHE: SocialGraphCache | None = None
+
+
+def get_social_graph_cache() -> SocialGraphCache:
+    global _GRAPH_CACHE
+    if _GRAPH_CACHE is None:
+        _GRAPH_CACHE = SocialGraphCache(
+            max_entries=env_int("GRAPH_CACHE_ENTRIES", 50_000),
+            ttl_seconds=env_int("GRAPH_CACHE_TTL_SECONDS", 30),
+        )
+    return _GRAPH_CACHE
+
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import Any
+
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from data.ids import id_storage_mode, pair_key
+from data.migrations import MigrationRunner, renew_lease
+from data.mongo_repository import MongoRepository
+from routing.social_routes import PAIR_KEYS_MIGRATION, get_social_repositories
+
+
+def _to_object_id(value: Any) -> Any:
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    if isinstance(value, list):
+        return [_to_object_id(item) for item in value]
+    return value
+
+
+def _bulk(repository: MongoRepository, requests: list[Any]) -> tuple[int, list[int]]:
+    """Unordered bulk write; returns the write count and the indexes that hit a unique index."""
+    if not requests:
+        return 0, []
+    try:
+        result = repository.collection.bulk_write(requests, ordered=False)
+    except BulkWriteError as e:
+        details = e.details or {}
+        errors = details.get("writeErrors") or []
+        if any(int(error.get("code") or 0) != 11000 for error in errors):
+            raise
+        written = int(details.get("nInserted") or 0) + int(details.get("nModified") or 0)
+        return written, [int(error["index"]) for error in errors]
+    return result.inserted_count + result.modified_count, []
+
+
+_SPOT_MOVE_ATTEMPTS = 3
+
+
+def _move_spots(repository: MongoRepository, rows: list[dict[str, Any]]) -> int:
+    """Copy each spot under its ObjectId, then delete the string row only if its
+    `updated_at` is still the one copied; a row updated in between is copied again."""
+    moved = 0
+    for _ in range(_SPOT_MOVE_ATTEMPTS):
+        if not rows:
+            return moved
+        ids = [row["_id"] for row in rows]
+        # Replace rather than insert: an interrupted run may have left an older copy.
+        _bulk(repository, [ReplaceOne({"_id": ObjectId(row["_id"])}, {**row, "_id": ObjectId(row["_id"])}, upsert=True) for row in rows])
+        repository.collection.bulk_write([DeleteOne({"_id": row["_id"], "updated_at": row.get("updated_at")}) for row in rows], ordered=False)
+        rows = list(repository.collection.find({"_id": {"$in": ids}}))
+        moved += len(ids) - len(rows)
+    if rows:
+        raise RuntimeError(f"{len(rows)} spot(s) kept changing while being moved; pause spot writes and run again")
+    return moved
+
+
+def _normalize_spot_ids(repository: MongoRepository, batch_size: int) -> dict[str, int]:
+    """Re-insert spots stored under a hex string `_id` under the ObjectId, then drop the old row.
+
+    Pause spot writes while this runs. An edit between copy and delete is caught by
+    `_move_spots`, but a spot deleted after it was copied comes back, and an edit to a
+    copy that a crashed run left behind is overwritten when the string row is copied again.
+    """
+    moved = 0
+    after: Any = None
+    while True:
+        query: dict[str, Any] = {"_id": {"$type": "string"}}
+        if after is not None:
+            query["_id"]["$gt"] = after
+        rows = list(repository.collection.find(query).sort("_id", 1).limit(batch_size).batch_size(batch_size))
+        if not rows:
+            break
+        after = rows[-1]["_id"]
+        moved += _move_spots(repository, [row for row in rows if ObjectId.is_valid(row["_id"])])
+        renew_lease()
+    return {"spots._id": moved}
+
+
+def _normalize_refs(repository: MongoRepository, fields: tuple[str, ...], batch_size: int) -> dict[str, int]:
+    """Rewrite hex string references in `fields` as ObjectIds, walking the collection by `_id`.
+
+    A row whose converted form collides with an existing row on a unique index is a
+    duplicate written during rollout and is deleted.
+    """
+    converted = removed = 0
+    after: Any = None
+    legacy = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    while True:
+        query = legacy if after is None else {"$and": [legacy, {"_id": {"$gt": after}}]}
+        rows = list(
+            repository.collection.find(query, {field: 1 for field in fields})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .batch_size(batch_size)
+        )
+        if not rows:
+            break
+        after = rows[-1]["_id"]
+        updates: list[tuple[Any, dict[str, Any]]] = []
+        for row in rows:
+            changes = {field: _to_object_id(row[field]) for field in fields if field in row}
+            changes = {field: value for field, value in changes.items() if value != row[field]}
+            if changes:
+                updates.append((row["_id"], changes))
+        written, duplicates = _bulk(repository, [UpdateOne({"_id": row_id}, {"$set": changes}) for row_id, changes in updates])
+        converted += written
+        if duplicates:
+            removed += repository.collection.delete_many({"_id": {"$in": [updates[i][0] for i in duplicates]}}).deleted_count
+        renew_lease()
+    name = repository.collection_name
+    return {name: converted, f"{name}.duplicates": removed}
+
+
+def _objectid_refs(batch_size: int) -> dict[str, int]:
+    if id_storage_mode() == "string":
+        raise RuntimeError("ID_STORAGE_MODE=string still writes string ids; switch to compat before migrating")
+    repos = get_social_repositories()
+    counts = _normalize_spot_ids(repos.spots, batch_size)
+    for repository, fields in (
+        (repos.spots, ("owner_id", "invite_user_ids")),
+        (repos.favorites, ("user_id", "spot_id")),
+        (repos.follows, ("follower_id", "followee_id")),
+        (repos.follow_requests, ("follower_id", "followee_id")),
+        (repos.blocks, ("blocker_id", "blocked_id")),
+        (repos.shares, ("user_id", "spot_id")),
+    ):
+        counts.update(_normalize_refs(repository, fields, batch_size))
+    return counts
+
+
+def _backfill_pair_keys(repository: MongoRepository, fields: tuple[str, str], batch_size: int) -> int:
+    updated = 0
+    after: Any = None
+    missing = {"pair_key": {"$exists": False}}
+    while True:
+        query = missing if after is None else {**missing, "_id": {"$gt": after}}
+        rows = list(
+            repository.collection.find(query, {field: 1 for field in fields})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .batch_size(batch_size)
+        )
+        if not rows:
+            break
+        after = rows[-1]["_id"]
+        written, _ = _bulk(
+            repository,
+            [UpdateOne({"_id": row["_id"]}, {"$set": {"pair_key": pair_key(row.get(fields[0]), row.get(fields[1]))}}) for row in rows],
+        )
+        updated += written
+        renew_lease()
+    return updated
+
+
+def _pair_keys(batch_size: int) -> dict[str, int]:
+    repos = get_social_repositories()
+    return {
+        repository.collection_name: _backfill_pair_keys(repository, fields, batch_size)
+        for repository, fields in (
+            (repos.blocks, ("blocker_id", "blocked_id")),
+            (repos.follows, ("follower_id", "followee_id")),
+            (repos.follow_requests, ("follower_id", "followee_id")),
+        )
+    }
+
+
+def register_social_migrations(runner: MigrationRunner) -> None:
+    runner.register(1, "objectid_refs", _objectid_refs)
+    runner.register(PAIR_KEYS_MIGRATION, "pair_keys", _pair_keys)
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
-from datetime import UTC, datetime
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import json
 import os
 import re
-from threading import Lock
-from typing import Any
+import time
+from typing import Any, Callable, Iterable, Literal
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pymongo import ASCENDING
-from pymongo.errors import DuplicateKeyError
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
+from data.config import auth_db_name, env_int
 from routing.admin_setup import get_current_admin_user
 
 from data.dto import (
+    SPOT_INDEXES,
     BlockRef,
     FavoriteRef,
     FollowRef,
@@ -22,13 +27,55 @@ from data.dto import (
     ShareRequest,
     SpotPublic,
     SpotUpsertRequest,
+    StreamTokenResponse,
+    SupportTicketCounts,
+    SupportTicketPage,
     SupportTicketPublic,
     SupportTicketRequest,
+    SyncChange,
+    SyncPage,
+    TombstoneRecord,
     UpdateProfileRequest,
     UserPublic,
 )
+from data.ids import doc_id_filter, doc_ids_filter, pair_key, ref_filter, refs_filter, stored_ref, stored_refs
+from data.indexes import index
+from data.job_queue import JobQueue, get_job_queue
+from data.migrations import MIGRATION_DONE, get_migration_runner
 from data.mongo_repository import MongoRepository
-from routing.auth_routes import get_auth_user_repository, get_current_user, password_extension
+from routing.auth_routes import (
+    get_auth_user_repository,
+    get_current_user,
+    get_current_user_for_stream,
+    password_extension,
+    session_extension,
+    token_extension,
+)
+from routing.cache_relay import get_cache_invalidation_relay
+from routing.live_events import LiveEvents, event_stream, get_live_events, heartbeat_seconds
+from routing.rate_limit import rate_limit
+from routing.social_graph import get_social_graph_cache
+from routing.social_sync import (
+    SyncPhase,
+    SyncWindow,
+    collect_changes,
+    decode_sync_cursor,
+    encode_sync_cursor,
+    parse_since,
+    tombstone,
+)
+from routing.spot_tiles import (
+    TileEntry,
+    TileKey,
+    encode_tile,
+    get_spot_tile_cache,
+    invalidate_spot_tiles,
+    is_valid_tile,
+    spot_tile_row,
+    tile_max_rows,
+    tile_spot_query,
+    without_owners,
+)
 
 
 class _SocialRepositories:
@@ -38,53 +85,89 @@ class _SocialRepositories:
             collection_name="spots",
             model_type=SpotUpsertRequest,
             db_name=_spots_db_name(),
+            indexes=SPOT_INDEXES,
         )
         self.favorites = MongoRepository(
             collection_name="favorites",
             model_type=FavoriteRef,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            indexes=[index("user_id", "spot_id", unique=True), index("spot_id"), index("user_id", "updated_at")],
         )
         self.follows = MongoRepository(
             collection_name="follows",
             model_type=FollowRef,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            indexes=[
+                index("follower_id", "followee_id", unique=True),
+                index("followee_id"),
+                index("pair_key"),
+                index("created_at"),
+                index("follower_id", "updated_at"),
+                index("followee_id", "updated_at"),
+            ],
         )
         self.follow_requests = MongoRepository(
             collection_name="follow_requests",
             model_type=FollowRequestRef,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            indexes=[index("follower_id", "followee_id", unique=True), index("followee_id"), index("pair_key")],
         )
         self.blocks = MongoRepository(
             collection_name="blocks",
             model_type=BlockRef,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            indexes=[
+                index("blocker_id", "blocked_id", unique=True),
+                index("blocked_id"),
+                index("pair_key"),
+                index("blocker_id", "updated_at"),
+                index("blocked_id", "updated_at"),
+            ],
         )
         self.shares = MongoRepository(
             collection_name="shares",
             model_type=ShareRequest,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            indexes=[index("user_id", "spot_id", "created_at"), index("created_at")],
         )
         self.support_tickets = MongoRepository(
             collection_name="support_tickets",
             model_type=SupportTicketRequest,
-            db_name=_social_db_name(),
+            db_name=auth_db_name(),
+            # `_id` breaks ties in the admin list's keyset order, so it is part of every index.
+            indexes=[
+                index("user_id", ("created_at", -1), ("_id", -1)),
+                index("status", ("created_at", -1), ("_id", -1)),
+                index("category", ("created_at", -1), ("_id", -1)),
+                index(("created_at", -1), ("_id", -1)),
+            ],
+        )
+        # Deleted spots, favorites, follows and blocks, for GET /social/sync.
+        self.tombstones = MongoRepository(
+            collection_name="tombstones",
+            model_type=TombstoneRecord,
+            db_name=auth_db_name(),
+            indexes=[
+                index("deleted_at", ttl_seconds=tombstone_retention_days() * 86400),
+                index("user_ids", "deleted_at"),
+                index("kind", "data.visibility", "deleted_at"),
+            ],
         )
 
 
 _SOCIAL_REPOS: _SocialRepositories | None = None
 _SOCIAL_ROUTER: APIRouter | None = None
-_INDEX_LOCK = Lock()
-_INDEXES_READY = False
-
-
-def _social_db_name() -> str:
-    return str(os.getenv("MONGO_AUTH_DB") or "SpotOnSightAuth").strip() or "SpotOnSightAuth"
 
 
 def _spots_db_name() -> str:
     return str(os.getenv("MONGO_SPOTS_DB") or "spot_on_sight").strip() or "spot_on_sight"
 
 
+def tombstone_retention_days() -> int:
+    """Tombstones older than this expire; clients that last synced earlier must resync fully."""
+    return max(1, env_int("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+
 def _repos() -> _SocialRepositories:
     global _SOCIAL_REPOS
     if _SOCIAL_REPOS is None:
@@ -92,38 +175,8 @@ def _repos() -> _SocialRepositories:
     return _SOCIAL_REPOS
 
 
-def _ensure_indexes() -> None:
-    global _INDEXES_READY
-    if _INDEXES_READY:
-        return
-
-    with _INDEX_LOCK:
-        if _INDEXES_READY:
-            return
-
-        repos = _repos()
-        repos.favorites.collection.create_index([("user_id", ASCENDING), ("spot_id", ASCENDING)], unique=True)
-        repos.follows.collection.create_index([("follower_id", ASCENDING), ("followee_id", ASCENDING)], unique=True)
-        repos.follow_requests.collection.create_index(
-            [("follower_id", ASCENDING), ("followee_id", ASCENDING)],
-            unique=True,
-        )
-        repos.blocks.collection.create_index([("blocker_id", ASCENDING), ("blocked_id", ASCENDING)], unique=True)
-        repos.shares.collection.create_index([("user_id", ASCENDING), ("spot_id", ASCENDING), ("created_at", ASCENDING)])
-        repos.support_tickets.collection.create_index([("user_id", ASCENDING), ("created_at", ASCENDING)])
-        repos.support_tickets.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
-
-        repos.spots.collection.create_index([("owner_id", ASCENDING)])
-        repos.spots.collection.create_index([("visibility", ASCENDING)])
-        repos.spots.collection.create_index([("invite_user_ids", ASCENDING)])
-
-        _INDEXES_READY = True
-
-
-@asynccontextmanager
-async def _social_lifespan(_app):
-    _ensure_indexes()
-    yield
+def get_social_repositories() -> _SocialRepositories:
+    return _repos()
 
 
 def _serialize_id(value: Any) -> str:
@@ -204,6 +257,9 @@ def _safe_user_projection() -> dict[str, int]:
     }
 
 
+USER_BATCH_MAX_IDS = 200
+
+
 def _parse_object_id(value: str) -> ObjectId:
     text = _as_text(value)
     if not ObjectId.is_valid(text):
@@ -215,10 +271,66 @@ def _spot_lookup_query(spot_id: str) -> dict[str, Any]:
     text = _as_text(spot_id)
     if not text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ID format")
-    if ObjectId.is_valid(text):
-        oid = ObjectId(text)
-        return {"$or": [{"_id": oid}, {"_id": text}]}
-    return {"_id": text}
+    return {"_id": doc_id_filter(text)}
+
+
+def _edge_query(**refs: str) -> dict[str, Any]:
+    """Query for one relationship row, e.g. `_edge_query(follower_id=a, followee_id=b)`."""
+    return {field: ref_filter(value) for field, value in refs.items()}
+
+
+def _insert_edge(repository: MongoRepository, refs: dict[str, str], fields: dict[str, Any]) -> dict[str, Any] | None:
+    """Insert a relationship row unless one exists in either id form; the new row, or None.
+
+    An upsert instead of insert + DuplicateKeyError: while old rows still hold string
+    ids the unique index does not see them as duplicates of new ObjectId rows.
+    """
+    doc = {**{field: stored_ref(value) for field, value in refs.items()}, **fields}
+    try:
+        result = repository.collection.update_one(_edge_query(**refs), {"$setOnInsert": doc}, upsert=True)
+    except DuplicateKeyError:
+        return None
+    if result.upserted_id is None:
+        return None
+    return {"_id": result.upserted_id, **doc}
+
+
+def _upsert_edge(repository: MongoRepository, refs: dict[str, str], fields: dict[str, Any]) -> None:
+    """Set `fields` on a relationship row, creating it if needed; see `_insert_edge`."""
+    on_insert = {field: stored_ref(value) for field, value in refs.items()}
+    try:
+        repository.collection.update_one(_edge_query(**refs), {"$set": fields, "$setOnInsert": on_insert}, upsert=True)
+    except DuplicateKeyError:
+        pass
+
+
+def _encode_cursor(created_at: Any, doc_id: Any) -> str:
+    """Opaque keyset cursor for lists sorted by (created_at desc, _id desc)."""
+    stamp = created_at.isoformat() if isinstance(created_at, datetime) else ""
+    raw = json.dumps({"t": stamp, "id": _serialize_id(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _cursor_query(cursor: str) -> dict[str, Any]:
+    text = _as_text(cursor)
+    try:
+        raw = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+        data = json.loads(raw)
+        stamp = str(data["t"])
+        created_at = datetime.fromisoformat(stamp) if stamp else None
+        doc_id = _parse_object_id(str(data["id"]))
+    except (binascii.Error, ValueError, KeyError, TypeError, HTTPException) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+    # Rows without a `created_at` sort after all others and are paged by `_id` alone.
+    if created_at is None:
+        return {"created_at": None, "_id": {"$lt": doc_id}}
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+            {"created_at": None},
+        ]
+    }
 
 
 def _spot_document_by_id(repos: _SocialRepositories, spot_id: str) -> dict[str, Any] | None:
@@ -230,29 +342,146 @@ def _viewer_user_id(current_user: dict[str, Any]) -> str:
 
 
 def _is_following(repos: _SocialRepositories, follower_id: str, followee_id: str) -> bool:
+    """Pair check from the follower's cached set when there is one; otherwise one edge
+    lookup instead of loading every followee."""
     if not follower_id or not followee_id:
         return False
-    return repos.follows.count_documents(
-        {"follower_id": follower_id, "followee_id": followee_id},
-        limit=1,
-    ) > 0
+    followee_ids = get_social_graph_cache().peek("following", follower_id)
+    if followee_ids is not None:
+        return followee_id in followee_ids
+    return _is_following_uncached(repos, follower_id, followee_id)
+
+
+def _is_following_uncached(repos: _SocialRepositories, follower_id: str, followee_id: str) -> bool:
+    if not follower_id or not followee_id:
+        return False
+    return repos.follows.find_one(_edge_query(follower_id=follower_id, followee_id=followee_id), {"_id": 1}) is not None
 
 
 def _is_blocked_pair(repos: _SocialRepositories, user_a: str, user_b: str) -> bool:
     if not user_a or not user_b:
         return False
-    return repos.blocks.count_documents(
-        {
-            "$or": [
-                {"blocker_id": user_a, "blocked_id": user_b},
-                {"blocker_id": user_b, "blocked_id": user_a},
-            ]
-        },
-        limit=1,
-    ) > 0
-
-
-def _can_view_spot(repos: _SocialRepositories, viewer_id: str, spot_doc: dict[str, Any]) -> bool:
+    return user_b in _blocked_user_ids(repos, user_a)
+
+
+def _is_blocked_pair_uncached(repos: _SocialRepositories, user_a: str, user_b: str) -> bool:
+    """`_is_blocked_pair` read from storage, for writes: a block made on another worker
+    may not have reached this worker's cache yet."""
+    if not user_a or not user_b:
+        return False
+    query = _pairs_query([(user_a, user_b)], ("blocker_id", "blocked_id"))
+    return repos.blocks.find_one(query, {"_id": 1}) is not None
+
+
+def _load_blocked_user_ids(repos: _SocialRepositories, user_id: str) -> set[str]:
+    """Users that blocked `user_id` or were blocked by them, in one query."""
+    rows = repos.blocks.find_many(
+        {"$or": [{"blocker_id": ref_filter(user_id)}, {"blocked_id": ref_filter(user_id)}]},
+        {"blocker_id": 1, "blocked_id": 1},
+    )
+    out: set[str] = set()
+    for row in rows:
+        blocker_id = _as_text(row.get("blocker_id"))
+        out.add(_as_text(row.get("blocked_id")) if blocker_id == user_id else blocker_id)
+    out.discard("")
+    return out
+
+
+def _blocked_user_ids(repos: _SocialRepositories, user_id: str) -> frozenset[str]:
+    if not user_id:
+        return frozenset()
+    return get_social_graph_cache().get("blocked", user_id, lambda: _load_blocked_user_ids(repos, user_id))
+
+
+PAIR_KEYS_MIGRATION = 2
+_PAIR_KEYS_RECHECK_SECONDS = 300.0
+_PAIR_KEYS_DONE = False
+_PAIR_KEYS_CHECKED_AT: float | None = None
+
+
+def _pair_keys_backfilled() -> bool:
+    """Whether the pair_keys migration is recorded done. Until then rows written before
+    it may lack `pair_key`; re-checked every few minutes, and never again once done."""
+    global _PAIR_KEYS_DONE, _PAIR_KEYS_CHECKED_AT
+    now = time.monotonic()
+    if not _PAIR_KEYS_DONE and (_PAIR_KEYS_CHECKED_AT is None or now - _PAIR_KEYS_CHECKED_AT >= _PAIR_KEYS_RECHECK_SECONDS):
+        _PAIR_KEYS_CHECKED_AT = now
+        record = get_migration_runner().repository.find_one({"_id": PAIR_KEYS_MIGRATION}, {"status": 1}) or {}
+        _PAIR_KEYS_DONE = record.get("status") == MIGRATION_DONE
+    return _PAIR_KEYS_DONE
+
+
+def _pairs_query(pairs: Iterable[tuple[str, str]], fields: tuple[str, str]) -> dict[str, Any]:
+    """Edges between any of `pairs`, in either direction: one `pair_key` lookup, OR-ed
+    with the two id fields while rows without a key may still exist."""
+    by_user: dict[str, set[str]] = {}
+    for user_a, user_b in pairs:
+        if user_a and user_b:
+            by_user.setdefault(user_a, set()).add(user_b)
+    query: dict[str, Any] = {
+        "pair_key": {"$in": sorted({pair_key(user_a, user_b) for user_a, others in by_user.items() for user_b in others})}
+    }
+    if _pair_keys_backfilled():
+        return query
+    first, second = fields
+    legacy: list[dict[str, Any]] = []
+    for user_id, others in sorted(by_user.items()):
+        legacy.append({first: ref_filter(user_id), second: refs_filter(sorted(others))})
+        legacy.append({first: refs_filter(sorted(others)), second: ref_filter(user_id)})
+    return {"$or": [query, *legacy]}
+
+
+def _blocked_ids_among(repos: _SocialRepositories, user_id: str, candidate_ids: Iterable[str]) -> set[str]:
+    """Which of `candidate_ids` are on either side of a block with `user_id`: the cached
+    block set when there is one, otherwise one `pair_key` lookup for the whole batch."""
+    candidates = {candidate for candidate in candidate_ids if candidate and candidate != user_id}
+    if not user_id or not candidates:
+        return set()
+    cached = get_social_graph_cache().peek("blocked", user_id)
+    if cached is not None:
+        return candidates & cached
+    rows = repos.blocks.find_many(
+        _pairs_query(((user_id, candidate) for candidate in candidates), ("blocker_id", "blocked_id")),
+        {"blocker_id": 1, "blocked_id": 1},
+    )
+    out = {_as_text(row.get(field)) for row in rows for field in ("blocker_id", "blocked_id")}
+    return out & candidates
+
+
+def _load_followee_ids(repos: _SocialRepositories, user_id: str) -> list[str]:
+    rows = repos.follows.find_many({"follower_id": ref_filter(user_id)}, {"followee_id": 1})
+    return [fid for fid in (_as_text(row.get("followee_id")) for row in rows) if fid]
+
+
+def _followee_ids(repos: _SocialRepositories, user_id: str) -> frozenset[str]:
+    if not user_id:
+        return frozenset()
+    return get_social_graph_cache().get("following", user_id, lambda: _load_followee_ids(repos, user_id))
+
+
+@dataclass(frozen=True)
+class _ViewerGraph:
+    """Block and follow edges of one viewer, loaded once so list endpoints stay O(1) in queries."""
+
+    viewer_id: str
+    blocked_ids: frozenset[str]
+    followee_ids: frozenset[str]
+
+
+def _viewer_graph(repos: _SocialRepositories, viewer_id: str, *, followees: bool = True) -> _ViewerGraph:
+    return _ViewerGraph(
+        viewer_id=viewer_id,
+        blocked_ids=_blocked_user_ids(repos, viewer_id),
+        followee_ids=_followee_ids(repos, viewer_id) if followees else frozenset(),
+    )
+
+
+def _spot_visible(
+    viewer_id: str,
+    spot_doc: dict[str, Any],
+    is_blocked: Callable[[str], bool],
+    is_following: Callable[[str], bool],
+) -> bool:
     owner_id = _spot_owner_id(spot_doc)
     visibility = _spot_visibility(spot_doc)
 
@@ -260,7 +489,7 @@ def _can_view_spot(repos: _SocialRepositories, viewer_id: str, spot_doc: dict[st
         return visibility == "public"
     if viewer_id and viewer_id == owner_id:
         return True
-    if viewer_id and _is_blocked_pair(repos, viewer_id, owner_id):
+    if viewer_id and is_blocked(owner_id):
         return False
 
     if visibility == "public":
@@ -268,12 +497,65 @@ def _can_view_spot(repos: _SocialRepositories, viewer_id: str, spot_doc: dict[st
     if visibility == "personal":
         return False
     if visibility == "following":
-        return _is_following(repos, viewer_id, owner_id)
+        return is_following(owner_id)
     if visibility == "invite_only":
         return viewer_id in set(_normalize_id_list(spot_doc.get("invite_user_ids")))
     return False
 
 
+def _can_view_spot(repos: _SocialRepositories, viewer_id: str, spot_doc: dict[str, Any], *, uncached: bool = False) -> bool:
+    """Single-spot check; list endpoints use `_can_view_spot_in_graph` instead. Writes
+    pass `uncached` to read blocks and follows from storage rather than the graph cache."""
+    if uncached:
+        return _spot_visible(
+            viewer_id,
+            spot_doc,
+            lambda owner_id: _is_blocked_pair_uncached(repos, viewer_id, owner_id),
+            lambda owner_id: _is_following_uncached(repos, viewer_id, owner_id),
+        )
+    return _spot_visible(
+        viewer_id,
+        spot_doc,
+        lambda owner_id: _is_blocked_pair(repos, viewer_id, owner_id),
+        lambda owner_id: _is_following(repos, viewer_id, owner_id),
+    )
+
+
+def _can_view_spot_in_graph(graph: _ViewerGraph, spot_doc: dict[str, Any]) -> bool:
+    return _spot_visible(
+        graph.viewer_id,
+        spot_doc,
+        graph.blocked_ids.__contains__,
+        graph.followee_ids.__contains__,
+    )
+
+
+def _visible_spots_query(graph: _ViewerGraph) -> dict[str, Any]:
+    """`_can_view_spot_in_graph` as a query, so scans skip rows the viewer cannot see.
+    It may match a few extra rows (e.g. visibility in odd casing); callers still check."""
+    shared: dict[str, Any] = {
+        "$or": [
+            {"visibility": {"$nin": ["following", "invite_only", "personal"]}},
+            {"visibility": "following", "owner_id": refs_filter(graph.followee_ids)},
+            {"visibility": "invite_only", "invite_user_ids": ref_filter(graph.viewer_id)},
+        ]
+    }
+    if graph.blocked_ids:
+        shared = {"$and": [{"owner_id": {"$nin": refs_filter(graph.blocked_ids)["$in"]}}, shared]}
+    return {"$or": [{"owner_id": ref_filter(graph.viewer_id)}, shared]}
+
+
+def _spot_tombstone(spot_id: str, spot_doc: dict[str, Any]) -> dict[str, Any]:
+    """Owner, and invitees of invite-only spots, as recipients; public and following
+    spots are matched on `data` by the sync query, like `_visible_spots_query`."""
+    owner_id = _spot_owner_id(spot_doc)
+    visibility = _spot_visibility(spot_doc)
+    audience = [owner_id]
+    if visibility == "invite_only":
+        audience += _normalize_id_list(spot_doc.get("invite_user_ids"))
+    return tombstone("spot", spot_id, audience, {"owner_id": owner_id, "visibility": visibility})
+
+
 def _can_view_private_user(repos: _SocialRepositories, target_user: dict[str, Any], viewer_id: str) -> bool:
     target_id = _serialize_id(target_user.get("_id"))
     if viewer_id == target_id:
@@ -338,8 +620,9 @@ def _to_support_ticket_public(doc: dict[str, Any]) -> SupportTicketPublic:
 
 
 def _build_spot_doc(payload: SpotUpsertRequest, owner_id: str, created_at: datetime | None = None) -> dict[str, Any]:
+    now = datetime.now(UTC)
     return {
-        "owner_id": owner_id,
+        "owner_id": stored_ref(owner_id),
         "title": _as_text(payload.title),
         "description": _as_text(payload.description),
         "tags": [_as_text(tag) for tag in payload.tags if _as_text(tag)],
@@ -347,63 +630,356 @@ def _build_spot_doc(payload: SpotUpsertRequest, owner_id: str, created_at: datet
         "lon": _as_float(payload.lon, 0.0),
         "images": [_as_text(img) for img in payload.images if _as_text(img)],
         "visibility": payload.visibility,
-        "invite_user_ids": _normalize_id_list(payload.invite_user_ids),
-        "created_at": created_at or datetime.now(UTC),
+        "invite_user_ids": stored_refs(_normalize_id_list(payload.invite_user_ids)),
+        "created_at": created_at or now,
+        "updated_at": now,
     }
 
 
+def _favorite_spot_projection(expand_spot: bool, images: str) -> dict[str, Any] | None:
+    if not expand_spot:
+        # Only what the visibility check reads; skips the image payloads.
+        return {"owner_id": 1, "visibility": 1, "invite_user_ids": 1}
+    if images == "none":
+        return {"images": 0}
+    if images == "thumbnail":
+        return {"images": {"$slice": 1}}
+    return None
+
+
 def _visible_favorite_refs(
     repos: _SocialRepositories,
     rows: list[dict[str, Any]],
     viewer_user_id: str,
+    *,
+    expand_spot: bool = False,
+    images: str = "all",
 ) -> list[FavoriteRef]:
+    """Favorites whose spot the viewer can see, from one spot `$in` query and one graph
+    load. With `expand_spot` the loaded spot documents are returned inline."""
     spot_ids = [_as_text(row.get("spot_id")) for row in rows]
     unique_spot_ids = list(dict.fromkeys([sid for sid in spot_ids if sid]))
     if not unique_spot_ids:
         return []
 
-    lookup_ids: list[Any] = []
-    for sid in unique_spot_ids:
-        lookup_ids.append(sid)
-        if ObjectId.is_valid(sid):
-            lookup_ids.append(ObjectId(sid))
-
     spot_docs = list(
         repos.spots.collection.find(
-            {"_id": {"$in": lookup_ids}},
-        )
+            {"_id": doc_ids_filter(unique_spot_ids)},
+            _favorite_spot_projection(expand_spot, images),
+        ).batch_size(len(unique_spot_ids))
     )
-    visible_ids = {
-        _serialize_id(doc.get("_id"))
+    graph = _viewer_graph(repos, viewer_user_id)
+    visible = {
+        _serialize_id(doc.get("_id")): doc
         for doc in spot_docs
-        if _can_view_spot(repos, viewer_user_id, doc)
+        if _can_view_spot_in_graph(graph, doc)
     }
 
     out: list[FavoriteRef] = []
     for row in rows:
         sid = _as_text(row.get("spot_id"))
-        if sid not in visible_ids:
+        spot_doc = visible.get(sid)
+        if spot_doc is None:
             continue
         out.append(
             FavoriteRef(
                 spot_id=sid,
                 created_at=row.get("created_at") or datetime.now(UTC),
+                spot=_to_spot_public(spot_doc) if expand_spot else None,
             )
         )
     return out
 
 
+def _tile_key_or_400(z: int, x: int, y: int) -> TileKey:
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid tile coordinates")
+    return z, x, y
+
+
+def _load_public_tile(repos: _SocialRepositories, key: TileKey) -> TileEntry:
+    cache = get_spot_tile_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    epoch = cache.epoch
+    query = tile_spot_query(*key)
+    query["visibility"] = {"$nin": ["following", "invite_only", "personal"]}
+    docs = repos.spots.collection.find(
+        query,
+        {"owner_id": 1, "title": 1, "lat": 1, "lon": 1, "tags": 1, "images": 1, "created_at": 1},
+    ).sort("created_at", -1).limit(tile_max_rows())
+    entry = encode_tile(key, [spot_tile_row(doc) for doc in docs])
+    cache.put(key, entry, epoch=epoch)
+    return entry
+
+
+def _tile_response(body: bytes, etag: str, if_none_match: str | None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _record_tombstones(repos: _SocialRepositories, docs: list[dict[str, Any]]) -> None:
+    if docs:
+        repos.tombstones.insert_many(docs)
+
+
+def _favorite_tombstone(row: dict[str, Any]) -> dict[str, Any]:
+    user_id = _as_text(row.get("user_id"))
+    return tombstone("favorite", _as_text(row.get("spot_id")), [user_id], {"user_id": user_id})
+
+
+def _follow_tombstone(row: dict[str, Any]) -> dict[str, Any]:
+    follower_id = _as_text(row.get("follower_id"))
+    followee_id = _as_text(row.get("followee_id"))
+    return tombstone(
+        "follow",
+        f"{follower_id}:{followee_id}",
+        [follower_id, followee_id],
+        {"follower_id": follower_id, "followee_id": followee_id},
+    )
+
+
+def _block_tombstone(blocker_id: str, blocked_id: str) -> dict[str, Any]:
+    return tombstone("block", blocked_id, [blocker_id, blocked_id], {"blocker_id": blocker_id, "blocked_id": blocked_id})
+
+
+def _sync_token(until: datetime) -> str:
+    # Overlap the next window a little, so a write stamped just before `until` on another
+    # worker but committed after this read is still picked up. Replays are idempotent.
+    return (until - timedelta(seconds=max(0, env_int("SYNC_OVERLAP_SECONDS", 5)))).isoformat()
+
+
+def _sync_fetch(repository: MongoRepository, query: dict[str, Any], projection: dict[str, int] | None = None):
+    def fetch(after_id: Any, limit: int) -> list[dict[str, Any]]:
+        page_query = query if after_id is None else {"$and": [query, {"_id": {"$gt": after_id}}]}
+        return list(repository.collection.find(page_query, projection).sort("_id", 1).limit(limit).batch_size(limit))
+
+    return fetch
+
+
+def _graph_changed_owner_ids(repos: _SocialRepositories, viewer_id: str, window: SyncWindow) -> list[str]:
+    """Users whose spots may have changed visibility for the viewer: follow and block
+    edges involving the viewer that were created or deleted inside the window."""
+    owners: set[str] = set()
+    for row in repos.follows.find_many(window.within({"follower_id": ref_filter(viewer_id)}), {"followee_id": 1}):
+        owners.add(_as_text(row.get("followee_id")))
+    blocks = repos.blocks.find_many(
+        window.within({"$or": [{"blocker_id": ref_filter(viewer_id)}, {"blocked_id": ref_filter(viewer_id)}]}),
+        {"blocker_id": 1, "blocked_id": 1},
+    )
+    for row in blocks:
+        owners.update({_as_text(row.get("blocker_id")), _as_text(row.get("blocked_id"))})
+    deleted = repos.tombstones.find_many(
+        window.within({"user_ids": viewer_id, "kind": {"$in": ["follow", "block"]}}, "deleted_at"),
+        {"kind": 1, "user_ids": 1, "data": 1},
+    )
+    for row in deleted:
+        if row.get("kind") == "follow" and _as_text((row.get("data") or {}).get("follower_id")) != viewer_id:
+            continue
+        owners.update(_as_text(user_id) for user_id in row.get("user_ids") or [])
+    owners.discard(viewer_id)
+    owners.discard("")
+    return sorted(owners)
+
+
+def _sync_phases(repos: _SocialRepositories, viewer_id: str, window: SyncWindow) -> list[SyncPhase]:
+    graph = _viewer_graph(repos, viewer_id)
+    initial = window.since is None
+
+    def spot_change(doc: dict[str, Any]) -> list[SyncChange]:
+        spot_id = _serialize_id(doc.get("_id"))
+        updated_at = doc.get("updated_at") or doc.get("created_at")
+        if _can_view_spot_in_graph(graph, doc):
+            data = _to_spot_public(doc).model_dump(mode="json")
+            return [SyncChange(kind="spot", op="upsert", id=spot_id, updated_at=updated_at, data=data)]
+        if initial:
+            return []
+        # Changed but no longer visible (visibility, invites, follow or block changes).
+        return [SyncChange(kind="spot", op="delete", id=spot_id, updated_at=updated_at)]
+
+    def favorite_change(row: dict[str, Any]) -> list[SyncChange]:
+        ref = FavoriteRef(spot_id=_as_text(row.get("spot_id")), created_at=row.get("created_at") or datetime.now(UTC))
+        return [SyncChange(kind="favorite", op="upsert", id=ref.spot_id, updated_at=row.get("updated_at"), data=ref.model_dump(mode="json", exclude_none=True))]
+
+    def follow_change(row: dict[str, Any]) -> list[SyncChange]:
+        follower_id = _as_text(row.get("follower_id"))
+        followee_id = _as_text(row.get("followee_id"))
+        data = {"follower_id": follower_id, "followee_id": followee_id, "created_at": row.get("created_at")}
+        return [SyncChange(kind="follow", op="upsert", id=f"{follower_id}:{followee_id}", updated_at=row.get("updated_at"), data=data)]
+
+    def block_change(row: dict[str, Any]) -> list[SyncChange]:
+        ref = BlockRef(user_id=_as_text(row.get("blocked_id")), created_at=row.get("created_at") or datetime.now(UTC))
+        return [SyncChange(kind="block", op="upsert", id=ref.user_id, updated_at=row.get("updated_at"), data=ref.model_dump(mode="json"))]
+
+    def tombstone_change(row: dict[str, Any]) -> list[SyncChange]:
+        data = row.get("data") or {}
+        if row.get("kind") == "block" and _as_text(data.get("blocker_id")) != viewer_id:
+            return []
+        return [SyncChange(kind=row.get("kind"), op="delete", id=_as_text(row.get("entity_id")), updated_at=row.get("deleted_at"))]
+
+    # A delta sync also needs changed spots the viewer can no longer see, to delete them;
+    # the window keeps that scan small. A first sync only wants the visible ones.
+    spots = window.within(_visible_spots_query(graph) if initial else {})
+    phases = [SyncPhase("spots", _sync_fetch(repos.spots, spots), spot_change)]
+    owner_ids: list[str] = []
+    if not initial:
+        owner_ids = _graph_changed_owner_ids(repos, viewer_id, window)
+        if owner_ids:
+            phases.append(SyncPhase("graph_spots", _sync_fetch(repos.spots, {"owner_id": refs_filter(owner_ids)}), spot_change))
+    phases += [
+        SyncPhase("favorites", _sync_fetch(repos.favorites, window.within({"user_id": ref_filter(viewer_id)})), favorite_change),
+        SyncPhase(
+            "follows",
+            _sync_fetch(
+                repos.follows,
+                window.within({"$or": [{"follower_id": ref_filter(viewer_id)}, {"followee_id": ref_filter(viewer_id)}]}),
+            ),
+            follow_change,
+        ),
+        SyncPhase("blocks", _sync_fetch(repos.blocks, window.within({"blocker_id": ref_filter(viewer_id)})), block_change),
+    ]
+    if not initial:
+        # Spot deletes recorded before tombstones carried a visibility go to everyone.
+        recipients: list[dict[str, Any]] = [
+            {"user_ids": viewer_id},
+            {"kind": "spot", "data.visibility": {"$in": ["public", None]}},
+        ]
+        following_owner_ids = sorted(graph.followee_ids | set(owner_ids))
+        if following_owner_ids:
+            recipients.append({"kind": "spot", "data.visibility": "following", "data.owner_id": {"$in": following_owner_ids}})
+        tombstones = window.within({"$or": recipients}, "deleted_at")
+        phases.append(SyncPhase("tombstones", _sync_fetch(repos.tombstones, tombstones), tombstone_change))
+    return phases
+
+
+def _register_social_jobs(queue: JobQueue, repos: _SocialRepositories) -> None:
+    """Cascades and analytics writes that run on the job queue instead of the request path."""
+
+    def spot_deleted(payloads: list[dict[str, Any]]) -> None:
+        spot_ids = sorted({_as_text(sid) for payload in payloads for sid in payload.get("spot_ids", []) if _as_text(sid)})
+        if not spot_ids:
+            return
+        favorites = repos.favorites.find_many({"spot_id": refs_filter(spot_ids)}, {"user_id": 1, "spot_id": 1})
+        repos.favorites.delete_many({"spot_id": refs_filter(spot_ids)})
+        _record_tombstones(repos, [_favorite_tombstone(row) for row in favorites])
+        repos.shares.delete_many({"spot_id": refs_filter(spot_ids)})
+
+    def block_cascade(payloads: list[dict[str, Any]]) -> None:
+        # Follows and follow requests in either direction share the pair's key.
+        pairs: dict[str, tuple[str, str]] = {}
+        for payload in payloads:
+            blocker_id, blocked_id = _as_text(payload.get("blocker_id")), _as_text(payload.get("blocked_id"))
+            if blocker_id and blocked_id:
+                pairs[pair_key(blocker_id, blocked_id)] = (blocker_id, blocked_id)
+        if not pairs:
+            return
+        # A retry that runs after an unblock must not remove a follow made since.
+        blocks = repos.blocks.find_many(_pairs_query(pairs.values(), ("blocker_id", "blocked_id")), {"blocker_id": 1, "blocked_id": 1})
+        blocked = {pair_key(row.get("blocker_id"), row.get("blocked_id")) for row in blocks}
+        pairs = {key: pair for key, pair in pairs.items() if key in blocked}
+        if not pairs:
+            return
+        query = _pairs_query(pairs.values(), ("follower_id", "followee_id"))
+        follows = repos.follows.find_many(query, {"follower_id": 1, "followee_id": 1})
+        repos.follows.delete_many(query)
+        get_social_graph_cache().invalidate(
+            *{_as_text(row.get(field)) for row in follows for field in ("follower_id", "followee_id")}
+        )
+        _record_tombstones(repos, [_follow_tombstone(row) for row in follows])
+        repos.follow_requests.delete_many(query)
+
+    def record_shares(payloads: list[dict[str, Any]]) -> None:
+        # `created_at` is when the share was requested; `recorded_at` is when the row
+        # landed, which is what the admin metrics watermark follows.
+        recorded_at = datetime.now(UTC)
+        rows: list[dict[str, Any]] = []
+        for payload in payloads:
+            row = {
+                **{field: value for field, value in payload.items() if field != "share_id"},
+                "user_id": stored_ref(payload.get("user_id")),
+                "spot_id": stored_ref(payload.get("spot_id")),
+                "updated_at": payload.get("created_at"),
+                "recorded_at": recorded_at,
+            }
+            share_id = _as_text(payload.get("share_id"))
+            if ObjectId.is_valid(share_id):
+                row["_id"] = ObjectId(share_id)
+            rows.append(row)
+        try:
+            repos.shares.insert_many(rows, ordered=False)
+        except BulkWriteError as e:
+            # The `_id` is chosen at enqueue time, so rows a failed attempt already wrote
+            # come back as duplicates on retry and are skipped.
+            errors = (e.details or {}).get("writeErrors") or []
+            if any(int(error.get("code") or 0) != 11000 for error in errors):
+                raise
+
+    queue.register("social.spot_deleted", spot_deleted, batch_size=50)
+    queue.register("social.block_cascade", block_cascade, batch_size=50)
+    queue.register("social.record_share", record_shares, batch_size=200)
+
+
+def _register_live_events(live: LiveEvents, repos: _SocialRepositories) -> None:
+    """Who hears about which write on GET /social/events. Payloads carry ids only;
+    clients fetch or sync the rows themselves."""
+
+    def follow_request(row: dict[str, Any]):
+        follower_id = _as_text(row.get("follower_id"))
+        return [_as_text(row.get("followee_id"))], {"follower_id": follower_id}
+
+    def follow(row: dict[str, Any]):
+        # The follower learns their request was approved; the followee gains a follower.
+        follower_id = _as_text(row.get("follower_id"))
+        followee_id = _as_text(row.get("followee_id"))
+        return [follower_id, followee_id], {"follower_id": follower_id, "followee_id": followee_id}
+
+    def spot(doc: dict[str, Any]):
+        owner_id = _spot_owner_id(doc)
+        visibility = _spot_visibility(doc)
+        connected = live.bus.connected_user_ids() - {owner_id}
+        if not owner_id or visibility == "personal" or not connected:
+            return None
+        if visibility == "invite_only":
+            connected &= set(_normalize_id_list(doc.get("invite_user_ids")))
+        # Only followers with a stream open in this process, so the lookup stays small.
+        rows = repos.follows.find_many(
+            {"followee_id": ref_filter(owner_id), "follower_id": refs_filter(sorted(connected))},
+            {"follower_id": 1},
+        )
+        audience = {_as_text(row.get("follower_id")) for row in rows}
+        audience -= _blocked_ids_among(repos, owner_id, audience)
+        if not audience:
+            return None
+        return audience, {"spot_id": _serialize_id(doc.get("_id")), "owner_id": owner_id, "visibility": visibility}
+
+    def ticket_status(row: dict[str, Any]):
+        data = {"ticket_id": _serialize_id(row.get("_id")), "status": _as_text(row.get("status"))}
+        return [_as_text(row.get("user_id"))], data
+
+    live.register("follow_request", repos.follow_requests, ("insert", "update"), follow_request)
+    live.register("follow", repos.follows, ("insert",), follow)
+    live.register("spot", repos.spots, ("insert",), spot)
+    live.register("ticket_status", repos.support_tickets, ("update",), ticket_status)
+
+
 def get_social_router() -> APIRouter:
     global _SOCIAL_ROUTER
     if _SOCIAL_ROUTER is not None:
         return _SOCIAL_ROUTER
 
     repos = _repos()
-    _SOCIAL_ROUTER = APIRouter(
-        prefix="/social",
-        tags=["Social"],
-        lifespan=_social_lifespan,
-    )
+    jobs = get_job_queue()
+    live = get_live_events()
+    graph_cache = get_social_graph_cache()
+    # Declares the invalidation collection's index before startup reconciles indexes.
+    get_cache_invalidation_relay()
+    _register_social_jobs(jobs, repos)
+    _register_live_events(live, repos)
+    _SOCIAL_ROUTER = APIRouter(prefix="/social", tags=["Social"])
 
     @_SOCIAL_ROUTER.get("/me", response_model=UserPublic)
     def me(current_user: dict[str, Any] = Depends(get_current_user)):
@@ -411,8 +987,6 @@ def get_social_router() -> APIRouter:
 
     @_SOCIAL_ROUTER.put("/me", response_model=UserPublic)
     def update_me(req: UpdateProfileRequest, current_user: dict[str, Any] = Depends(get_current_user)):
-        _ensure_indexes()
-
         updates: dict[str, Any] = {}
 
         if req.username is not None:
@@ -455,18 +1029,54 @@ def get_social_router() -> APIRouter:
 
         if not updates:
             return _to_user_public(current_user)
+        updates["updated_at"] = datetime.now(UTC)
 
         try:
             repos.users.update_fields({"_id": current_user["_id"]}, updates)
         except DuplicateKeyError as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username or email already exists") from e
 
+        if "password_hash" in updates:
+            # Refresh tokens issued before the change must not outlive the old password.
+            session_extension.revoke_user(_serialize_id(current_user["_id"]))
+
         updated = repos.users.find_one({"_id": current_user["_id"]})
         if not updated:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Profile update failed")
         return _to_user_public(updated)
 
-    @_SOCIAL_ROUTER.get("/users/search", response_model=list[UserPublic])
+    @_SOCIAL_ROUTER.get("/users", response_model=list[UserPublic])
+    def users_by_ids(
+        ids: str = Query(min_length=1, max_length=USER_BATCH_MAX_IDS * 30),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        """Profiles for comma-separated `ids`, in request order.
+
+        One `$in` lookup plus one block query, so a list screen can hydrate the user ids
+        in follows, follow requests, blocks and spot owners with a single request.
+        Malformed, unknown and blocked ids are left out.
+        """
+        requested = _normalize_id_list(ids.split(","))
+        if len(requested) > USER_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {USER_BATCH_MAX_IDS} ids per request",
+            )
+        me_id = _viewer_user_id(current_user)
+        blocked_ids = _blocked_ids_among(repos, me_id, requested)
+        rows = repos.users.find_many({"_id": {"$in": [ObjectId(user_id) for user_id in requested]}}, _safe_user_projection())
+        by_id = {_serialize_id(row.get("_id")): row for row in rows}
+        return [
+            _to_user_public(by_id[user_id])
+            for user_id in requested
+            if user_id in by_id and user_id not in blocked_ids
+        ]
+
+    @_SOCIAL_ROUTER.get(
+        "/users/search",
+        response_model=list[UserPublic],
+        dependencies=[Depends(rate_limit("users.search"))],
+    )
     def search_users(
         q: str = Query(default="", max_length=80),
         limit: int = Query(default=20, ge=1, le=50),
@@ -485,12 +1095,13 @@ def get_social_router() -> APIRouter:
             ).limit(limit)
         )
 
+        blocked_ids = _blocked_user_ids(repos, me_id)
         out: list[UserPublic] = []
         for user_doc in users:
             user_id = _serialize_id(user_doc.get("_id"))
             if user_id == me_id:
                 continue
-            if _is_blocked_pair(repos, me_id, user_id):
+            if user_id in blocked_ids:
                 continue
             out.append(_to_user_public(user_doc))
         return out
@@ -509,11 +1120,55 @@ def get_social_router() -> APIRouter:
 
         return _to_user_public(target)
 
-    @_SOCIAL_ROUTER.get("/spots", response_model=list[SpotPublic])
-    def list_visible_spots(current_user: dict[str, Any] = Depends(get_current_user)):
+    @_SOCIAL_ROUTER.get(
+        "/spots",
+        response_model=list[SpotPublic],
+        dependencies=[Depends(rate_limit("spots.list"))],
+    )
+    def list_visible_spots(
+        limit: int = Query(default=1500, ge=1, le=1500),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        graph = _viewer_graph(repos, _viewer_user_id(current_user))
+        docs = repos.spots.collection.find(_visible_spots_query(graph)).sort("created_at", -1).limit(limit).batch_size(limit)
+        return [_to_spot_public(doc) for doc in docs if _can_view_spot_in_graph(graph, doc)]
+
+    @_SOCIAL_ROUTER.get("/spots/tiles/{z}/{x}/{y}")
+    def spot_tile(
+        z: int,
+        x: int,
+        y: int,
+        if_none_match: str | None = Header(default=None),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        """Public spots inside a slippy-map tile in the compact `fields`/`spots` row format."""
+        key = _tile_key_or_400(z, x, y)
+        entry = _load_public_tile(repos, key)
+        entry = without_owners(entry, key, _blocked_user_ids(repos, _viewer_user_id(current_user)))
+        return _tile_response(entry.body, entry.etag, if_none_match)
+
+    @_SOCIAL_ROUTER.get("/spots/tiles/{z}/{x}/{y}/private")
+    def private_spot_tile(
+        z: int,
+        x: int,
+        y: int,
+        if_none_match: str | None = Header(default=None),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        """Non-public spots in a tile that this viewer may see. Never cached server-side."""
+        key = _tile_key_or_400(z, x, y)
         me_id = _viewer_user_id(current_user)
-        docs = list(repos.spots.collection.find({}).sort("created_at", -1).limit(1500))
-        return [_to_spot_public(doc) for doc in docs if _can_view_spot(repos, me_id, doc)]
+
+        query = tile_spot_query(*key)
+        query["$or"] = [
+            {"owner_id": ref_filter(me_id), "visibility": {"$in": ["following", "invite_only", "personal"]}},
+            {"visibility": "following", "owner_id": refs_filter(_followee_ids(repos, me_id))},
+            {"visibility": "invite_only", "invite_user_ids": ref_filter(me_id)},
+        ]
+        docs = repos.spots.collection.find(query).sort("created_at", -1).limit(tile_max_rows())
+        entry = encode_tile(key, [spot_tile_row(doc) for doc in docs])
+        entry = without_owners(entry, key, _blocked_user_ids(repos, me_id))
+        return _tile_response(entry.body, entry.etag, if_none_match)
 
     @_SOCIAL_ROUTER.post("/spots", response_model=SpotPublic)
     def create_spot(req: SpotUpsertRequest, current_user: dict[str, Any] = Depends(get_current_user)):
@@ -523,6 +1178,8 @@ def get_social_router() -> APIRouter:
         created = repos.spots.find_one({"_id": ObjectId(inserted_id)})
         if not created:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Spot creation failed")
+        invalidate_spot_tiles(created)
+        live.notify("spot", created)
         return _to_spot_public(created)
 
     @_SOCIAL_ROUTER.put("/spots/{spot_id}", response_model=SpotPublic)
@@ -542,6 +1199,7 @@ def get_social_router() -> APIRouter:
         updated = repos.spots.find_one({"_id": spot_key})
         if not updated:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Spot update failed")
+        invalidate_spot_tiles(existing, updated)
         return _to_spot_public(updated)
 
     @_SOCIAL_ROUTER.delete("/spots/{spot_id}")
@@ -559,8 +1217,13 @@ def get_social_router() -> APIRouter:
         canonical_spot_id = _serialize_id(spot_key)
 
         repos.spots.collection.delete_one({"_id": spot_key})
-        repos.favorites.delete_many({"spot_id": {"$in": [canonical_spot_id, _as_text(spot_id)]}})
-        repos.shares.delete_many({"spot_id": {"$in": [canonical_spot_id, _as_text(spot_id)]}})
+        _record_tombstones(repos, [_spot_tombstone(canonical_spot_id, existing)])
+        invalidate_spot_tiles(existing)
+        jobs.enqueue(
+            "social.spot_deleted",
+            {"spot_ids": list(dict.fromkeys([canonical_spot_id, _as_text(spot_id)]))},
+            idempotency_key=f"spot_deleted:{canonical_spot_id}",
+        )
         return {"ok": True}
 
     @_SOCIAL_ROUTER.get("/users/{user_id}/spots", response_model=list[SpotPublic])
@@ -572,11 +1235,14 @@ def get_social_router() -> APIRouter:
 
         me_id = _viewer_user_id(current_user)
         target_id = _serialize_id(target_oid)
-        if me_id != target_id and _is_blocked_pair(repos, me_id, target_id):
+        graph = _viewer_graph(repos, me_id)
+        if me_id != target_id and target_id in graph.blocked_ids:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        docs = list(repos.spots.collection.find({"owner_id": target_id}).sort("created_at", -1).limit(1200))
-        return [_to_spot_public(doc) for doc in docs if _can_view_spot(repos, me_id, doc)]
+        docs = (
+            repos.spots.collection.find({"owner_id": ref_filter(target_id)}).sort("created_at", -1).limit(1200).batch_size(1200)
+        )
+        return [_to_spot_public(doc) for doc in docs if _can_view_spot_in_graph(graph, doc)]
 
     @_SOCIAL_ROUTER.post("/favorites/{spot_id}")
     def add_favorite(spot_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
@@ -585,39 +1251,44 @@ def get_social_router() -> APIRouter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Spot not found")
 
         me_id = _viewer_user_id(current_user)
-        if not _can_view_spot(repos, me_id, spot):
+        if not _can_view_spot(repos, me_id, spot, uncached=True):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Spot is not visible to you")
 
-        canonical_spot_id = _serialize_id(spot.get("_id"))
-
-        doc = {
-            "user_id": me_id,
-            "spot_id": canonical_spot_id,
-            "created_at": datetime.now(UTC),
-        }
-        try:
-            repos.favorites.insert_one(doc)
-        except DuplicateKeyError:
-            pass
-
+        now = datetime.now(UTC)
+        _insert_edge(
+            repos.favorites,
+            {"user_id": me_id, "spot_id": _serialize_id(spot.get("_id"))},
+            {"created_at": now, "updated_at": now},
+        )
         return {"ok": True}
 
     @_SOCIAL_ROUTER.delete("/favorites/{spot_id}")
     def remove_favorite(spot_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
-        repos.favorites.collection.delete_one({
-            "user_id": _viewer_user_id(current_user),
-            "spot_id": spot_id,
-        })
+        row = {"user_id": _viewer_user_id(current_user), "spot_id": spot_id}
+        if repos.favorites.collection.delete_one(_edge_query(**row)).deleted_count:
+            _record_tombstones(repos, [_favorite_tombstone(row)])
         return {"ok": True}
 
-    @_SOCIAL_ROUTER.get("/favorites", response_model=list[FavoriteRef])
-    def list_favorites(current_user: dict[str, Any] = Depends(get_current_user)):
+    @_SOCIAL_ROUTER.get("/favorites", response_model=list[FavoriteRef], response_model_exclude_none=True)
+    def list_favorites(
+        expand: Literal["spot"] | None = Query(default=None),
+        images: Literal["all", "thumbnail", "none"] = Query(default="all"),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        """`expand=spot` embeds each spot; `images` then picks all images, the first one only, or none."""
         me_id = _viewer_user_id(current_user)
-        rows = list(repos.favorites.collection.find({"user_id": me_id}).sort("created_at", -1).limit(2000))
-        return _visible_favorite_refs(repos, rows, me_id)
+        rows = list(
+            repos.favorites.collection.find({"user_id": ref_filter(me_id)}).sort("created_at", -1).limit(2000).batch_size(2000)
+        )
+        return _visible_favorite_refs(repos, rows, me_id, expand_spot=expand == "spot", images=images)
 
-    @_SOCIAL_ROUTER.get("/users/{user_id}/favorites", response_model=list[FavoriteRef])
-    def user_favorites(user_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
+    @_SOCIAL_ROUTER.get("/users/{user_id}/favorites", response_model=list[FavoriteRef], response_model_exclude_none=True)
+    def user_favorites(
+        user_id: str,
+        expand: Literal["spot"] | None = Query(default=None),
+        images: Literal["all", "thumbnail", "none"] = Query(default="all"),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
         target_oid = _parse_object_id(user_id)
         target = repos.users.find_one({"_id": target_oid}, _safe_user_projection())
         if not target:
@@ -628,13 +1299,17 @@ def get_social_router() -> APIRouter:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User profile is private")
 
         target_id = _serialize_id(target_oid)
-        rows = list(repos.favorites.collection.find({"user_id": target_id}).sort("created_at", -1).limit(2000))
-        return _visible_favorite_refs(repos, rows, me_id)
+        rows = list(
+            repos.favorites.collection.find({"user_id": ref_filter(target_id)}).sort("created_at", -1).limit(2000).batch_size(2000)
+        )
+        return _visible_favorite_refs(repos, rows, me_id, expand_spot=expand == "spot", images=images)
 
     @_SOCIAL_ROUTER.get("/follow/requests", response_model=list[FollowRequestRef])
     def follow_requests(current_user: dict[str, Any] = Depends(get_current_user)):
         me_id = _viewer_user_id(current_user)
-        rows = list(repos.follow_requests.collection.find({"followee_id": me_id}).sort("created_at", -1).limit(500))
+        rows = (
+            repos.follow_requests.collection.find({"followee_id": ref_filter(me_id)}).sort("created_at", -1).limit(500).batch_size(500)
+        )
         out: list[FollowRequestRef] = []
         for row in rows:
             follower_id = _as_text(row.get("follower_id"))
@@ -653,29 +1328,32 @@ def get_social_router() -> APIRouter:
         follower_sid = _serialize_id(_parse_object_id(follower_id))
         me_id = _viewer_user_id(current_user)
 
-        request_row = repos.follow_requests.find_one({"follower_id": follower_sid, "followee_id": me_id})
+        request_query = _edge_query(follower_id=follower_sid, followee_id=me_id)
+        request_row = repos.follow_requests.find_one(request_query)
         if not request_row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Follow request not found")
+        if _is_blocked_pair_uncached(repos, me_id, follower_sid):
+            repos.follow_requests.collection.delete_one(request_query)
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot approve this user")
 
-        try:
-            repos.follows.insert_one(
-                {
-                    "follower_id": follower_sid,
-                    "followee_id": me_id,
-                    "created_at": datetime.now(UTC),
-                }
-            )
-        except DuplicateKeyError:
-            pass
+        now = datetime.now(UTC)
+        edge = _insert_edge(
+            repos.follows,
+            {"follower_id": follower_sid, "followee_id": me_id},
+            {"pair_key": pair_key(follower_sid, me_id), "created_at": now, "updated_at": now},
+        )
+        graph_cache.invalidate(follower_sid, me_id)
+        if edge is not None:
+            live.notify("follow", edge)
 
-        repos.follow_requests.collection.delete_one({"follower_id": follower_sid, "followee_id": me_id})
+        repos.follow_requests.collection.delete_one(request_query)
         return {"ok": True}
 
     @_SOCIAL_ROUTER.post("/follow/requests/{follower_id}/reject")
     def reject_follow_request(follower_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
         follower_sid = _serialize_id(_parse_object_id(follower_id))
         me_id = _viewer_user_id(current_user)
-        repos.follow_requests.collection.delete_one({"follower_id": follower_sid, "followee_id": me_id})
+        repos.follow_requests.collection.delete_one(_edge_query(follower_id=follower_sid, followee_id=me_id))
         return {"ok": True}
 
     @_SOCIAL_ROUTER.post("/follow/{user_id}")
@@ -691,40 +1369,45 @@ def get_social_router() -> APIRouter:
         if not target_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        if _is_blocked_pair(repos, me_id, target_id):
+        if _is_blocked_pair_uncached(repos, me_id, target_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot follow this user")
 
-        if _is_following(repos, me_id, target_id):
+        # Read from storage: a stale cache on this worker must not skip writing the edge.
+        if _is_following_uncached(repos, me_id, target_id):
             return {"ok": True, "status": "following"}
 
         if bool(target_user.get("follow_requires_approval", False)):
-            repos.follow_requests.update_fields(
+            now = datetime.now(UTC)
+            _upsert_edge(
+                repos.follow_requests,
                 {"follower_id": me_id, "followee_id": target_id},
-                {"created_at": datetime.now(UTC)},
-                upsert=True,
+                {"pair_key": pair_key(me_id, target_id), "created_at": now, "updated_at": now},
             )
+            live.notify("follow_request", {"follower_id": me_id, "followee_id": target_id})
             return {"ok": True, "status": "pending"}
 
-        try:
-            repos.follows.insert_one(
-                {
-                    "follower_id": me_id,
-                    "followee_id": target_id,
-                    "created_at": datetime.now(UTC),
-                }
-            )
-        except DuplicateKeyError:
-            pass
+        now = datetime.now(UTC)
+        edge = _insert_edge(
+            repos.follows,
+            {"follower_id": me_id, "followee_id": target_id},
+            {"pair_key": pair_key(me_id, target_id), "created_at": now, "updated_at": now},
+        )
+        graph_cache.invalidate(me_id, target_id)
+        if edge is not None:
+            live.notify("follow", edge)
 
-        repos.follow_requests.collection.delete_one({"follower_id": me_id, "followee_id": target_id})
+        repos.follow_requests.collection.delete_one(_edge_query(follower_id=me_id, followee_id=target_id))
         return {"ok": True, "status": "following"}
 
     @_SOCIAL_ROUTER.delete("/follow/{user_id}")
     def unfollow_user(user_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
         me_id = _viewer_user_id(current_user)
         target_id = _serialize_id(_parse_object_id(user_id))
-        repos.follows.collection.delete_one({"follower_id": me_id, "followee_id": target_id})
-        repos.follow_requests.collection.delete_one({"follower_id": me_id, "followee_id": target_id})
+        edge = {"follower_id": me_id, "followee_id": target_id}
+        if repos.follows.collection.delete_one(_edge_query(**edge)).deleted_count:
+            graph_cache.invalidate(edge["follower_id"], edge["followee_id"])
+            _record_tombstones(repos, [_follow_tombstone(edge)])
+        repos.follow_requests.collection.delete_one(_edge_query(**edge))
         return {"ok": True}
 
     @_SOCIAL_ROUTER.get("/followers/{user_id}", response_model=list[FollowRef])
@@ -739,13 +1422,16 @@ def get_social_router() -> APIRouter:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User profile is private")
 
         target_id = _serialize_id(target_oid)
-        rows = list(repos.follows.collection.find({"followee_id": target_id}).sort("created_at", -1).limit(1200))
+        rows = (
+            repos.follows.collection.find({"followee_id": ref_filter(target_id)}).sort("created_at", -1).limit(1200).batch_size(1200)
+        )
+        blocked_ids = _blocked_user_ids(repos, me_id)
         out: list[FollowRef] = []
         for row in rows:
             follower_id = _as_text(row.get("follower_id"))
             if not ObjectId.is_valid(follower_id):
                 continue
-            if _is_blocked_pair(repos, me_id, follower_id):
+            if follower_id in blocked_ids:
                 continue
             out.append(
                 FollowRef(
@@ -767,13 +1453,16 @@ def get_social_router() -> APIRouter:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User profile is private")
 
         target_id = _serialize_id(target_oid)
-        rows = list(repos.follows.collection.find({"follower_id": target_id}).sort("created_at", -1).limit(1200))
+        rows = (
+            repos.follows.collection.find({"follower_id": ref_filter(target_id)}).sort("created_at", -1).limit(1200).batch_size(1200)
+        )
+        blocked_ids = _blocked_user_ids(repos, me_id)
         out: list[FollowRef] = []
         for row in rows:
             followee_id = _as_text(row.get("followee_id"))
             if not ObjectId.is_valid(followee_id):
                 continue
-            if _is_blocked_pair(repos, me_id, followee_id):
+            if followee_id in blocked_ids:
                 continue
             out.append(
                 FollowRef(
@@ -787,8 +1476,11 @@ def get_social_router() -> APIRouter:
     def remove_follower(user_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
         me_id = _viewer_user_id(current_user)
         follower_id = _serialize_id(_parse_object_id(user_id))
-        repos.follows.collection.delete_one({"follower_id": follower_id, "followee_id": me_id})
-        repos.follow_requests.collection.delete_one({"follower_id": follower_id, "followee_id": me_id})
+        edge = {"follower_id": follower_id, "followee_id": me_id}
+        if repos.follows.collection.delete_one(_edge_query(**edge)).deleted_count:
+            graph_cache.invalidate(edge["follower_id"], edge["followee_id"])
+            _record_tombstones(repos, [_follow_tombstone(edge)])
+        repos.follow_requests.collection.delete_one(_edge_query(**edge))
         return {"ok": True}
 
     @_SOCIAL_ROUTER.post("/block/{user_id}")
@@ -798,27 +1490,18 @@ def get_social_router() -> APIRouter:
         if me_id == target_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot block yourself")
 
-        repos.blocks.update_fields(
+        now = datetime.now(UTC)
+        _upsert_edge(
+            repos.blocks,
             {"blocker_id": me_id, "blocked_id": target_id},
-            {"created_at": datetime.now(UTC)},
-            upsert=True,
+            {"pair_key": pair_key(me_id, target_id), "created_at": now, "updated_at": now},
         )
+        graph_cache.invalidate(me_id, target_id)
 
-        repos.follows.collection.delete_many(
-            {
-                "$or": [
-                    {"follower_id": me_id, "followee_id": target_id},
-                    {"follower_id": target_id, "followee_id": me_id},
-                ]
-            }
-        )
-        repos.follow_requests.collection.delete_many(
-            {
-                "$or": [
-                    {"follower_id": me_id, "followee_id": target_id},
-                    {"follower_id": target_id, "followee_id": me_id},
-                ]
-            }
+        jobs.enqueue(
+            "social.block_cascade",
+            {"blocker_id": me_id, "blocked_id": target_id},
+            idempotency_key=f"block_cascade:{pair_key(me_id, target_id)}:{now.isoformat()}",
         )
         return {"ok": True}
 
@@ -826,13 +1509,15 @@ def get_social_router() -> APIRouter:
     def unblock_user(user_id: str, current_user: dict[str, Any] = Depends(get_current_user)):
         me_id = _viewer_user_id(current_user)
         target_id = _serialize_id(_parse_object_id(user_id))
-        repos.blocks.collection.delete_one({"blocker_id": me_id, "blocked_id": target_id})
+        if repos.blocks.collection.delete_one(_edge_query(blocker_id=me_id, blocked_id=target_id)).deleted_count:
+            graph_cache.invalidate(me_id, target_id)
+            _record_tombstones(repos, [_block_tombstone(me_id, target_id)])
         return {"ok": True}
 
     @_SOCIAL_ROUTER.get("/blocked", response_model=list[BlockRef])
     def blocked_users(current_user: dict[str, Any] = Depends(get_current_user)):
         me_id = _viewer_user_id(current_user)
-        rows = list(repos.blocks.collection.find({"blocker_id": me_id}).sort("created_at", -1).limit(500))
+        rows = repos.blocks.collection.find({"blocker_id": ref_filter(me_id)}).sort("created_at", -1).limit(500).batch_size(500)
         out: list[BlockRef] = []
         for row in rows:
             blocked_id = _as_text(row.get("blocked_id"))
@@ -846,6 +1531,66 @@ def get_social_router() -> APIRouter:
             )
         return out
 
+    @_SOCIAL_ROUTER.get("/sync", response_model=SyncPage)
+    def sync(
+        since: str | None = Query(default=None, max_length=64),
+        cursor: str | None = Query(default=None, max_length=400),
+        limit: int = Query(default=500, ge=1, le=2000),
+        current_user: dict[str, Any] = Depends(get_current_user),
+    ):
+        """Spots, favorites, follows and blocks that changed or were deleted since `since`.
+
+        Pass the `sync_token` of the previous sync as `since` (omit it for a first, full
+        sync) and follow `next_cursor` until it is null. `full_resync` means `since` is older
+        than the tombstone retention: drop local data and sync again without `since`.
+        """
+        me_id = _viewer_user_id(current_user)
+        since_at = parse_since(since)
+        if cursor:
+            until, start_phase, after_id = decode_sync_cursor(cursor)
+        else:
+            # Millisecond precision, like the BSON dates it is compared with.
+            now = datetime.now(UTC)
+            until, start_phase, after_id = now.replace(microsecond=now.microsecond // 1000 * 1000), None, None
+        sync_token = _sync_token(until)
+
+        if since_at is not None and since_at < datetime.now(UTC) - timedelta(days=tombstone_retention_days()):
+            return SyncPage(sync_token=sync_token, full_resync=True)
+
+        phases = _sync_phases(repos, me_id, SyncWindow(since=since_at, until=until))
+        changes, next_page = collect_changes(phases, limit, start_phase=start_phase, after_id=after_id)
+        return SyncPage(
+            changes=changes,
+            next_cursor=encode_sync_cursor(until, *next_page) if next_page else None,
+            sync_token=sync_token,
+        )
+
+    @_SOCIAL_ROUTER.post("/events/token", response_model=StreamTokenResponse)
+    def live_event_stream_token(current_user: dict[str, Any] = Depends(get_current_user)):
+        """Short-lived `stream_token` for clients that cannot send an Authorization header
+        on GET /social/events, like browser EventSource."""
+        return StreamTokenResponse(
+            stream_token=token_extension.issue_stream_token(user_id=_viewer_user_id(current_user)),
+            expires_in=token_extension.stream_expire_seconds,
+        )
+
+    @_SOCIAL_ROUTER.get("/events")
+    async def live_event_stream(current_user: dict[str, Any] = Depends(get_current_user_for_stream)):
+        """Server-sent events: follow requests, follows, new spots from followees and ticket
+        status changes, as they happen. Payloads carry ids; after (re)connecting or on a
+        `resync` event, catch up with GET /social/sync."""
+        if not live.bus.has_capacity():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many live connections",
+                headers={"Retry-After": "30"},
+            )
+        return StreamingResponse(
+            event_stream(live.bus, _viewer_user_id(current_user), heartbeat_seconds()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @_SOCIAL_ROUTER.post("/share/{spot_id}")
     def share_spot(spot_id: str, req: ShareRequest, current_user: dict[str, Any] = Depends(get_current_user)):
         spot = _spot_document_by_id(repos, spot_id)
@@ -857,14 +1602,18 @@ def get_social_router() -> APIRouter:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Spot is not visible to you")
 
         canonical_spot_id = _serialize_id(spot.get("_id"))
+        share_id = str(ObjectId())
 
-        repos.shares.insert_one(
+        jobs.enqueue(
+            "social.record_share",
             {
+                "share_id": share_id,
                 "user_id": me_id,
                 "spot_id": canonical_spot_id,
                 "message": req.message,
                 "created_at": datetime.now(UTC),
-            }
+            },
+            idempotency_key=f"share:{share_id}",
         )
         return {"ok": True}
 
@@ -904,12 +1653,50 @@ def get_social_router() -> APIRouter:
 
     @_SOCIAL_ROUTER.get(
         "/support/tickets/admin/all",
-        response_model=list[SupportTicketPublic],
+        response_model=SupportTicketPage,
+    )
+    def list_all_support_tickets(
+        status_filter: str | None = Query(default=None, alias="status", pattern="^(open|closed)$"),
+        category: str | None = Query(default=None, pattern="^(bug|feature|complaint|question|other)$"),
+        user_id: str | None = Query(default=None, max_length=40),
+        limit: int = Query(default=50, ge=1, le=200),
+        cursor: str | None = Query(default=None, max_length=200),
+        admin_user: dict = Depends(get_current_admin_user),
+    ):
+        """Admin-only: Page through support tickets, newest first."""
+        query: dict[str, Any] = {}
+        if status_filter:
+            query["status"] = status_filter
+        if category:
+            query["category"] = category
+        if user_id:
+            query["user_id"] = _as_text(user_id)
+        if cursor:
+            query.update(_cursor_query(cursor))
+
+        rows = list(
+            repos.support_tickets.collection.find(query)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].get("created_at"), rows[-1].get("_id"))
+        return SupportTicketPage(
+            items=[_to_support_ticket_public(doc) for doc in rows],
+            next_cursor=next_cursor,
+        )
+
+    @_SOCIAL_ROUTER.get(
+        "/support/tickets/admin/counts",
+        response_model=SupportTicketCounts,
     )
-    def list_all_support_tickets(admin_user: dict = Depends(get_current_admin_user)):
-        """Admin-only: List all support tickets across all users."""
-        cursor = repos.support_tickets.find().sort("created_at", -1)
-        return [_to_support_ticket_public(doc) for doc in cursor]
+    def support_ticket_counts(admin_user: dict = Depends(get_current_admin_user)):
+        """Admin-only: Ticket counts by status, answered from the (status, created_at) index."""
+        open_count = repos.support_tickets.count_documents({"status": "open"})
+        closed_count = repos.support_tickets.count_documents({"status": "closed"})
+        return SupportTicketCounts(open=open_count, closed=closed_count, total=open_count + closed_count)
 
     @_SOCIAL_ROUTER.patch(
         "/support/tickets/{ticket_id}/status",
@@ -917,12 +1704,12 @@ def get_social_router() -> APIRouter:
     )
     def update_ticket_status(
         ticket_id: str,
-        status: str,
+        ticket_status: str = Query(alias="status"),
         admin_user: dict = Depends(get_current_admin_user),
     ):
         """Admin-only: Update support ticket status (open/closed)."""
         
-        if status not in ("open", "closed"):
+        if ticket_status not in ("open", "closed"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Status must be 'open' or 'closed'",
@@ -936,7 +1723,7 @@ def get_social_router() -> APIRouter:
         
         repos.support_tickets.update_fields(
             {"_id": ObjectId(ticket_id)},
-            {"status": status, "updated_at": datetime.now(UTC)},
+            {"status": ticket_status, "updated_at": datetime.now(UTC)},
         )
         
         row = repos.support_tickets.find_one({"_id": ObjectId(ticket_id)})
@@ -947,6 +1734,7 @@ def get_social_router() -> APIRouter:
                 detail="Ticket not found",
             )
         
+        live.notify("ticket_status", row)
         return _to_support_ticket_public(row)
 
     @_SOCIAL_ROUTER.delete(
@@ -963,7 +1751,7 @@ def get_social_router() -> APIRouter:
                 detail="Invalid ticket ID",
             )
         
-        result = repos.support_tickets.delete_one({"_id": ObjectId(ticket_id)})
+        result = repos.support_tickets.collection.delete_one({"_id": ObjectId(ticket_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(
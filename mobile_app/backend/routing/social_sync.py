@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import json
+from typing import Any, Callable
+
+from bson import json_util
+from fastapi import HTTPException, status
+
+from data.dto import SyncChange
+
+
+TOMBSTONE_KINDS = ("spot", "favorite", "follow", "block")
+
+
+def tombstone(kind: str, entity_id: str, user_ids: list[str] | tuple[str, ...] = (), data: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Record of a deleted row. `user_ids` are the users whose sync should report it;
+    spot tombstones also go to whoever could see the spot, going by `data.visibility`."""
+    return {
+        "kind": kind,
+        "entity_id": str(entity_id),
+        "user_ids": sorted({str(user_id) for user_id in user_ids if user_id}),
+        "data": dict(data or {}),
+        "deleted_at": datetime.now(UTC),
+    }
+
+
+def parse_since(value: str | None) -> datetime | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid since timestamp") from e
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+@dataclass(frozen=True)
+class SyncWindow:
+    """Changes with `since < timestamp <= until`. Without `since` (first sync) every row
+    up to `until` counts, including rows written before timestamps were recorded."""
+
+    since: datetime | None
+    until: datetime
+
+    def query(self, field: str) -> dict[str, Any]:
+        if self.since is None:
+            return {"$or": [{field: {"$lte": self.until}}, {field: {"$exists": False}}]}
+        return {field: {"$gt": self.since, "$lte": self.until}}
+
+    def within(self, base: dict[str, Any], field: str = "updated_at") -> dict[str, Any]:
+        return {"$and": [base, self.query(field)]}
+
+
+@dataclass(frozen=True)
+class SyncPhase:
+    """One source of changes. `fetch(after_id, limit)` returns rows ordered by `_id`
+    ascending, starting after `after_id`; `convert` turns a row into zero or more changes."""
+
+    name: str
+    fetch: Callable[[Any, int], list[dict[str, Any]]]
+    convert: Callable[[dict[str, Any]], list[SyncChange]]
+
+
+def encode_sync_cursor(until: datetime, phase: str, after_id: Any) -> str:
+    raw = json.dumps(
+        {"u": until.isoformat(), "p": phase, "a": json_util.dumps(after_id)},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> tuple[datetime, str, Any]:
+    text = str(cursor or "").strip()
+    try:
+        data = json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+        until = datetime.fromisoformat(str(data["u"]))
+        return until, str(data["p"]), json_util.loads(str(data["a"]))
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+def collect_changes(
+    phases: list[SyncPhase],
+    limit: int,
+    start_phase: str | None = None,
+    after_id: Any = None,
+) -> tuple[list[SyncChange], tuple[str, Any] | None]:
+    """Up to about `limit` changes, walking the phases in order; returns where the next page starts."""
+    names = [phase.name for phase in phases]
+    if start_phase is not None and start_phase not in names:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    index = names.index(start_phase) if start_phase is not None else 0
+
+    changes: list[SyncChange] = []
+    for phase in phases[index:]:
+        while True:
+            rows = phase.fetch(after_id, limit)
+            for row in rows:
+                changes.extend(phase.convert(row))
+                after_id = row.get("_id")
+                if len(changes) >= limit:
+                    return changes, (phase.name, after_id)
+            if len(rows) < limit:
+                break
+        after_id = None
+    return changes, None
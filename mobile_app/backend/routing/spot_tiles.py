@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from threading import Lock
+import time
+from typing import Any, Callable, Iterable
+
+from data.config import env_int
+from routing.cache_relay import InvalidationClock
+
+
+MAX_TILE_ZOOM = 22
+_MAX_MERCATOR_LAT = 85.0511287798066
+
+# Column order of the compact tile payload. Clients zip each row with this list.
+TILE_FIELDS = ["id", "owner_id", "title", "lat", "lon", "tags", "image_count", "created_at"]
+
+TileKey = tuple[int, int, int]
+
+
+def tile_key_text(key: TileKey) -> str:
+    z, x, y = key
+    return f"{z}/{x}/{y}"
+
+
+def parse_tile_key(value: str) -> TileKey | None:
+    try:
+        z, x, y = (int(part) for part in str(value).split("/"))
+    except ValueError:
+        return None
+    return (z, x, y) if is_valid_tile(z, x, y) else None
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    if z < 0 or z > MAX_TILE_ZOOM:
+        return False
+    n = 1 << z
+    return 0 <= x < n and 0 <= y < n
+
+
+def _tile_lon(x: int, n: int) -> float:
+    return x / n * 360.0 - 180.0
+
+
+def _tile_lat(y: int, n: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+def tile_for_point(lat: float, lon: float, z: int) -> TileKey:
+    """Slippy-map tile containing a point. Polar latitudes clamp to the edge rows."""
+    n = 1 << z
+    clamped_lat = max(-_MAX_MERCATOR_LAT, min(_MAX_MERCATOR_LAT, float(lat)))
+    lat_rad = math.radians(clamped_lat)
+    x = int((float(lon) + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return z, max(0, min(n - 1, x)), max(0, min(n - 1, y))
+
+
+def tile_spot_query(z: int, x: int, y: int) -> dict[str, Any]:
+    """lat/lon range filter that selects exactly the points `tile_for_point` maps to this tile."""
+    n = 1 << z
+    lon_range: dict[str, float] = {"$gte": _tile_lon(x, n)}
+    lon_range["$lte" if x == n - 1 else "$lt"] = _tile_lon(x + 1, n)
+
+    lat_range: dict[str, float] = {}
+    if y > 0:
+        lat_range["$lte"] = _tile_lat(y, n)
+    if y < n - 1:
+        lat_range["$gt"] = _tile_lat(y + 1, n)
+
+    query: dict[str, Any] = {"lon": lon_range}
+    if lat_range:
+        query["lat"] = lat_range
+    return query
+
+
+def _as_epoch(value: Any) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return 0
+
+
+def spot_tile_row(doc: dict[str, Any]) -> list[Any]:
+    return [
+        str(doc.get("_id") or ""),
+        str(doc.get("owner_id") or "").strip(),
+        str(doc.get("title") or "").strip(),
+        float(doc.get("lat") or 0.0),
+        float(doc.get("lon") or 0.0),
+        [str(tag).strip() for tag in doc.get("tags", []) if str(tag or "").strip()],
+        len(doc.get("images") or []),
+        _as_epoch(doc.get("created_at")),
+    ]
+
+
+@dataclass(frozen=True)
+class TileEntry:
+    body: bytes
+    etag: str
+    rows: tuple[tuple[Any, ...], ...]
+    owner_ids: frozenset[str]
+    stored_at: float
+
+
+def encode_tile(key: TileKey, rows: list[list[Any]] | tuple[Any, ...]) -> TileEntry:
+    z, x, y = key
+    payload = {"z": z, "x": x, "y": y, "fields": TILE_FIELDS, "spots": [list(row) for row in rows]}
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return TileEntry(
+        body=body,
+        etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+        rows=tuple(tuple(row) for row in rows),
+        owner_ids=frozenset(str(row[1]) for row in rows),
+        stored_at=time.time(),
+    )
+
+
+def without_owners(entry: TileEntry, key: TileKey, owner_ids: set[str]) -> TileEntry:
+    """Viewer-specific copy of a tile with spots from the given owners removed."""
+    if not owner_ids or entry.owner_ids.isdisjoint(owner_ids):
+        return entry
+    return encode_tile(key, [row for row in entry.rows if row[1] not in owner_ids])
+
+
+class SpotTileCache:
+    """LRU cache of encoded public spot tiles with an on-disk spill for evicted entries.
+
+    Spot writes call `invalidate_point()`, which also tells the other workers when the
+    cache invalidation relay is on. Entries expire after `ttl_seconds`, which bounds
+    staleness when it is off.
+    """
+
+    def __init__(self, max_entries: int, spill_dir: str | Path | None, ttl_seconds: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self._entries: OrderedDict[TileKey, TileEntry] = OrderedDict()
+        self._lock = Lock()
+        self._clock = InvalidationClock(max_keys=max(1024, self.max_entries))
+        self._listeners: list[Callable[[list[TileKey]], None]] = []
+
+    @property
+    def epoch(self) -> int:
+        """Read before loading a tile; pass it back to `put` to drop a fill raced by that tile's invalidation."""
+        with self._lock:
+            return self._clock.now()
+
+    def _spill_path(self, key: TileKey) -> Path | None:
+        if self.spill_dir is None:
+            return None
+        z, x, y = key
+        return self.spill_dir / str(z) / str(x) / f"{y}.json"
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def get(self, key: TileKey) -> TileEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_fresh(entry.stored_at):
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+            epoch = self._clock.now()
+
+        entry = self._read_spill(key)
+        if entry is not None:
+            self.put(key, entry, epoch=epoch)
+        return entry
+
+    def put(self, key: TileKey, entry: TileEntry, epoch: int | None = None) -> None:
+        evicted: list[tuple[TileKey, TileEntry]] = []
+        with self._lock:
+            if epoch is not None and not self._clock.is_current(key, epoch):
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+
+        for evicted_key, evicted_entry in evicted:
+            self._write_spill(evicted_key, evicted_entry)
+
+    def invalidate_point(self, lat: Any, lon: Any) -> None:
+        """Drop the tile at every zoom level that contains the given point."""
+        try:
+            keys = [tile_for_point(float(lat), float(lon), z) for z in range(MAX_TILE_ZOOM + 1)]
+        except (TypeError, ValueError):
+            return
+        self.invalidate_tiles(keys)
+
+    def invalidate_tiles(self, keys: Iterable[TileKey], broadcast: bool = True) -> None:
+        """Drop the given tiles; `broadcast` also tells other workers, if configured."""
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock:
+            self._clock.touch(keys)
+            for key in keys:
+                self._entries.pop(key, None)
+
+        for key in keys:
+            path = self._spill_path(key)
+            if path is not None:
+                path.unlink(missing_ok=True)
+        if broadcast:
+            for listener in self._listeners:
+                listener(keys)
+
+    def add_listener(self, listener: Callable[[list[TileKey]], None]) -> None:
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock.reset()
+            self._entries.clear()
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _read_spill(self, key: TileKey) -> TileEntry | None:
+        path = self._spill_path(key)
+        if path is None:
+            return None
+        try:
+            stored_at = path.stat().st_mtime
+            if not self._is_fresh(stored_at):
+                path.unlink(missing_ok=True)
+                return None
+            payload = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        entry = encode_tile(key, payload.get("spots") or [])
+        return TileEntry(
+            body=entry.body,
+            etag=entry.etag,
+            rows=entry.rows,
+            owner_ids=entry.owner_ids,
+            stored_at=stored_at,
+        )
+
+    def _write_spill(self, key: TileKey, entry: TileEntry) -> None:
+        path = self._spill_path(key)
+        if path is None or not self._is_fresh(entry.stored_at):
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(entry.body)
+            os.utime(tmp_path, (entry.stored_at, entry.stored_at))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+_TILE_CACHE: SpotTileCache | None = None
+
+
+def _tile_cache_dir() -> str:
+    default_dir = os.path.join(tempfile.gettempdir(), "spotonsight-tile-cache")
+    return str(os.getenv("SPOT_TILE_CACHE_DIR") or default_dir).strip() or default_dir
+
+
+def get_spot_tile_cache() -> SpotTileCache:
+    global _TILE_CACHE
+    if _TILE_CACHE is None:
+        _TILE_CACHE = SpotTileCache(
+            max_entries=env_int("SPOT_TILE_CACHE_ENTRIES", 4096),
+            spill_dir=_tile_cache_dir(),
+            ttl_seconds=env_int("SPOT_TILE_CACHE_TTL_SECONDS", 300),
+        )
+    return _TILE_CACHE
+
+
+def invalidate_spot_tiles(*spot_docs: dict[str, Any] | None) -> None:
+    """Drop the cached tiles under each spot's position; pass the old and new doc on a move."""
+    cache = get_spot_tile_cache()
+    for doc in spot_docs:
+        if doc:
+            cache.invalidate_point(doc.get("lat"), doc.get("lon"))
+
+
+def tile_max_rows() -> int:
+    return max(1, env_int("SPOT_TILE_MAX_ROWS", 2000))
@@ -0,0 +1,480 @@
+"""Seed the configured repositories with a synthetic, production-shaped dataset.
+
+    python seed.py --users 100000 --avg-spots 4 --avg-follows 25
+
+Writes go straight to the collections with unordered bulk inserts; ids are generated
+client side so nothing is read back. All seeded users share one password (hashed once,
+bcrypt is deliberately slow). Indexes are reconciled after loading, which is faster
+than maintaining them during the load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+import itertools
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+# Import DTOs so decorators run and entity repositories get registered
+from data import dto  # noqa: F401
+from data.dto import ClientErrorReport
+from data.ids import pair_key, stored_ref
+from data.indexes import get_index_manager
+from data.mongo_repository import MongoRepository
+from routing.auth_routes import get_auth_user_repository, password_extension
+from routing.client_error_routes import get_client_error_ingestor
+from routing.social_routes import get_social_repositories
+
+
+# (name, lat, lon, relative weight)
+CITIES = (
+    ("Zurich", 47.3769, 8.5417, 10.0),
+    ("Geneva", 46.2044, 6.1432, 6.0),
+    ("Basel", 47.5596, 7.5886, 5.0),
+    ("Bern", 46.9480, 7.4474, 4.0),
+    ("Lausanne", 46.5197, 6.6323, 4.0),
+    ("Lucerne", 47.0502, 8.3093, 3.0),
+    ("Berlin", 52.5200, 13.4050, 8.0),
+    ("Munich", 48.1351, 11.5820, 6.0),
+    ("Vienna", 48.2082, 16.3738, 6.0),
+    ("Milan", 45.4642, 9.1900, 6.0),
+    ("Paris", 48.8566, 2.3522, 9.0),
+    ("London", 51.5072, -0.1276, 9.0),
+    ("New York", 40.7128, -74.0060, 8.0),
+    ("Tokyo", 35.6762, 139.6503, 7.0),
+)
+
+TAGS = (
+    "nature", "sunrise", "sunset", "hiking", "lake", "city", "food", "coffee",
+    "viewpoint", "photography", "street-art", "history", "beach", "forest", "night",
+)
+
+TICKET_CATEGORIES = ("bug", "feature", "complaint", "question", "other")
+
+DEFAULT_VISIBILITY = {"public": 0.7, "following": 0.15, "invite_only": 0.05, "personal": 0.1}
+
+
+@dataclass
+class SeedConfig:
+    users: int = 1000
+    avg_spots: float = 4.0
+    avg_follows: float = 20.0
+    max_follows: int = 2000
+    avg_favorites: float = 8.0
+    avg_shares: float = 1.0
+    # Pareto shape for per-user counts and Zipf exponent for picking popular targets.
+    power_law_alpha: float = 1.6
+    popularity_exponent: float = 1.0
+    private_user_fraction: float = 0.1
+    pending_request_fraction: float = 0.25
+    block_fraction: float = 0.02
+    ticket_fraction: float = 0.05
+    error_reports: int = 0
+    error_kinds: int = 40
+    images_per_spot: int = 2
+    image_bytes: int = 1024
+    cluster_km: float = 12.0
+    days: int = 365
+    visibility: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_VISIBILITY))
+    prefix: str = "seed"
+    password: str = "Seed1234!"
+    batch_size: int = 1000
+    seed: int = 42
+    create_indexes: bool = True
+
+
+class _Writer:
+    """Buffers documents per repository and writes them with unordered insert_many."""
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = max(1, batch_size)
+        self.counts: dict[str, int] = {}
+        self.duplicates = 0
+
+    def write(self, name: str, repository: MongoRepository, documents: Iterable[dict[str, Any]]) -> int:
+        written = 0
+        iterator = iter(documents)
+        while True:
+            chunk = list(itertools.islice(iterator, self.batch_size))
+            if not chunk:
+                break
+            try:
+                written += len(repository.insert_many(chunk, ordered=False))
+            except BulkWriteError as e:
+                # Re-runs with the same prefix hit unique indexes; keep what was new.
+                details = e.details or {}
+                written += int(details.get("nInserted") or 0)
+                self.duplicates += len(details.get("writeErrors") or [])
+        self.counts[name] = self.counts.get(name, 0) + written
+        return written
+
+
+def _pareto_count(rng: random.Random, mean: float, alpha: float, cap: int) -> int:
+    """Heavy-tailed non-negative count with the given mean (most users small, a few huge)."""
+    if mean <= 0:
+        return 0
+    alpha = max(alpha, 1.05)
+    scale = mean * (alpha - 1) / alpha
+    return min(cap, int(rng.paretovariate(alpha) * scale))
+
+
+class _PopularityPicker:
+    """Samples indices with Zipf-like weights over a shuffled rank order."""
+
+    def __init__(self, rng: random.Random, size: int, exponent: float) -> None:
+        self.rng = rng
+        self.size = size
+        order = list(range(size))
+        rng.shuffle(order)
+        self.order = order
+        self.cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(size)))
+
+    def sample(self, k: int) -> set[int]:
+        if self.size == 0 or k <= 0:
+            return set()
+        k = min(k, self.size)
+        picked: set[int] = set()
+        # Popular targets collide often; a few rounds of oversampling is enough in practice.
+        for _ in range(4):
+            for rank in self.rng.choices(range(self.size), cum_weights=self.cum_weights, k=k - len(picked)):
+                picked.add(self.order[rank])
+            if len(picked) >= k:
+                break
+        return picked
+
+
+def _created_at(rng: random.Random, now: datetime, days: int) -> datetime:
+    return now - timedelta(seconds=rng.random() * max(1, days) * 86400)
+
+
+def _stamped(doc: dict[str, Any], created_at: datetime) -> dict[str, Any]:
+    """Rows as the API writes them: `updated_at` starts out equal to `created_at`."""
+    return {**doc, "created_at": created_at, "updated_at": created_at}
+
+
+def _weighted_choice(rng: random.Random, weights: dict[str, float]) -> str:
+    names = list(weights)
+    return rng.choices(names, weights=[weights[name] for name in names], k=1)[0]
+
+
+def _spot_position(rng: random.Random, cluster_km: float) -> tuple[str, float, float]:
+    city, lat, lon, _ = rng.choices(CITIES, weights=[city[3] for city in CITIES], k=1)[0]
+    lat += rng.gauss(0.0, cluster_km) / 111.0
+    lon += rng.gauss(0.0, cluster_km) / (111.0 * max(0.1, math.cos(math.radians(lat))))
+    return city, round(max(-85.0, min(85.0, lat)), 6), round((lon + 180.0) % 360.0 - 180.0, 6)
+
+
+def _image(rng: random.Random, size: int) -> str:
+    if size <= 0:
+        return f"https://picsum.photos/seed/{rng.getrandbits(32)}/800/600"
+    return "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(size)).decode("ascii")
+
+
+def _error_report(rng: random.Random, kind_index: int, created_at: datetime) -> ClientErrorReport:
+    frames = "\n".join(
+        f"    at handler{kind_index}_{frame} (https://app.example.com/assets/index-{rng.getrandbits(24):06x}.js:{rng.randint(1, 900)}:{rng.randint(1, 80)})"
+        for frame in range(3 + kind_index % 5)
+    )
+    return ClientErrorReport(
+        kind="exception",
+        source="webapp",
+        message=f"TypeError: cannot read properties of undefined (reading 'field{kind_index}')",
+        exception_type="TypeError",
+        stacktrace=f"TypeError: field{kind_index}\n{frames}",
+        platform=rng.choice(("web", "android", "ios")),
+        created_at=created_at,
+    )
+
+
+def seed_dataset(config: SeedConfig, log: Callable[[str], None] = print) -> dict[str, Any]:
+    """Generate and insert the dataset. Returns per-collection counts and timings."""
+    rng = random.Random(config.seed)
+    now = datetime.now(UTC)
+    users_repo = get_auth_user_repository()
+    repos = get_social_repositories()
+    writer = _Writer(config.batch_size)
+    timings: dict[str, float] = {}
+
+    def phase(name: str, repository: MongoRepository, documents: Iterable[dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        written = writer.write(name, repository, documents)
+        timings[name] = round(time.perf_counter() - started, 3)
+        log(f"[SEED] {name}: {written} documents in {timings[name]}s")
+
+    user_ids = [str(ObjectId()) for _ in range(config.users)]
+    # References in the form ID_STORAGE_MODE writes them.
+    user_refs = [stored_ref(user_id) for user_id in user_ids]
+    private_users = {i for i in range(config.users) if rng.random() < config.private_user_fraction}
+    password_hash = password_extension.hash_password(config.password)
+
+    def users() -> Iterator[dict[str, Any]]:
+        for i, user_id in enumerate(user_ids):
+            username = f"{config.prefix}{i:07d}"
+            yield {
+                "_id": ObjectId(user_id),
+                "username": username,
+                "email": f"{username}@example.com",
+                "password_hash": password_hash,
+                "display_name": f"{config.prefix.title()} User {i}",
+                "bio": "",
+                "avatar_image": "",
+                "social_accounts": {},
+                "follow_requires_approval": i in private_users,
+                "created_at": _created_at(rng, now, config.days),
+            }
+
+    phase("users", users_repo, users())
+
+    blocked_pairs: set[tuple[int, int]] = set()
+    for i in range(config.users):
+        if config.users > 1 and rng.random() < config.block_fraction:
+            for _ in range(rng.randint(1, 3)):
+                target = rng.randrange(config.users)
+                if target != i:
+                    blocked_pairs.add((i, target))
+    phase(
+        "blocks",
+        repos.blocks,
+        (
+            _stamped(
+                {"blocker_id": user_refs[a], "blocked_id": user_refs[b], "pair_key": pair_key(user_ids[a], user_ids[b])},
+                _created_at(rng, now, config.days),
+            )
+            for a, b in blocked_pairs
+        ),
+    )
+
+    people = _PopularityPicker(rng, config.users, config.popularity_exponent)
+    followers_of: dict[int, list[int]] = {}
+    pending: list[dict[str, Any]] = []
+
+    def follows() -> Iterator[dict[str, Any]]:
+        for i in range(config.users):
+            count = _pareto_count(rng, config.avg_follows, config.power_law_alpha, config.max_follows)
+            for target in people.sample(count):
+                if target == i or (i, target) in blocked_pairs or (target, i) in blocked_pairs:
+                    continue
+                doc = _stamped(
+                    {
+                        "follower_id": user_refs[i],
+                        "followee_id": user_refs[target],
+                        "pair_key": pair_key(user_ids[i], user_ids[target]),
+                    },
+                    _created_at(rng, now, config.days),
+                )
+                if target in private_users and rng.random() < config.pending_request_fraction:
+                    pending.append(doc)
+                    continue
+                followers_of.setdefault(target, []).append(i)
+                yield doc
+
+    phase("follows", repos.follows, follows())
+    phase("follow_requests", repos.follow_requests, pending)
+
+    public_spot_ids: list[Any] = []
+    visible_spot_ids: list[Any] = []
+
+    def spots() -> Iterator[dict[str, Any]]:
+        for i in range(config.users):
+            for _ in range(_pareto_count(rng, config.avg_spots, config.power_law_alpha, 5000)):
+                spot_id = ObjectId()
+                visibility = _weighted_choice(rng, config.visibility)
+                invites: list[Any] = []
+                if visibility == "invite_only":
+                    candidates = followers_of.get(i) or []
+                    invites = [user_refs[j] for j in rng.sample(candidates, min(len(candidates), rng.randint(1, 5)))]
+                if visibility == "public":
+                    public_spot_ids.append(stored_ref(spot_id))
+                if visibility in ("public", "following"):
+                    visible_spot_ids.append(stored_ref(spot_id))
+                city, lat, lon = _spot_position(rng, config.cluster_km)
+                created_at = _created_at(rng, now, config.days)
+                yield {
+                    "_id": spot_id,
+                    "owner_id": user_refs[i],
+                    "title": f"{rng.choice(TAGS).title()} spot near {city}",
+                    "description": "Synthetic spot generated for load testing.",
+                    "tags": rng.sample(TAGS, rng.randint(0, 4)),
+                    "lat": lat,
+                    "lon": lon,
+                    "images": [_image(rng, config.image_bytes) for _ in range(rng.randint(0, config.images_per_spot))],
+                    "visibility": visibility,
+                    "invite_user_ids": invites,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+
+    phase("spots", repos.spots, spots())
+
+    def favorites() -> Iterator[dict[str, Any]]:
+        picker = _PopularityPicker(rng, len(public_spot_ids), config.popularity_exponent)
+        for i in range(config.users):
+            count = _pareto_count(rng, config.avg_favorites, config.power_law_alpha, 2000)
+            for index in picker.sample(count):
+                yield _stamped(
+                    {"user_id": user_refs[i], "spot_id": public_spot_ids[index]},
+                    _created_at(rng, now, config.days),
+                )
+
+    phase("favorites", repos.favorites, favorites())
+
+    def shares() -> Iterator[dict[str, Any]]:
+        if not visible_spot_ids:
+            return
+        for i in range(config.users):
+            for _ in range(_pareto_count(rng, config.avg_shares, config.power_law_alpha, 500)):
+                yield {
+                    "user_id": user_refs[i],
+                    "spot_id": rng.choice(visible_spot_ids),
+                    "message": "",
+                    "created_at": _created_at(rng, now, config.days),
+                }
+
+    phase("shares", repos.shares, shares())
+
+    def tickets() -> Iterator[dict[str, Any]]:
+        for i in range(config.users):
+            if rng.random() >= config.ticket_fraction:
+                continue
+            created_at = _created_at(rng, now, config.days)
+            yield {
+                "user_id": user_ids[i],
+                "category": rng.choice(TICKET_CATEGORIES),
+                "subject": f"Synthetic ticket from user {i}",
+                "message": "Generated for load testing.",
+                "page": rng.choice(("/map", "/profile", "/settings", "/social")),
+                "contact_email": f"{config.prefix}{i:07d}@example.com",
+                "allow_contact": rng.random() < 0.5,
+                "status": "closed" if rng.random() < 0.6 else "open",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    phase("support_tickets", repos.support_tickets, tickets())
+
+    if config.error_reports > 0:
+        started = time.perf_counter()
+        ingestor = get_client_error_ingestor()
+        kinds = _PopularityPicker(rng, max(1, config.error_kinds), config.popularity_exponent)
+        written = 0
+        for offset in range(0, config.error_reports, config.batch_size):
+            size = min(config.batch_size, config.error_reports - offset)
+            ingestor.submit(
+                [_error_report(rng, next(iter(kinds.sample(1))), _created_at(rng, now, config.days)) for _ in range(size)]
+            )
+            written += ingestor.flush()
+        timings["client_errors"] = round(time.perf_counter() - started, 3)
+        writer.counts["client_errors"] = config.error_reports
+        log(f"[SEED] client_errors: {config.error_reports} reports ({written} sample rows) in {timings['client_errors']}s")
+
+    if config.create_indexes:
+        started = time.perf_counter()
+        get_index_manager().reconcile(create=True)
+        timings["indexes"] = round(time.perf_counter() - started, 3)
+        log(f"[SEED] indexes reconciled in {timings['indexes']}s")
+
+    return {
+        "config": asdict(config),
+        "counts": writer.counts,
+        "duplicates": writer.duplicates,
+        "seconds": timings,
+        "total_seconds": round(sum(timings.values()), 3),
+    }
+
+
+def _parse_visibility(value: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_VISIBILITY:
+            raise argparse.ArgumentTypeError(f"Unknown visibility {name!r}")
+        weights[name] = float(weight)
+    if not weights or sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("Visibility weights must be positive")
+    return weights
+
+
+def parse_args(argv: Sequence[str] | None = None) -> SeedConfig:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Seed the configured storage with a synthetic dataset.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--avg-spots", type=float, default=defaults.avg_spots, help="mean spots per user")
+    parser.add_argument("--avg-follows", type=float, default=defaults.avg_follows, help="mean accounts followed per user")
+    parser.add_argument("--max-follows", type=int, default=defaults.max_follows)
+    parser.add_argument("--avg-favorites", type=float, default=defaults.avg_favorites)
+    parser.add_argument("--avg-shares", type=float, default=defaults.avg_shares)
+    parser.add_argument("--alpha", type=float, default=defaults.power_law_alpha, help="Pareto shape of per-user counts")
+    parser.add_argument(
+        "--popularity-exponent",
+        type=float,
+        default=defaults.popularity_exponent,
+        help="Zipf exponent for how strongly follows/favorites concentrate on popular targets",
+    )
+    parser.add_argument("--private-fraction", type=float, default=defaults.private_user_fraction)
+    parser.add_argument("--pending-fraction", type=float, default=defaults.pending_request_fraction)
+    parser.add_argument("--block-fraction", type=float, default=defaults.block_fraction)
+    parser.add_argument("--ticket-fraction", type=float, default=defaults.ticket_fraction)
+    parser.add_argument("--error-reports", type=int, default=defaults.error_reports)
+    parser.add_argument("--error-kinds", type=int, default=defaults.error_kinds)
+    parser.add_argument("--images-per-spot", type=int, default=defaults.images_per_spot)
+    parser.add_argument("--image-bytes", type=int, default=defaults.image_bytes, help="inline image size; 0 uses URLs")
+    parser.add_argument("--cluster-km", type=float, default=defaults.cluster_km, help="spread of spots around each city")
+    parser.add_argument("--days", type=int, default=defaults.days, help="spread created_at over this many days")
+    parser.add_argument(
+        "--visibility",
+        type=_parse_visibility,
+        default=defaults.visibility,
+        help="weights, e.g. public=0.7,following=0.15,invite_only=0.05,personal=0.1",
+    )
+    parser.add_argument("--prefix", default=defaults.prefix, help="username prefix; use a new one to seed again")
+    parser.add_argument("--password", default=defaults.password, help="password shared by all seeded users")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="random seed")
+    parser.add_argument("--skip-indexes", action="store_true", help="do not reconcile indexes after loading")
+    args = parser.parse_args(argv)
+
+    return SeedConfig(
+        users=max(0, args.users),
+        avg_spots=args.avg_spots,
+        avg_follows=args.avg_follows,
+        max_follows=args.max_follows,
+        avg_favorites=args.avg_favorites,
+        avg_shares=args.avg_shares,
+        power_law_alpha=args.alpha,
+        popularity_exponent=args.popularity_exponent,
+        private_user_fraction=args.private_fraction,
+        pending_request_fraction=args.pending_fraction,
+        block_fraction=args.block_fraction,
+        ticket_fraction=args.ticket_fraction,
+        error_reports=args.error_reports,
+        error_kinds=args.error_kinds,
+        images_per_spot=args.images_per_spot,
+        image_bytes=args.image_bytes,
+        cluster_km=args.cluster_km,
+        days=args.days,
+        visibility=args.visibility,
+        prefix=args.prefix,
+        password=args.password,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        create_indexes=not args.skip_indexes,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    summary = seed_dataset(parse_args(argv))
+    print(json.dumps({key: summary[key] for key in ("counts", "duplicates", "seconds", "total_seconds")}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Production launcher: several uvicorn worker processes behind one listening socket.
+
+    python serve.py                      # WEB_CONCURRENCY workers (default: CPU count)
+    WEB_CONCURRENCY=4 MAX_REQUESTS=20000 python serve.py
+
+Workers are started with the `main:create_app` factory in fresh interpreters, so the
+repositories, caches, job queue and metrics singletons are created inside each worker,
+never inherited from the supervisor. The supervisor restarts workers that exit. A worker
+leaves after MAX_REQUESTS (plus up to MAX_REQUESTS_JITTER, so workers do not all recycle
+at once). SIGHUP restarts all workers one by one, and SIGTTIN/SIGTTOU add or remove a
+worker.
+
+`python main.py` still runs a single process for development.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import tempfile
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from data.config import env_int
+
+
+def worker_count() -> int:
+    return max(1, env_int("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+class WorkerConfig(uvicorn.Config):
+    """uvicorn config that adds per-worker jitter to `limit_max_requests`.
+
+    `load()` runs inside each worker process, so every worker draws its own limit.
+    """
+
+    def __init__(self, *args, max_requests_jitter: int = 0, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_requests_jitter = max(0, max_requests_jitter)
+
+    def load(self) -> None:
+        if self.limit_max_requests and self.max_requests_jitter:
+            self.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        super().load()
+
+
+def build_config(workers: int) -> WorkerConfig:
+    max_requests = env_int("MAX_REQUESTS", 0)
+    return WorkerConfig(
+        "main:create_app",
+        factory=True,
+        host=str(os.getenv("HOST") or "0.0.0.0").strip() or "0.0.0.0",
+        port=env_int("PORT", 8000),
+        workers=workers,
+        limit_max_requests=max_requests or None,
+        max_requests_jitter=env_int("MAX_REQUESTS_JITTER", max_requests // 10),
+        timeout_graceful_shutdown=env_int("GRACEFUL_TIMEOUT", 30),
+        timeout_keep_alive=env_int("KEEP_ALIVE_SECONDS", 5),
+        proxy_headers=True,
+        forwarded_allow_ips=str(os.getenv("FORWARDED_ALLOW_IPS") or "127.0.0.1").strip() or "127.0.0.1",
+    )
+
+
+def main() -> None:
+    workers = worker_count()
+    # Workers record their first completed warm-up here; /health/ready waits for all of them.
+    ready_dir = tempfile.mkdtemp(prefix="spotonsight-ready-")
+    os.environ["SERVER_WORKERS"] = str(workers)
+    os.environ["SERVER_READY_DIR"] = ready_dir
+
+    config = build_config(workers)
+    server = uvicorn.Server(config=config)
+    print(f"[STARTUP] Starting {workers} worker(s) on {config.host}:{config.port}")
+    try:
+        if workers > 1:
+            sock = config.bind_socket()
+            Multiprocess(config, target=server.run, sockets=[sock]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutil.rmtree(ready_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import os
+
+
+# Run the suite against the in-memory backend unless a real server is requested
+# explicitly (STORAGE_BACKEND=mongo MONGO_URL=...).
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+# Many tests log in and search from the same test client address; the rate limit
+# tests build their own limiter.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
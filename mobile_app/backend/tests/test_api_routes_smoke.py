@@ -28,15 +28,23 @@ def _expected_routes() -> set[tuple[str, str]]:
         ("GET", "/client-errors/{entity_id}"),
         ("PUT", "/client-errors/{entity_id}"),
         ("DELETE", "/client-errors/{entity_id}"),
+        ("POST", "/client-errors/batch"),
         # Auth endpoints
         ("POST", "/auth/register"),
         ("POST", "/auth/login"),
+        ("POST", "/auth/refresh"),
+        ("POST", "/auth/logout"),
         # Social endpoints
         ("GET", "/social/me"),
         ("PUT", "/social/me"),
+        ("GET", "/social/users"),
         ("GET", "/social/users/search"),
         ("GET", "/social/users/{user_id}/profile"),
         ("GET", "/social/spots"),
+        ("GET", "/social/sync"),
+        ("GET", "/social/events"),
+        ("GET", "/social/spots/tiles/{z}/{x}/{y}"),
+        ("GET", "/social/spots/tiles/{z}/{x}/{y}/private"),
         ("POST", "/social/spots"),
         ("PUT", "/social/spots/{spot_id}"),
         ("DELETE", "/social/spots/{spot_id}"),
@@ -58,6 +66,18 @@ def _expected_routes() -> set[tuple[str, str]]:
         ("GET", "/social/blocked"),
         ("POST", "/social/share/{spot_id}"),
         ("POST", "/social/support/tickets"),
+        ("GET", "/social/support/tickets/admin/all"),
+        ("GET", "/social/support/tickets/admin/counts"),
+        # Admin endpoints
+        ("GET", "/admin/jobs"),
+        ("GET", "/admin/metrics"),
+        ("GET", "/admin/indexes"),
+        ("GET", "/admin/mongo/commands"),
+        ("GET", "/admin/http"),
+        ("GET", "/metrics"),
+        # Health checks
+        ("GET", "/health/live"),
+        ("GET", "/health/ready"),
     }
 
 
@@ -92,18 +112,31 @@ def test_openapi_is_reachable(app):
     [
         ("POST", "/auth/register", {}, 422),
         ("POST", "/auth/login", {}, 422),
+        ("POST", "/auth/refresh", {"refresh_token": "x" * 43}, 401),
         # Generic authenticated routers
         ("POST", "/spots/", {}, 401),
         ("GET", "/spots/", None, 401),
         ("GET", "/spots/507f1f77bcf86cd799439012", None, 401),
         ("PUT", "/spots/507f1f77bcf86cd799439012", {}, 401),
         ("DELETE", "/spots/507f1f77bcf86cd799439012", None, 401),
+        ("POST", "/client-errors/batch", {"reports": []}, 401),
         # Social endpoints (authentication boundary)
         ("GET", "/social/me", None, 401),
         ("GET", "/social/spots", None, 401),
+        ("GET", "/social/sync", None, 401),
+        ("GET", "/social/users?ids=507f1f77bcf86cd799439012", None, 401),
+        ("GET", "/social/events", None, 401),
+        ("GET", "/social/spots/tiles/3/4/2", None, 401),
         ("GET", "/social/favorites", None, 401),
         ("GET", "/social/follow/requests", None, 401),
         ("GET", "/social/blocked", None, 401),
+        ("GET", "/admin/jobs", None, 401),
+        ("GET", "/admin/metrics", None, 401),
+        ("GET", "/admin/indexes", None, 401),
+        ("GET", "/admin/mongo/commands", None, 401),
+        ("GET", "/admin/http", None, 401),
+        ("GET", "/social/support/tickets/admin/all", None, 401),
+        ("GET", "/social/support/tickets/admin/counts", None, 401),
     ],
 )
 def test_endpoints_return_expected_unauthenticated_status(app, method, path, json_body, expected_status):
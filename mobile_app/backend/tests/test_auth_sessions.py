@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import uuid
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import create_app  # noqa: E402
+from routing.auth_routes import password_extension, session_extension  # noqa: E402
+
+
+def _register(client: TestClient) -> dict:
+    name = f"session_{uuid.uuid4().hex[:10]}"
+    response = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_refresh_rotates_without_verifying_the_password(monkeypatch):
+    client = TestClient(create_app())
+    login = _register(client)
+    assert login["refresh_token"] and login["expires_in"] > 0
+
+    def no_bcrypt(*args, **kwargs):
+        raise AssertionError("refresh must not verify a password")
+
+    monkeypatch.setattr(password_extension, "verify_password", no_bcrypt)
+    response = client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != login["refresh_token"]
+
+    me = client.get("/social/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert me.json()["id"] == login["user"]["id"]
+
+
+def test_reusing_a_rotated_token_revokes_the_chain(monkeypatch):
+    monkeypatch.setattr(session_extension, "reuse_grace_seconds", -1)
+    client = TestClient(create_app())
+    first = _register(client)["refresh_token"]
+    second = client.post("/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+
+    assert client.post("/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+
+
+def test_logout_revokes_the_refresh_token():
+    client = TestClient(create_app())
+    token = _register(client)["refresh_token"]
+
+    assert client.post("/auth/logout", json={"refresh_token": token}).json() == {"ok": True}
+    assert client.post("/auth/refresh", json={"refresh_token": token}).status_code == 401
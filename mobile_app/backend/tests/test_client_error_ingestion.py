@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import sys
+from pathlib import Path
+import uuid
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import ClientErrorFingerprintRecord, ClientErrorReport  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from routing.client_error_routes import ClientErrorIngestor, error_fingerprint, normalize_stacktrace  # noqa: E402
+
+
+_STACK_A = """TypeError: Cannot read properties of undefined (reading 'lat')
+    at renderMarker (https://app.example.com/assets/index-3f2a9bc1.js:12:3456)
+    at MapWorkspace.update (https://app.example.com/assets/index-3f2a9bc1.js?v=2:98:11)
+"""
+
+_STACK_B = """TypeError: Cannot read properties of undefined (reading 'lat')
+    at renderMarker (https://cdn.example.net/assets/index-77aa01de.js:12:3501)
+    at MapWorkspace.update (https://cdn.example.net/assets/index-77aa01de.js:101:7)
+"""
+
+
+def test_normalize_stacktrace_strips_volatile_parts() -> None:
+    normalized = normalize_stacktrace(_STACK_A)
+    assert "example.com" not in normalized
+    assert "3f2a9bc1" not in normalized
+    assert "3456" not in normalized
+    assert "index.js:N:N" in normalized
+
+
+def test_same_crash_from_different_builds_shares_a_fingerprint() -> None:
+    first = ClientErrorReport(kind="exception", source="webapp", message="boom 1", stacktrace=_STACK_A)
+    second = ClientErrorReport(kind="exception", source="webapp", message="boom 2", stacktrace=_STACK_B)
+    other = ClientErrorReport(kind="exception", source="webapp", message="boom", stacktrace="Error\n at other (a.js:1:1)")
+    assert error_fingerprint(first) == error_fingerprint(second)
+    assert error_fingerprint(first) != error_fingerprint(other)
+
+
+def _ingestor() -> ClientErrorIngestor:
+    suffix = uuid.uuid4().hex[:8]
+    return ClientErrorIngestor(
+        reports=MongoRepository(collection_name=f"client_error_reports_{suffix}", model_type=ClientErrorReport),
+        fingerprints=MongoRepository(collection_name=f"client_error_fingerprints_{suffix}", model_type=ClientErrorFingerprintRecord),
+    )
+
+
+def _report(message: str = "boom", stacktrace: str = _STACK_A) -> ClientErrorReport:
+    return ClientErrorReport(kind="exception", source="webapp", message=message, stacktrace=stacktrace)
+
+
+def test_flush_writes_one_count_and_one_truncated_sample_per_fingerprint() -> None:
+    ingestor = _ingestor()
+    huge = _STACK_A + "    at frame (a.js:1:1)\n" * 8000
+    ingestor.submit([_report(stacktrace=huge), _report(stacktrace=huge), _report(stacktrace="Error\n at other (b.js:1:1)")])
+
+    assert ingestor.flush() == 3
+    assert ingestor.flush() == 0
+    counts = sorted(row["count"] for row in ingestor.fingerprints.find_many({}))
+    assert counts == [1, 2]
+    raw = ingestor.reports.find_many({"occurrences": 2})
+    assert len(raw) == 1 and len(raw[0]["stacktrace"]) <= 8000
+
+
+def test_failed_count_write_is_requeued_without_writing_samples(monkeypatch: pytest.MonkeyPatch) -> None:
+    ingestor = _ingestor()
+    ingestor.submit([_report()])
+
+    def down(operations):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(ingestor.fingerprints, "bulk_write", down)
+    assert ingestor.flush() == 0
+    assert ingestor.reports.count_documents({}) == 0
+    monkeypatch.undo()
+
+    ingestor.submit([_report()])
+    assert ingestor.flush() == 2
+    assert [row["count"] for row in ingestor.fingerprints.find_many({})] == [2]
+    assert ingestor.reports.count_documents({}) == 1
+
+
+def test_failed_sample_write_does_not_count_reports_twice(monkeypatch: pytest.MonkeyPatch) -> None:
+    ingestor = _ingestor()
+    ingestor.submit([_report()])
+
+    def down(documents):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(ingestor.reports, "insert_many", down)
+    assert ingestor.flush() == 1
+    monkeypatch.undo()
+
+    assert ingestor.flush() == 0
+    assert [row["count"] for row in ingestor.fingerprints.find_many({})] == [1]
+
+
+def test_retention_and_seen_times_use_the_server_clock() -> None:
+    ingestor = _ingestor()
+    skewed = datetime(2001, 1, 1)
+    before = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=1)
+    ingestor.submit([ClientErrorReport(kind="exception", source="webapp", message="boom", stacktrace=_STACK_A, created_at=skewed)])
+    ingestor.flush()
+
+    raw = ingestor.reports.find_one({})
+    assert raw["created_at"] >= before and raw["reported_at"] == skewed
+    fingerprint = ingestor.fingerprints.find_one({})
+    assert fingerprint["first_seen"] >= before and fingerprint["last_seen"] >= before
+    assert fingerprint["samples"][0]["reported_at"] == skewed
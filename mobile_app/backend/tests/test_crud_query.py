@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import sys
+from pathlib import Path
+import uuid
+
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import SPOT_INDEXES, ClientErrorReport, Spot  # noqa: E402
+from data.indexes import index  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.crud_query import parse_crud_query  # noqa: E402
+
+
+_REPORT_INDEXES = [index("kind", "created_at")]
+
+
+def test_filters_are_typed_and_sorts_need_a_matching_index() -> None:
+    query = parse_crud_query(
+        [("kind", "exception"), ("since", "2026-01-01T00:00:00Z"), ("sort", "-created_at"), ("limit", "5")],
+        ClientErrorReport,
+        _REPORT_INDEXES,
+    )
+    assert query.filter == {"kind": "exception", "created_at": {"$gte": datetime(2026, 1, 1, tzinfo=UTC)}}
+    assert query.sort == [("created_at", -1)] and query.limit == 5
+
+    spots = parse_crud_query({"lon__gte": "8", "lat__lt": "48", "tags": "lake", "fields": "title,lat"}, Spot, SPOT_INDEXES)
+    assert spots.filter == {"lon": {"$gte": 8.0}, "lat": {"$lt": 48.0}, "tags": "lake"}
+    assert spots.projection == {"title": 1, "lat": 1}
+    assert spots.sort == [("_id", 1)]
+
+    after = ObjectId()
+    page = parse_crud_query({"kind": "log", "after": str(after), "sort": "-_id"}, ClientErrorReport, _REPORT_INDEXES)
+    assert page.filter == {"kind": "log", "_id": {"$lt": after}} and page.sort == [("_id", -1)]
+
+    for params in (
+        {"sort": "-created_at"},  # the index leads with kind, which is not pinned
+        {"sort": "message"},
+        {"nope": "1"},
+        {"kind__regex": "x"},
+        {"since": "yesterday"},
+        {"fields": "password_hash"},
+        {"limit": "5000"},
+        {"context": "{}"},
+        {"message": "boom"},  # no index leads with message
+        {"kind__ne": "log"},  # does not narrow the index scan
+        {"after": "nope"},
+        {"kind": "log", "sort": "-created_at", "after": str(ObjectId())},
+    ):
+        with pytest.raises(HTTPException) as e:
+            parse_crud_query(params, ClientErrorReport, _REPORT_INDEXES)
+        assert e.value.status_code == 400, params
+
+
+def test_client_errors_list_filters_through_query_parameters() -> None:
+    client = TestClient(create_app())
+    name = f"crud_{uuid.uuid4().hex[:10]}"
+    token = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    source = f"crud-test-{uuid.uuid4().hex[:6]}"
+    now = datetime.now(UTC)
+    for kind, age in (("exception", 1), ("exception", 3), ("log", 1)):
+        report = {"kind": kind, "source": source, "message": f"{kind} {age}", "created_at": (now - timedelta(days=age)).isoformat()}
+        assert client.post("/client-errors/", json=report, headers=headers).status_code == 200
+
+    response = client.get(
+        "/client-errors/",
+        params={"kind": "exception", "source": source, "since": (now - timedelta(days=2)).isoformat(), "fields": "message"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [(row["message"], sorted(row)) for row in response.json()] == [("exception 1", ["_id", "message"])]
+
+    newest_first = client.get(
+        "/client-errors/",
+        params={"kind": "exception", "source": source, "sort": "-created_at", "limit": "1"},
+        headers=headers,
+    )
+    assert [row["message"] for row in newest_first.json()] == ["exception 1"]
+    assert client.get("/client-errors/", params={"sort": "message"}, headers=headers).status_code == 400
+
+    pages: list[list[str]] = []
+    params = {"kind": "exception", "source": source, "fields": "message", "limit": "1"}
+    while len(pages) < 3:
+        rows = client.get("/client-errors/", params=params, headers=headers).json()
+        if not rows:
+            break
+        pages.append([row["message"] for row in rows])
+        params["after"] = rows[-1]["_id"]["$oid"]
+    assert sorted(message for page in pages for message in page) == ["exception 1", "exception 3"]
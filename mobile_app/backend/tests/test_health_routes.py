@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import create_app  # noqa: E402
+from routing.health_routes import get_readiness  # noqa: E402
+
+
+def test_building_the_app_does_not_create_storage_clients():
+    script = (
+        "import main; main.create_app(); "
+        "from data import storage; "
+        "assert not storage._CLIENTS, storage._CLIENTS; "
+        "import sys; assert 'uvicorn' not in sys.modules"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_ROOT,
+        env={**os.environ, "STORAGE_BACKEND": "mongo", "MONGO_URL": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_ready_reports_503_until_warm_up_finished():
+    app = create_app()
+    readiness = get_readiness()
+
+    readiness.ready.clear()
+    client = TestClient(app)
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/health/ready").status_code == 503
+
+    with TestClient(app) as started:
+        assert readiness.ready.wait(10)
+        response = started.get("/health/ready")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["ready"] is True
+        assert set(body["steps"]) == {"storage", "indexes"}
+
+
+def test_ready_waits_for_every_worker(tmp_path, monkeypatch):
+    monkeypatch.setenv("SERVER_READY_DIR", str(tmp_path))
+    monkeypatch.setenv("SERVER_WORKERS", "2")
+    readiness = get_readiness()
+    readiness.ready.set()
+
+    (tmp_path / str(os.getppid())).touch()
+    assert readiness.workers() == {"expected": 2, "warmed_up": 1}
+    assert not readiness.is_ready()
+
+    readiness._mark_worker_ready()
+    assert readiness.is_ready()
+
+    # A recycled worker's marker goes away with it, a crashed one's is skipped and removed.
+    readiness.stop()
+    assert readiness.workers() == {"expected": 2, "warmed_up": 1}
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    (tmp_path / str(exited.pid)).touch()
+    assert readiness.workers() == {"expected": 2, "warmed_up": 1}
+    assert not (tmp_path / str(exited.pid)).exists()
+
+
+def test_reset_clients_makes_repositories_reresolve_their_collection():
+    from data import storage
+    from data.mongo_repository import MongoRepository
+    from data.dto import AuthUserRecord
+
+    repository = MongoRepository("users", AuthUserRecord, db_name="SpotOnSightAuth")
+    repository.collection
+    generation = storage.client_generation()
+
+    storage.reset_clients()
+    assert storage.client_generation() == generation + 1
+    assert not storage._CLIENTS
+    repository.collection
+    assert repository._generation == storage.client_generation()
+    assert storage._CLIENTS
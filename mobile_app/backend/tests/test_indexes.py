@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.indexes import IndexManager, index  # noqa: E402
+
+
+class _Collection:
+    def __init__(self, existing: dict) -> None:
+        self.existing = existing
+        self.created: list[str] = []
+
+    def index_information(self) -> dict:
+        return self.existing
+
+    def create_indexes(self, models) -> list[str]:
+        names = [model.document["name"] for model in models]
+        self.created.extend(names)
+        return names
+
+
+def _repository(existing: dict) -> SimpleNamespace:
+    return SimpleNamespace(db_name="db", collection_name="things", collection=_Collection(existing))
+
+
+def test_index_shorthand_builds_named_models() -> None:
+    spec = index("user_id", ("created_at", -1), unique=True)
+
+    assert spec.keys == (("user_id", 1), ("created_at", -1))
+    assert spec.index_name == "user_id_1_created_at_-1"
+    assert spec.to_model().document["unique"] is True
+
+
+def test_reconcile_creates_missing_and_reports_drift() -> None:
+    repository = _repository(
+        {
+            "_id_": {"key": [("_id", 1)]},
+            "email_1": {"key": [("email", 1)]},
+            "legacy_1": {"key": [("legacy", 1)]},
+            "_fts_text__ftsx_1": {"key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"title": 1}},
+        }
+    )
+    manager = IndexManager()
+    manager.register(
+        repository,
+        [index("email", unique=True), index("created_at", ttl_seconds=60), index(("title", "text"))],
+    )
+
+    report = manager.reconcile(create=True)
+    entry = report["collections"]["db.things"]
+
+    assert entry["created"] == ["created_at_1"]
+    assert entry["missing"] == []
+    assert entry["mismatched"] == [{"index": "email_1", "options": ["unique"]}]
+    assert entry["extra"] == ["legacy_1"]
+    assert report["drift"] is True
+
+
+def test_unique_only_reconcile_builds_just_the_unique_indexes() -> None:
+    repository = _repository({"_id_": {"key": [("_id", 1)]}})
+    manager = IndexManager()
+    manager.register(repository, [index("email", unique=True), index("created_at")])
+
+    report = manager.reconcile(create=True, unique_only=True)
+
+    assert report["collections"]["db.things"]["created"] == ["email_1"]
+    assert manager.last_report == {}
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import sys
+from pathlib import Path
+import uuid
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import JobRecord  # noqa: E402
+from data.ids import ref_filter  # noqa: E402
+from data.indexes import get_index_manager  # noqa: E402
+from data.job_queue import JOB_DONE, JOB_FAILED, JOB_PENDING, JOB_RUNNING, JobQueue, get_job_queue, retry_delay_seconds  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.social_routes import get_social_repositories  # noqa: E402
+
+
+def _queue() -> JobQueue:
+    return JobQueue(MongoRepository(collection_name=f"jobs_{uuid.uuid4().hex[:8]}", model_type=JobRecord))
+
+
+def _statuses(queue: JobQueue) -> list[str]:
+    return sorted(row["status"] for row in queue.repository.find_many({}))
+
+
+def _user(client: TestClient) -> tuple[str, dict[str, str]]:
+    name = f"jobs_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def test_retry_delay_grows_exponentially_and_is_capped() -> None:
+    assert [retry_delay_seconds(n) for n in range(1, 5)] == [2, 4, 8, 16]
+    assert retry_delay_seconds(20) == 300
+
+
+def test_jobs_are_claimed_in_batches_per_kind() -> None:
+    queue = _queue()
+    batches: list[list[int]] = []
+    queue.register("count", lambda payloads: batches.append([p["n"] for p in payloads]), batch_size=2)
+    for n in range(3):
+        queue.enqueue("count", {"n": n})
+
+    assert queue.run_once() == 2
+    assert queue.run_once() == 1
+    assert queue.run_once() == 0
+    assert sorted(n for batch in batches for n in batch) == [0, 1, 2]
+    assert _statuses(queue) == [JOB_DONE] * 3
+
+
+def test_failed_batch_backs_off_then_fails_after_max_attempts() -> None:
+    queue = _queue()
+
+    def broken(payloads):
+        raise RuntimeError("boom")
+
+    queue.register("broken", broken, max_attempts=2)
+    job_id = queue.enqueue("broken", {})
+
+    assert queue.run_once() == 1
+    row = queue.repository.find_one({})
+    assert row["status"] == JOB_PENDING and "boom" in row["last_error"]
+    assert queue.run_once() == 0  # still backing off
+
+    queue.repository.update_fields({}, {"run_after": datetime.now(UTC) - timedelta(seconds=1)})
+    assert queue.run_once() == 1
+    row = queue.repository.find_one({})
+    assert str(row["_id"]) == job_id and row["status"] == JOB_FAILED and row["attempts"] == 2
+
+
+def test_failed_batch_is_rerun_singly_so_only_the_bad_job_retries() -> None:
+    queue = _queue()
+    handled: list[int] = []
+
+    def picky(payloads):
+        if any(p["n"] == 1 for p in payloads):
+            raise RuntimeError("bad payload")
+        handled.extend(p["n"] for p in payloads)
+
+    queue.register("picky", picky, batch_size=3)
+    for n in range(3):
+        queue.enqueue("picky", {"n": n})
+
+    assert queue.run_once() == 3
+    assert sorted(handled) == [0, 2]
+    bad = queue.repository.find_one({"status": JOB_PENDING})
+    assert bad["payload"]["n"] == 1 and "bad payload" in bad["last_error"]
+    assert _statuses(queue) == [JOB_DONE, JOB_DONE, JOB_PENDING]
+
+
+def test_expired_lease_is_reclaimed_but_a_live_one_is_not() -> None:
+    queue = _queue()
+    seen: list[str] = []
+    queue.register("lease", lambda payloads: seen.extend(p["name"] for p in payloads), batch_size=10)
+    now = datetime.now(UTC)
+    for name, locked_until in (("crashed", now - timedelta(seconds=1)), ("busy", now + timedelta(seconds=60))):
+        queue.enqueue("lease", {"name": name})
+        queue.repository.update_fields(
+            {"payload.name": name},
+            {"status": JOB_RUNNING, "locked_until": locked_until, "attempts": 1},
+        )
+
+    assert queue.run_once() == 1
+    assert seen == ["crashed"]
+    assert queue.repository.find_one({"payload.name": "crashed"})["attempts"] == 2
+
+
+def test_idempotency_key_returns_the_existing_job() -> None:
+    queue = _queue()
+    get_index_manager().reconcile()
+    queue.register("once", lambda payloads: None)
+    first = queue.enqueue("once", {}, idempotency_key="k")
+    assert queue.enqueue("once", {}, idempotency_key="k") == first
+    assert queue.repository.count_documents({}) == 1
+
+
+def test_retried_share_batch_does_not_duplicate_rows() -> None:
+    client = TestClient(create_app())
+    user_id, headers = _user(client)
+    spot_id = client.post("/social/spots", json={"title": "Share", "lat": 47.0, "lon": 8.0}, headers=headers).json()["id"]
+    repos = get_social_repositories()
+    jobs = get_job_queue()
+
+    assert client.post(f"/social/share/{spot_id}", json={"message": "hi"}, headers=headers).status_code == 200
+    jobs.drain()
+    # Replay the batch as a retry after an ambiguous failure would.
+    jobs.repository.update_many_fields(
+        {"kind": "social.record_share", "payload.user_id": user_id},
+        {"status": JOB_PENDING, "run_after": datetime.now(UTC)},
+    )
+    jobs.drain()
+    assert repos.shares.count_documents({"user_id": ref_filter(user_id)}) == 1
+
+
+def test_late_block_cascade_retry_keeps_a_follow_made_after_unblocking() -> None:
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, b = _user(client)
+    repos = get_social_repositories()
+    jobs = get_job_queue()
+
+    client.post(f"/social/block/{b_id}", headers=a)
+    client.delete(f"/social/block/{b_id}", headers=a)
+    client.post(f"/social/follow/{a_id}", headers=b)
+    jobs.drain()
+    jobs.enqueue("social.block_cascade", {"blocker_id": a_id, "blocked_id": b_id})
+    jobs.drain()
+    assert repos.follows.count_documents({"follower_id": ref_filter(b_id), "followee_id": ref_filter(a_id)}) == 1
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+import threading
+import uuid
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import create_app  # noqa: E402
+from routing.auth_routes import get_auth_user_repository, get_current_user_for_stream  # noqa: E402
+from routing.live_events import RESYNC_EVENT, EventBus, LiveEvent, event_stream, get_live_events  # noqa: E402
+
+
+def _user(client: TestClient, **profile) -> tuple[str, dict[str, str]]:
+    name = f"live_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    headers = {"Authorization": f"Bearer {body['access_token']}"}
+    if profile:
+        client.put("/social/me", json=profile, headers=headers)
+    return body["user"]["id"], headers
+
+
+def test_bus_delivers_across_threads_and_collapses_a_backlog():
+    async def scenario():
+        bus = EventBus(queue_size=2)
+        subscription = bus.subscribe("u1")
+        publisher = threading.Thread(target=bus.publish, args=(["u1", "u2"], LiveEvent("follow", {"x": 1})))
+        publisher.start()
+        publisher.join()
+        assert await subscription.next(1.0) == LiveEvent("follow", {"x": 1})
+
+        for n in range(3):
+            bus.publish(["u1"], LiveEvent("spot", {"n": n}))
+        await asyncio.sleep(0)
+        assert await subscription.next(1.0) == RESYNC_EVENT
+        assert await subscription.next(0.01) is None
+
+        bus.unsubscribe(subscription)
+        assert not bus.has_subscribers()
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_sends_events_heartbeats_and_ends_on_close():
+    async def scenario():
+        bus = EventBus()
+        stream = event_stream(bus, "u1", heartbeat_seconds=0.05)
+        assert "retry:" in await anext(stream)
+        assert await anext(stream) == ": ping\n\n"
+
+        bus.publish(["u1"], LiveEvent("ticket_status", {"ticket_id": "t1", "status": "closed"}))
+        frame = await anext(stream)
+        assert frame.startswith("event: ticket_status\n")
+        assert '"status":"closed"' in frame
+
+        bus.close_all()
+        chunks = [chunk async for chunk in stream]
+        assert all(chunk == ": ping\n\n" for chunk in chunks)
+        assert not bus.has_subscribers()
+
+    asyncio.run(scenario())
+
+
+def test_route_handlers_publish_follow_spot_and_ticket_events():
+    client = TestClient(create_app())
+    private_id, private = _user(client, follow_requires_approval=True)
+    follower_id, follower = _user(client)
+    bus = get_live_events().bus
+
+    async def scenario():
+        to_private = bus.subscribe(private_id)
+        to_follower = bus.subscribe(follower_id)
+        try:
+            await asyncio.to_thread(client.post, f"/social/follow/{private_id}", headers=follower)
+            event = await to_private.next(2.0)
+            assert (event.type, event.data["follower_id"]) == ("follow_request", follower_id)
+
+            await asyncio.to_thread(client.post, f"/social/follow/requests/{follower_id}/approve", headers=private)
+            assert (await to_follower.next(2.0)).type == "follow"
+            assert (await to_private.next(2.0)).type == "follow"
+
+            spot = await asyncio.to_thread(
+                client.post,
+                "/social/spots",
+                json={"title": "Live", "lat": 47.0, "lon": 8.0, "visibility": "following"},
+                headers=private,
+            )
+            event = await to_follower.next(2.0)
+            assert (event.type, event.data["spot_id"]) == ("spot", spot.json()["id"])
+
+            ticket = await asyncio.to_thread(
+                client.post,
+                "/social/support/tickets",
+                json={"category": "bug", "subject": "Live", "message": "Ticket for live events"},
+                headers=follower,
+            )
+            get_auth_user_repository().update_fields({"_id": ObjectId(private_id)}, {"is_admin": True})
+            invalid = await asyncio.to_thread(
+                client.patch,
+                f"/social/support/tickets/{ticket.json()['id']}/status",
+                params={"status": "archived"},
+                headers=private,
+            )
+            assert invalid.status_code == 400
+            response = await asyncio.to_thread(
+                client.patch,
+                f"/social/support/tickets/{ticket.json()['id']}/status",
+                params={"status": "closed"},
+                headers=private,
+            )
+            assert response.status_code == 200
+            event = await to_follower.next(2.0)
+            assert (event.type, event.data["status"]) == ("ticket_status", "closed")
+        finally:
+            bus.unsubscribe(to_private)
+            bus.unsubscribe(to_follower)
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_requires_a_token():
+    client = TestClient(create_app())
+    assert client.get("/social/events").status_code == 401
+    assert client.get("/social/events", params={"stream_token": "not-a-token"}).status_code == 401
+
+
+def test_event_stream_query_accepts_only_stream_tokens():
+    client = TestClient(create_app())
+    _, headers = _user(client)
+    access_token = headers["Authorization"].removeprefix("Bearer ")
+    stream_token = client.post("/social/events/token", headers=headers).json()["stream_token"]
+
+    assert client.get("/social/events", params={"stream_token": access_token}).status_code == 401
+    assert client.get("/social/me", headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+    assert get_current_user_for_stream(None, stream_token)["_id"]
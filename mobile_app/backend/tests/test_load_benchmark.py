@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from benchmarks.load_benchmark import compare, main  # noqa: E402
+
+
+def test_load_benchmark_runs_in_process_and_writes_results(tmp_path):
+    output = tmp_path / "results.json"
+    results = main(
+        [
+            "--scenarios", "profile,search",
+            "--concurrency", "2",
+            "--iterations", "2",
+            "--warmup", "0",
+            "--users", "20",
+            "--prefix", "loadtest",
+            "--output", str(output),
+        ]
+    )
+
+    written = json.loads(output.read_text(encoding="utf-8"))
+    assert set(written["scenarios"]) == {"profile", "search"}
+    profile = results["scenarios"]["profile"]
+    assert profile["journeys"] == 2
+    assert profile["requests"] == 4
+    assert not profile["errors"]
+    assert profile["mongo"]["commands"] > 0
+    assert compare(results, written)[1].startswith("profile")
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.memory_store import MemoryClient  # noqa: E402
+
+
+@pytest.fixture()
+def collection():
+    return MemoryClient()["test_db"]["items"]
+
+
+def test_query_operators_sort_and_projection(collection):
+    now = datetime.now(UTC)
+    collection.insert_many(
+        [
+            {"name": "alpha", "tags": ["a", "b"], "score": 3, "at": now},
+            {"name": "beta", "tags": ["b"], "score": 1, "at": now - timedelta(days=1)},
+            {"name": "gamma", "score": 2, "at": now - timedelta(days=2)},
+        ]
+    )
+
+    assert [doc["name"] for doc in collection.find({"tags": "b"}).sort("score", -1)] == ["alpha", "beta"]
+    assert collection.count_documents({"tags": {"$exists": False}}) == 1
+    assert collection.count_documents({"at": {"$gte": now - timedelta(hours=1)}}) == 1
+    assert collection.count_documents({"$or": [{"score": {"$gt": 2}}, {"name": re.compile("^gam")}]}) == 2
+    assert collection.count_documents({"name": {"$nin": ["alpha", "beta"]}}) == 1
+
+    first = collection.find_one({"name": "alpha"}, {"name": 1, "_id": 0})
+    assert first == {"name": "alpha"}
+    assert [doc["score"] for doc in collection.find().sort([("score", 1)]).skip(1).limit(1)] == [2]
+    assert collection.find_one({"name": "alpha"}, {"tags": {"$slice": 1}, "_id": 0})["tags"] == ["a"]
+    assert collection.find_one({"name": "alpha"}, {"tags": {"$slice": -1}, "score": 1})["tags"] == ["b"]
+    assert collection.count_documents({"tags": {"$type": "string"}}) == 2
+    assert collection.count_documents({"score": {"$type": ["string", "objectId"]}}) == 0
+
+
+def test_updates_upserts_and_unique_index(collection):
+    collection.create_index("email", unique=True, sparse=True)
+    collection.insert_one({"email": "a@example.com", "count": 1, "items": []})
+    collection.insert_one({"note": "no email"})
+    collection.insert_one({"note": "still no email"})
+
+    with pytest.raises(DuplicateKeyError):
+        collection.insert_one({"email": "a@example.com"})
+
+    updated = collection.find_one_and_update(
+        {"email": "a@example.com"},
+        {"$inc": {"count": 2}, "$push": {"items": {"$each": [1, 2, 3], "$slice": -2}}},
+        return_document=ReturnDocument.AFTER,
+    )
+    assert updated["count"] == 3
+    assert updated["items"] == [2, 3]
+
+    result = collection.bulk_write(
+        [
+            UpdateOne({"email": "b@example.com"}, {"$setOnInsert": {"count": 0}}, upsert=True),
+            UpdateOne({"email": "a@example.com"}, {"$max": {"count": 10}}),
+        ]
+    )
+    assert (result.upserted_count, result.modified_count) == (1, 1)
+    assert collection.find_one({"email": "b@example.com"})["count"] == 0
+
+    with pytest.raises(DuplicateKeyError):
+        collection.update_one({"email": "b@example.com"}, {"$set": {"email": "a@example.com"}})
+
+
+def test_group_by_day(collection):
+    day = datetime(2026, 1, 2, 12, tzinfo=UTC)
+    collection.insert_many([{"at": day}, {"at": day}, {"at": day + timedelta(days=1)}])
+
+    rows = list(
+        collection.aggregate(
+            [
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$at"}}, "n": {"$sum": 1}}},
+                {"$sort": {"_id": 1}},
+            ]
+        )
+    )
+    assert rows == [{"_id": "2026-01-02", "n": 2}, {"_id": "2026-01-03", "n": 1}]
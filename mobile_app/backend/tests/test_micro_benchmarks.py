@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from benchmarks.micro_benchmarks import BASELINE_PATH, build_cases, find_regressions, run_cases  # noqa: E402
+
+
+def test_every_case_runs_and_has_a_stored_baseline():
+    cases = build_cases()
+    results = run_cases(cases, repeat=1, scale=0.001)
+    assert set(results) == {case.name for case in cases}
+    assert all(result["best_us"] > 0 for result in results.values())
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    assert set(results) <= set(baseline["cases"])
+
+
+def test_find_regressions_applies_threshold():
+    baseline = {"cases": {"a": {"best_us": 10.0}, "b": {"best_us": 10.0}}}
+    results = {"a": {"best_us": 12.0}, "b": {"best_us": 13.0}, "new": {"best_us": 99.0}}
+    assert find_regressions(results, baseline, threshold=0.25) == [("b", 10.0, 13.0)]
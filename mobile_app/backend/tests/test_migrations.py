@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import sys
+from pathlib import Path
+import uuid
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import DeleteOne
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import MigrationRecord  # noqa: E402
+from data.indexes import get_index_manager  # noqa: E402
+from data.migrations import MigrationLocked, MigrationRunner, renew_lease  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.social_migrations import _normalize_spot_ids, register_social_migrations  # noqa: E402
+from routing.social_routes import get_social_repositories  # noqa: E402
+
+
+def _runner() -> MigrationRunner:
+    repository = MongoRepository(collection_name=f"migrations_{uuid.uuid4().hex[:8]}", model_type=MigrationRecord)
+    return MigrationRunner(repository)
+
+
+def _user(client: TestClient) -> tuple[str, dict[str, str]]:
+    name = f"mig_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def test_runner_applies_in_order_once_and_records_failures():
+    runner = _runner()
+    calls: list[int] = []
+    runner.register(2, "second", lambda batch_size: calls.append(2) or {"rows": batch_size})
+    runner.register(1, "first", lambda batch_size: calls.append(1) or {})
+
+    assert runner.run(target=1, log=lambda _: None) == [1]
+    assert runner.run(batch_size=7, log=lambda _: None) == [2]
+    assert runner.run(log=lambda _: None) == []
+    assert calls == [1, 2]
+    assert runner.records()[2]["counts"] == {"rows": 7}
+
+    def broken(batch_size: int) -> dict[str, int]:
+        raise RuntimeError("boom")
+
+    runner.register(3, "broken", broken)
+    with pytest.raises(RuntimeError):
+        runner.run(log=lambda _: None)
+    assert runner.records()[3]["status"] == "failed"
+    assert [m.version for m in runner.pending()] == [3]
+
+    # A live lease from another runner blocks a second run.
+    runner.repository.collection.update_one(
+        {"_id": 3},
+        {"$set": {"status": "running", "locked_until": datetime(2999, 1, 1, tzinfo=UTC)}},
+    )
+    with pytest.raises(MigrationLocked):
+        runner.run(log=lambda _: None)
+
+
+def test_legacy_string_ids_are_readable_in_compat_mode_and_migrated(monkeypatch):
+    client = TestClient(create_app())
+    owner_id, owner = _user(client)
+    fan_id, fan = _user(client)
+    repos = get_social_repositories()
+    get_index_manager().reconcile()
+
+    now = datetime.now(UTC)
+    spot_hex = str(ObjectId())
+    repos.spots.collection.insert_one(
+        {
+            "_id": spot_hex,
+            "owner_id": owner_id,
+            "title": "Legacy",
+            "lat": 47.0,
+            "lon": 8.0,
+            "visibility": "invite_only",
+            "invite_user_ids": [fan_id],
+            "created_at": now,
+            "updated_at": now,
+        }
+    )
+    repos.favorites.collection.insert_one({"user_id": fan_id, "spot_id": spot_hex, "created_at": now, "updated_at": now})
+    repos.follows.collection.insert_one({"follower_id": fan_id, "followee_id": owner_id, "created_at": now, "updated_at": now})
+
+    # Compat reads see the string rows, and writes do not duplicate them.
+    assert client.post(f"/social/favorites/{spot_hex}", headers=fan).status_code == 200
+    assert client.post(f"/social/follow/{owner_id}", headers=fan).json()["status"] == "following"
+    assert [row["spot_id"] for row in client.get("/social/favorites", headers=fan).json()] == [spot_hex]
+    assert [row["user_id"] for row in client.get(f"/social/followers/{owner_id}", headers=owner).json()] == [fan_id]
+    # A row the unique index cannot see as a duplicate of the legacy one.
+    repos.follows.collection.insert_one(
+        {"follower_id": ObjectId(fan_id), "followee_id": ObjectId(owner_id), "created_at": now, "updated_at": now}
+    )
+
+    runner = _runner()
+    register_social_migrations(runner)
+    assert runner.run(log=lambda _: None) == [1, 2]
+    counts = runner.records()[1]["counts"]
+    assert counts["spots._id"] == 1
+    assert counts["follows.duplicates"] == 1
+
+    spot = repos.spots.collection.find_one({"_id": ObjectId(spot_hex)})
+    assert spot["owner_id"] == ObjectId(owner_id) and spot["invite_user_ids"] == [ObjectId(fan_id)]
+    assert repos.favorites.collection.find_one({"user_id": ObjectId(fan_id)})["spot_id"] == ObjectId(spot_hex)
+    for repository, field in ((repos.spots, "_id"), (repos.favorites, "user_id"), (repos.follows, "follower_id")):
+        assert repository.collection.count_documents({field: {"$type": "string"}}) == 0
+    assert repos.follows.collection.count_documents({"follower_id": ObjectId(fan_id)}) == 1
+    assert repos.follows.collection.count_documents({"pair_key": {"$exists": False}}) == 0
+
+    # Once migrated, single-form lookups find everything.
+    monkeypatch.setenv("ID_STORAGE_MODE", "objectid")
+    assert [row["spot_id"] for row in client.get("/social/favorites", headers=fan).json()] == [spot_hex]
+    assert [row["id"] for row in client.get(f"/social/users/{owner_id}/spots", headers=fan).json()] == [spot_hex]
+    assert client.delete(f"/social/favorites/{spot_hex}", headers=fan).status_code == 200
+    assert client.get("/social/favorites", headers=fan).json() == []
+
+
+def test_steps_renew_the_lease_and_stop_once_it_is_lost():
+    runner = _runner()
+    runner.lease_seconds = 60
+    leases: list[datetime] = []
+
+    def step(batch_size: int) -> dict[str, int]:
+        runner.repository.update_fields({"_id": 1}, {"locked_until": datetime.now(UTC)})
+        renew_lease()
+        leases.append(runner.repository.find_one({"_id": 1})["locked_until"])
+        return {}
+
+    def stolen(batch_size: int) -> dict[str, int]:
+        runner.repository.update_fields({"_id": 2}, {"owner": "other-runner"})
+        renew_lease()
+        return {}
+
+    runner.register(1, "renews", step)
+    runner.register(2, "stolen", stolen)
+    with pytest.raises(MigrationLocked):
+        runner.run(log=lambda _: None)
+    assert (leases[0].replace(tzinfo=UTC) - datetime.now(UTC)).total_seconds() > 30
+    assert runner.records()[1]["status"] == "done"
+    record = runner.records()[2]
+    assert record["status"] == "running" and record["owner"] == "other-runner"
+    renew_lease()  # outside a run it does nothing
+
+
+def test_spot_edited_between_copy_and_delete_keeps_the_edit():
+    repos = get_social_repositories()
+    spot_hex = str(ObjectId())
+    now = datetime.now(UTC)
+    repos.spots.collection.insert_one({"_id": spot_hex, "title": "Before", "lat": 47.0, "lon": 8.0, "updated_at": now})
+    collection = repos.spots.collection
+    original_bulk_write = collection.bulk_write
+
+    def edit_before_first_delete(requests, *args, **kwargs):
+        if isinstance(requests[0], DeleteOne) and not getattr(edit_before_first_delete, "done", False):
+            edit_before_first_delete.done = True
+            collection.update_one({"_id": spot_hex}, {"$set": {"title": "After", "updated_at": now + timedelta(seconds=1)}})
+        return original_bulk_write(requests, *args, **kwargs)
+
+    collection.bulk_write = edit_before_first_delete
+    try:
+        assert _normalize_spot_ids(repos.spots, 10)["spots._id"] >= 1
+    finally:
+        del collection.bulk_write
+    assert collection.find_one({"_id": spot_hex}) is None
+    assert collection.find_one({"_id": ObjectId(spot_hex)})["title"] == "After"
+    collection.delete_one({"_id": ObjectId(spot_hex)})
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.mongo_metrics import MongoCommandMetrics  # noqa: E402
+from data.prometheus import Histogram  # noqa: E402
+from routing.middleware import MongoCommandScopeMiddleware  # noqa: E402
+
+
+def _event(request_id: int, reply: dict | None = None) -> SimpleNamespace:
+    return SimpleNamespace(
+        request_id=request_id,
+        connection_id=("localhost", 27017),
+        command_name="find",
+        command={"find": "spots", "filter": {}},
+        database_name="db",
+        duration_micros=2500,
+        reply=reply or {"cursor": {"firstBatch": [{"_id": 1}, {"_id": 2}]}, "ok": 1},
+    )
+
+
+def test_histogram_renders_cumulative_buckets_and_estimates_quantiles() -> None:
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render()
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/x"} 4' in lines
+    assert histogram.snapshot()[("/x",)].quantile(0.5) == 0.1
+
+
+def test_commands_are_attributed_to_the_route_template_inside_threadpool(monkeypatch) -> None:
+    metrics = MongoCommandMetrics(slow_command_ms=1.0)
+    metrics.reset()
+
+    app = FastAPI()
+    app.add_middleware(MongoCommandScopeMiddleware)
+
+    @app.get("/spots/{spot_id}")
+    def read_spot(spot_id: str):
+        for request_id in (1, 2):
+            event = _event(request_id)
+            metrics.started(event)
+            metrics.succeeded(event)
+        return {"id": spot_id}
+
+    monkeypatch.setattr("routing.middleware.get_mongo_command_metrics", lambda: metrics)
+    assert TestClient(app).get("/spots/abc").status_code == 200
+
+    route = metrics.snapshot()["routes"]["GET /spots/{spot_id}"]
+    assert route["requests"] == 1
+    assert route["commands_per_request"]["mean"] == 2
+    assert route["commands"]["find"]["count"] == 2
+    assert route["commands"]["find"]["documents"] == 4
+    assert route["commands"]["find"]["collections"] == {"spots": 2}
+    assert metrics.recent_slow_commands()[0]["route"] == "GET /spots/{spot_id}"
+
+
+def test_reply_bytes_are_only_counted_when_enabled() -> None:
+    sizes = {}
+    for enabled in (False, True):
+        metrics = MongoCommandMetrics(reply_bytes=enabled)
+        metrics.reset()
+        event = _event(1)
+        metrics.started(event)
+        metrics.succeeded(event)
+        sizes[enabled] = sum(metrics.reply_bytes.values().values())
+    assert sizes[False] == 0 and sizes[True] > 0
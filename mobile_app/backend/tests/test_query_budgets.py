@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.mongo_metrics import get_mongo_command_metrics  # noqa: E402
+from data.storage import storage_backend  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.auth_routes import get_auth_user_repository, token_extension  # noqa: E402
+from routing.social_graph import get_social_graph_cache  # noqa: E402
+from routing.social_routes import _pair_keys_backfilled, get_social_repositories  # noqa: E402
+
+
+def _storage_available() -> bool:
+    from pymongo import MongoClient
+
+    if storage_backend() == "memory":
+        return True
+    try:
+        client = MongoClient(os.getenv("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=300)
+        client.admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _storage_available(), reason="query budgets need a Mongo server")
+
+
+@contextmanager
+def query_budget(max_commands: int) -> Iterator[None]:
+    """Fail if the request made inside the block issues more than `max_commands` Mongo commands."""
+    with get_mongo_command_metrics().capture_requests() as requests:
+        yield
+    assert requests, "no request was recorded"
+    route, commands = requests[-1]
+    assert commands <= max_commands, f"{route} issued {commands} Mongo commands, budget is {max_commands}"
+
+
+def _insert_user(name: str) -> str:
+    return get_auth_user_repository().insert_one(
+        {
+            "username": name,
+            "email": f"{name}@example.com",
+            "display_name": name,
+            "password_hash": "unused",
+            "follow_requires_approval": False,
+            "created_at": datetime.now(UTC),
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def world():
+    suffix = uuid.uuid4().hex[:8]
+    viewer_id = _insert_user(f"viewer_{suffix}")
+    friend_id = _insert_user(f"friend_{suffix}")
+    blocked_id = _insert_user(f"blocked_{suffix}")
+    repos = get_social_repositories()
+
+    now = datetime.now(UTC)
+    visibilities = ["public", "following", "invite_only", "personal"]
+    owners = [friend_id, blocked_id, viewer_id]
+    spots = [
+        {
+            "owner_id": owners[i % len(owners)],
+            "title": f"spot {i}",
+            "lat": 47.0 + i / 1000,
+            "lon": 8.0 + i / 1000,
+            "visibility": visibilities[i % len(visibilities)],
+            "invite_user_ids": [viewer_id] if i % 8 == 2 else [],
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(240)
+    ]
+    spot_ids = repos.spots.insert_many(spots)
+    repos.follows.insert_many(
+        [
+            {"follower_id": viewer_id, "followee_id": friend_id, "created_at": now},
+            {"follower_id": friend_id, "followee_id": viewer_id, "created_at": now},
+            {"follower_id": blocked_id, "followee_id": friend_id, "created_at": now},
+        ]
+    )
+    # Written before pair keys, like rows the pair_keys migration has not reached yet.
+    repos.blocks.insert_one({"blocker_id": viewer_id, "blocked_id": blocked_id, "created_at": now})
+    _pair_keys_backfilled()  # cached; its lookup would count against the first budget
+    repos.favorites.insert_many(
+        [{"user_id": viewer_id, "spot_id": sid, "created_at": now} for sid in spot_ids[:150]]
+    )
+
+    token = token_extension.issue_access_token(user_id=viewer_id, username=f"viewer_{suffix}")
+    client = TestClient(create_app(), headers={"Authorization": f"Bearer {token}"})
+    return {"client": client, "viewer_id": viewer_id, "friend_id": friend_id, "blocked_id": blocked_id, "suffix": suffix}
+
+
+@pytest.mark.parametrize("limit", [5, 200, 1500])
+def test_visible_spots_budget_is_independent_of_page_size(world, limit) -> None:
+    with query_budget(4):
+        response = world["client"].get("/social/spots", params={"limit": limit})
+    assert response.status_code == 200
+    assert all(spot["owner_id"] != "" for spot in response.json())
+
+
+@pytest.mark.parametrize(
+    ("path", "budget"),
+    [
+        ("/social/users/{friend_id}/spots", 5),
+        ("/social/favorites", 5),
+        ("/social/favorites?expand=spot&images=thumbnail", 5),
+        ("/social/followers/{friend_id}", 6),
+        ("/social/following/{friend_id}", 6),
+        ("/social/users/search?q={suffix}", 3),
+        ("/social/users?ids={friend_id},{viewer_id}", 3),
+        ("/social/follow/requests", 2),
+        ("/social/blocked", 2),
+        ("/social/spots/tiles/2/2/1", 3),
+        ("/social/spots/tiles/2/2/1/private", 4),
+    ],
+)
+def test_social_list_endpoints_stay_within_query_budget(world, path, budget) -> None:
+    url = path.format(friend_id=world["friend_id"], viewer_id=world["viewer_id"], suffix=world["suffix"])
+    with query_budget(budget):
+        response = world["client"].get(url)
+    assert response.status_code == 200, response.text
+
+
+def test_batch_user_lookup_keeps_request_order_and_hides_blocked_users(world) -> None:
+    ids = [world["blocked_id"], world["friend_id"], "not-an-id", world["viewer_id"], world["friend_id"]]
+    # Cold cache: one pair_key lookup. Then the block set cached by the profile check.
+    get_social_graph_cache().clear()
+    for warm_up in (None, f"/social/users/{world['friend_id']}/profile"):
+        if warm_up:
+            world["client"].get(warm_up)
+        response = world["client"].get("/social/users", params={"ids": ",".join(ids)})
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [world["friend_id"], world["viewer_id"]]
+
+    too_many = ",".join(str(uuid.uuid4().hex[:24]) for _ in range(201))
+    assert world["client"].get("/social/users", params={"ids": too_many}).status_code == 400
+
+
+def test_favorites_expand_embeds_spots_with_the_requested_images(world) -> None:
+    client = world["client"]
+    payload = {"title": "With images", "lat": 47.0, "lon": 8.0, "images": ["a", "b", "c"]}
+    spot_id = client.post("/social/spots", json=payload).json()["id"]
+    client.post(f"/social/favorites/{spot_id}")
+
+    def favorite(**params) -> dict:
+        rows = client.get("/social/favorites", params=params).json()
+        return next(row for row in rows if row["spot_id"] == spot_id)
+
+    assert "spot" not in favorite()
+    assert favorite(expand="spot")["spot"]["images"] == ["a", "b", "c"]
+    assert favorite(expand="spot", images="thumbnail")["spot"]["images"] == ["a"]
+    expanded = favorite(expand="spot", images="none")["spot"]
+    assert (expanded["id"], expanded["title"], expanded["images"]) == (spot_id, "With images", [])
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import RateLimitBucketRecord  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from main import create_app  # noqa: E402
+from routing import rate_limit  # noqa: E402
+from routing.rate_limit import (  # noqa: E402
+    MemoryRateLimitBackend,
+    RateLimitContention,
+    RateLimiter,
+    RateLimitRule,
+    StorageRateLimitBackend,
+    parse_rules,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _storage_backend(clock: _Clock) -> StorageRateLimitBackend:
+    repository = MongoRepository("rate_limits_test", RateLimitBucketRecord, db_name="SpotOnSightAuth")
+    repository.delete_many({})
+    return StorageRateLimitBackend(repository, clock=clock)
+
+
+@pytest.mark.parametrize("make_backend", [lambda clock: MemoryRateLimitBackend(clock=clock), _storage_backend])
+def test_bucket_allows_bursts_then_refills(make_backend):
+    clock = _Clock()
+    backend = make_backend(clock)
+    rule = RateLimitRule(3, 30)
+
+    assert [backend.take("k", rule) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.take("k", rule) == pytest.approx(10.0)
+    assert backend.take("other", rule) == 0.0
+
+    clock.now += 10
+    assert backend.take("k", rule) == 0.0
+    assert backend.take("k", rule) > 0
+
+
+def test_storage_backend_retries_when_another_process_updated_the_bucket():
+    clock = _Clock()
+    backend = _storage_backend(clock)
+    rule = RateLimitRule(5, 60)
+    backend.take("k", rule)
+    backend.take("spots.list:user:k", rule)
+
+    collection = backend.repository.collection
+    original_find_one = collection.find_one
+    raced = []
+
+    def find_one_then_race(*args, **kwargs):
+        doc = original_find_one(*args, **kwargs)
+        if not raced:
+            raced.append(True)
+            collection.update_one({"_id": "k"}, {"$inc": {"tokens": -1}})
+        return doc
+
+    collection.find_one = find_one_then_race
+    try:
+        assert backend.take("k", rule) == 0.0
+    finally:
+        del collection.find_one
+    assert collection.find_one({"_id": "k"})["tokens"] == pytest.approx(2.0)
+
+
+def test_memory_backend_evicts_the_least_recently_used_bucket():
+    clock = _Clock()
+    backend = MemoryRateLimitBackend(max_keys=2, clock=clock)
+    rule = RateLimitRule(1, 60)
+
+    backend.take("a", rule)
+    backend.take("b", rule)
+    assert backend.take("a", rule) > 0  # touches "a", so "b" is the oldest
+    backend.take("c", rule)
+    assert list(backend._buckets) == ["a", "c"]
+    assert backend.take("b", rule) == 0.0
+
+
+def test_storage_contention_is_counted_and_fails_open():
+    clock = _Clock()
+    backend = _storage_backend(clock)
+    backend.max_attempts = 2
+    rule = RateLimitRule(5, 60)
+    backend.take("k", rule)
+    backend.take("spots.list:user:k", rule)
+
+    collection = backend.repository.collection
+    original_find_one = collection.find_one
+
+    def find_one_then_race(*args, **kwargs):
+        doc = original_find_one(*args, **kwargs)
+        if doc is not None:
+            collection.update_one({"_id": doc["_id"]}, {"$inc": {"tokens": -0.001}})
+        return doc
+
+    collection.find_one = find_one_then_race
+    try:
+        with pytest.raises(RateLimitContention):
+            backend.take("k", rule)
+        limiter = RateLimiter(backend, {"spots.list": {"user": rule}})
+        errors = limiter.backend_errors.values().get(("spots.list",), 0)
+        assert limiter.check("spots.list", {"user": "k"}) == 0.0
+        assert limiter.backend_errors.values()[("spots.list",)] == errors + 1
+    finally:
+        del collection.find_one
+
+
+def test_rejected_user_does_not_drain_the_shared_ip_bucket():
+    backend = MemoryRateLimitBackend(clock=_Clock())
+    limiter = RateLimiter(backend, {"spots.list": {"ip": RateLimitRule(3, 60), "user": RateLimitRule(1, 60)}})
+
+    assert limiter.check("spots.list", {"user": "a", "ip": "1.2.3.4"}) == 0.0
+    for _ in range(5):
+        assert limiter.check("spots.list", {"user": "a", "ip": "1.2.3.4"}) > 0
+    assert limiter.check("spots.list", {"user": "b", "ip": "1.2.3.4"}) == 0.0
+
+
+def test_parse_rules_overrides_and_disables():
+    rules = parse_rules("auth.login:ip=20/60, spots.list:user=off")
+    assert rules["auth.login"]["ip"] == RateLimitRule(20, 60)
+    assert "user" not in rules["spots.list"]
+    with pytest.raises(ValueError):
+        parse_rules("auth.login=5/60")
+
+
+def test_login_returns_429_with_retry_after(monkeypatch):
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"auth.login": {"ip": RateLimitRule(2, 60)}})
+    monkeypatch.setattr(rate_limit, "_RATE_LIMITER", limiter)
+    client = TestClient(create_app())
+
+    statuses = [client.post("/auth/login", json={}).status_code for _ in range(3)]
+    assert statuses == [422, 422, 429]
+
+    response = client.post("/auth/login", json={})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    assert limiter.rejections.values()[("auth.login", "ip")] >= 2
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from routing.middleware import RequestMetricsMiddleware, ThreadpoolProbe, get_http_metrics  # noqa: E402
+
+
+def test_request_metrics_use_route_template_status_and_body_sizes() -> None:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.post("/echo/{item_id}")
+    async def echo(item_id: str, payload: dict):
+        return {"id": item_id, **payload}
+
+    metrics = get_http_metrics()
+    metrics.duration.clear()
+    response = TestClient(app).post("/echo/42", json={"a": 1})
+
+    assert response.status_code == 200
+    assert metrics.duration.snapshot()[("POST", "/echo/{item_id}", "200")].count == 1
+    assert metrics.response_size.snapshot()[("POST", "/echo/{item_id}", "200")].sum == len(response.content)
+    assert metrics.latency_summary()["routes"][0]["route"] == "/echo/{item_id}"
+
+
+def test_threadpool_probe_records_wait() -> None:
+    import anyio
+
+    probe = ThreadpoolProbe()
+    waited = anyio.run(probe.sample)
+
+    assert waited >= 0.0
+    assert probe.capacity.values()[()] > 0
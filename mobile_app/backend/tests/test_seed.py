@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.ids import refs_filter  # noqa: E402
+from routing.social_routes import get_social_repositories  # noqa: E402
+from seed import SeedConfig, parse_args, seed_dataset  # noqa: E402
+
+
+def test_seed_dataset_respects_graph_invariants():
+    summary = seed_dataset(
+        SeedConfig(users=60, avg_follows=10, avg_favorites=4, image_bytes=0, prefix="seedtest", create_indexes=False),
+        log=lambda _: None,
+    )
+    counts = summary["counts"]
+    assert counts["users"] == 60
+    assert counts["follows"] > 0 and counts["spots"] > 0
+    assert summary["duplicates"] == 0
+
+    repos = get_social_repositories()
+    user_ids = {str(doc["_id"]) for doc in repos.users.collection.find({"username": {"$regex": "^seedtest"}}, {"_id": 1})}
+    follows = [
+        (row["follower_id"], row["followee_id"])
+        for row in repos.follows.collection.find({"follower_id": refs_filter(user_ids)})
+    ]
+    blocks = {
+        (row["blocker_id"], row["blocked_id"])
+        for row in repos.blocks.collection.find({"blocker_id": refs_filter(user_ids)})
+    }
+    assert follows
+    assert len(follows) == len(set(follows))
+    assert all(follower != followee for follower, followee in follows)
+    assert not any((a, b) in blocks or (b, a) in blocks for a, b in follows)
+
+
+def test_parse_args_visibility_weights():
+    config = parse_args(["--users", "5", "--visibility", "public=1,personal=3", "--skip-indexes"])
+    assert config.users == 5
+    assert config.visibility == {"public": 1.0, "personal": 3.0}
+    assert config.create_indexes is False
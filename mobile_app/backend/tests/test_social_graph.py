@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+import sys
+from pathlib import Path
+import uuid
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import CacheInvalidationRecord  # noqa: E402
+from data.ids import pair_key, ref_filter, stored_ref  # noqa: E402
+from data.job_queue import get_job_queue  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.cache_relay import CacheInvalidationRelay  # noqa: E402
+from routing.social_graph import SocialGraphCache, get_social_graph_cache  # noqa: E402
+from routing.social_routes import _blocked_ids_among, _followee_ids, _is_following, get_social_repositories  # noqa: E402
+
+
+def _user(client: TestClient, **profile) -> tuple[str, dict[str, str]]:
+    name = f"graph_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    headers = {"Authorization": f"Bearer {body['access_token']}"}
+    if profile:
+        client.put("/social/me", json=profile, headers=headers)
+    return body["user"]["id"], headers
+
+
+def test_cache_evicts_least_recently_used_and_drops_fills_raced_by_invalidation():
+    cache = SocialGraphCache(max_entries=2, ttl_seconds=60)
+    loads: list[str] = []
+
+    def loader(user_id: str, ids: list[str]):
+        return lambda: loads.append(user_id) or ids
+
+    assert cache.get("following", "a", loader("a", ["x"])) == {"x"}
+    cache.get("following", "b", loader("b", []))
+    cache.get("following", "a", loader("a", ["x"]))
+    cache.get("blocked", "c", loader("c", []))
+    cache.get("following", "b", loader("b", []))
+    assert loads == ["a", "b", "c", "b"]
+
+    def racing(user_id: str):
+        def load() -> list[str]:
+            cache.invalidate(user_id)
+            return ["y"]
+        return load
+
+    assert cache.get("following", "d", racing("d")) == {"y"}
+    cache.get("following", "d", loader("d", ["y"]))
+    assert loads[-1] == "d"
+
+    # Invalidating some other user mid-load does not cost this fill its cache entry.
+    cache.get("following", "e", racing("other"))
+    cache.get("following", "e", loader("e", ["y"]))
+    assert loads[-1] == "d"
+
+
+def test_follow_and_block_routes_invalidate_private_profile_access():
+    client = TestClient(create_app())
+    private_id, private = _user(client, follow_requires_approval=True)
+    fan_id, fan = _user(client)
+    profile = f"/social/users/{private_id}/favorites"
+
+    assert client.get(profile, headers=fan).status_code == 403
+    client.post(f"/social/follow/{private_id}", headers=fan)
+    client.post(f"/social/follow/requests/{fan_id}/approve", headers=private)
+    assert client.get(profile, headers=fan).status_code == 200
+
+    client.post(f"/social/block/{fan_id}", headers=private)
+    assert client.get(profile, headers=fan).status_code == 403
+    client.delete(f"/social/block/{fan_id}", headers=private)
+    assert client.get(profile, headers=fan).status_code == 200
+
+    client.delete(f"/social/followers/{fan_id}", headers=private)
+    assert client.get(profile, headers=fan).status_code == 403
+
+
+def test_block_cascade_removes_edges_in_both_directions_by_pair_key():
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, b = _user(client, follow_requires_approval=True)
+    client.post(f"/social/follow/{a_id}", headers=b)
+    client.post(f"/social/follow/{b_id}", headers=a)
+    repos = get_social_repositories()
+    key = pair_key(a_id, b_id)
+    assert repos.follows.count_documents({"pair_key": key}) == 1
+    assert repos.follow_requests.count_documents({"pair_key": key}) == 1
+
+    client.post(f"/social/block/{b_id}", headers=a)
+    get_job_queue().drain()
+    assert repos.blocks.count_documents({"pair_key": key}) == 1
+    assert repos.follows.count_documents({"pair_key": key}) == 0
+    assert repos.follow_requests.count_documents({"pair_key": key}) == 0
+
+
+def test_rows_without_pair_key_are_found_until_the_backfill_is_done():
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, b = _user(client)
+    c_id, c = _user(client)
+    repos = get_social_repositories()
+    now = datetime.now(UTC)
+    # Written before pair keys existed.
+    repos.blocks.insert_one({"blocker_id": stored_ref(b_id), "blocked_id": stored_ref(a_id), "created_at": now})
+    repos.follows.insert_one({"follower_id": stored_ref(a_id), "followee_id": stored_ref(c_id), "created_at": now})
+    repos.blocks.insert_one({"blocker_id": stored_ref(c_id), "blocked_id": stored_ref(a_id), "created_at": now})
+
+    get_social_graph_cache().clear()
+    assert _blocked_ids_among(repos, a_id, [b_id, c_id]) == {b_id, c_id}
+    visible = client.get("/social/users", params={"ids": f"{b_id},{c_id},{a_id}"}, headers=a).json()
+    assert [user["id"] for user in visible] == [a_id]
+
+    get_job_queue().enqueue("social.block_cascade", {"blocker_id": c_id, "blocked_id": a_id})
+    get_job_queue().drain()
+    assert repos.follows.count_documents({"follower_id": ref_filter(a_id), "followee_id": ref_filter(c_id)}) == 0
+
+
+def test_relay_applies_invalidations_from_other_workers():
+    repository = MongoRepository(collection_name=f"cache_invalidations_{uuid.uuid4().hex[:8]}", model_type=CacheInvalidationRecord)
+    first, second = SocialGraphCache(100, 60), SocialGraphCache(100, 60)
+    first_relay = CacheInvalidationRelay(repository)
+    second_relay = CacheInvalidationRelay(repository)
+    first.add_listener(first_relay.subscribe("graph", lambda keys: first.invalidate(*keys, broadcast=False)))
+    second_relay.subscribe("graph", lambda keys: second.invalidate(*keys, broadcast=False))
+
+    second.get("following", "u1", lambda: ["old"])
+    first.invalidate("u1")
+    assert first_relay.poll_once() == 0
+    assert second_relay.poll_once() == 1
+    assert second.get("following", "u1", lambda: ["new"]) == {"new"}
+
+
+def test_writes_see_a_block_this_worker_has_not_heard_about():
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, b = _user(client)
+    c_id, c = _user(client, follow_requires_approval=True)
+    spot_id = client.post("/social/spots", json={"title": "Lake", "lat": 47.0, "lon": 8.0}, headers=b).json()["id"]
+    client.post(f"/social/follow/{c_id}", headers=a)
+    repos = get_social_repositories()
+    # Warm this worker's block sets, then block through storage only, as another worker
+    # would without the invalidation relay.
+    for user_id, headers in ((a_id, a), (c_id, c)):
+        client.get("/social/blocked", headers=headers)
+    now = datetime.now(UTC)
+    for blocker_id, blocked_id in ((b_id, a_id), (c_id, a_id)):
+        repos.blocks.insert_one(
+            {"blocker_id": stored_ref(blocker_id), "blocked_id": stored_ref(blocked_id), "pair_key": pair_key(blocker_id, blocked_id), "created_at": now}
+        )
+
+    assert client.post(f"/social/follow/{b_id}", headers=a).status_code == 403
+    assert client.post(f"/social/favorites/{spot_id}", headers=a).status_code == 403
+    assert client.post(f"/social/follow/requests/{a_id}/approve", headers=c).status_code == 403
+    assert repos.follows.count_documents({"follower_id": ref_filter(a_id)}) == 0
+
+
+def test_follow_writes_the_edge_even_when_this_worker_thinks_it_exists():
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, _ = _user(client)
+    repos = get_social_repositories()
+    client.post(f"/social/follow/{b_id}", headers=a)
+    assert b_id in _followee_ids(repos, a_id)
+    # Unfollowed on another worker: storage has no edge, this worker's cache still does.
+    repos.follows.delete_many({"follower_id": ref_filter(a_id)})
+
+    assert client.post(f"/social/follow/{b_id}", headers=a).json()["status"] == "following"
+    assert repos.follows.count_documents({"follower_id": ref_filter(a_id), "followee_id": ref_filter(b_id)}) == 1
+
+
+def test_pair_check_does_not_load_the_whole_followee_set():
+    client = TestClient(create_app())
+    a_id, a = _user(client)
+    b_id, _ = _user(client)
+    client.post(f"/social/follow/{b_id}", headers=a)
+    cache = get_social_graph_cache()
+    cache.invalidate(a_id)
+
+    assert _is_following(get_social_repositories(), a_id, b_id)
+    assert cache.peek("following", a_id) is None
+
+
+def test_visible_spot_list_is_filtered_before_the_limit():
+    client = TestClient(create_app())
+    _, viewer = _user(client)
+    _, owner = _user(client)
+    public_id = client.post("/social/spots", json={"title": "Lake", "lat": 47.0, "lon": 8.0}, headers=owner).json()["id"]
+    for n in range(3):
+        client.post("/social/spots", json={"title": f"Mine {n}", "lat": 47.0, "lon": 8.0, "visibility": "personal"}, headers=owner)
+
+    spots = client.get("/social/spots", params={"limit": 3}, headers=viewer).json()
+    assert spots and spots[0]["id"] == public_id
@@ -1,16 +1,74 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
+import uuid
+
 from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import pytest
+
+from main import create_app
+from routing.auth_routes import get_auth_user_repository
+from routing.social_routes import _cursor_query, _encode_cursor, _spot_lookup_query, get_social_repositories
+
 
-from routing.social_routes import _spot_lookup_query
+def _admin_headers(client: TestClient) -> dict[str, str]:
+    name = f"admin_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    get_auth_user_repository().update_fields({"_id": ObjectId(body["user"]["id"])}, {"is_admin": True})
+    return {"Authorization": f"Bearer {body['access_token']}"}
 
 
 def test_spot_lookup_query_supports_objectid_and_legacy_string_ids() -> None:
     oid_text = str(ObjectId())
-    oid_query = _spot_lookup_query(oid_text)
-    assert "$or" in oid_query
-    assert {"_id": oid_text} in oid_query["$or"]
-    assert any(isinstance(entry.get("_id"), ObjectId) for entry in oid_query["$or"])
+    assert _spot_lookup_query(oid_text) == {"_id": {"$in": [ObjectId(oid_text), oid_text]}}
 
     legacy_query = _spot_lookup_query("legacy-spot-1")
     assert legacy_query == {"_id": "legacy-spot-1"}
+
+
+def test_ticket_cursor_round_trips_into_a_keyset_query() -> None:
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 250000)
+    oid = ObjectId()
+    query = _cursor_query(_encode_cursor(created_at, oid))
+    assert query == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+            {"created_at": None},
+        ]
+    }
+
+
+def test_ticket_pages_continue_past_rows_without_created_at() -> None:
+    client = TestClient(create_app())
+    repos = get_social_repositories()
+    marker = f"cursor-{uuid.uuid4().hex[:8]}"
+    now = datetime.now(UTC)
+    repos.support_tickets.insert_many(
+        [{"user_id": marker, "subject": "dated", "status": "open", "created_at": now}]
+        + [{"user_id": marker, "subject": f"undated {n}", "status": "open"} for n in range(3)]
+    )
+    admin = _admin_headers(client)
+
+    subjects: list[str] = []
+    cursor = None
+    for _ in range(5):
+        params = {"user_id": marker, "limit": "1", **({"cursor": cursor} if cursor else {})}
+        page = client.get("/social/support/tickets/admin/all", params=params, headers=admin)
+        assert page.status_code == 200
+        subjects += [item["subject"] for item in page.json()["items"]]
+        cursor = page.json()["next_cursor"]
+        if not cursor:
+            break
+    assert subjects == ["dated", "undated 2", "undated 1", "undated 0"]
+
+
+def test_cursor_query_rejects_garbage() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        _cursor_query("not-a-cursor")
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import uuid
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import create_app  # noqa: E402
+
+
+def _user(client: TestClient) -> tuple[str, dict[str, str]]:
+    name = f"sync_{uuid.uuid4().hex[:10]}"
+    body = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def _spot(client: TestClient, headers: dict[str, str], visibility: str = "public") -> str:
+    payload = {"title": "Sync spot", "lat": 47.0, "lon": 8.0, "visibility": visibility}
+    return client.post("/social/spots", json=payload, headers=headers).json()["id"]
+
+
+def _sync_all(client: TestClient, headers: dict[str, str], since: str | None = None, limit: int = 500) -> tuple[list[dict], str]:
+    changes: list[dict] = []
+    params: dict[str, object] = {"limit": limit}
+    if since:
+        params["since"] = since
+    while True:
+        page = client.get("/social/sync", params=params, headers=headers).json()
+        changes.extend(page["changes"])
+        if not page["next_cursor"]:
+            return changes, page["sync_token"]
+        params["cursor"] = page["next_cursor"]
+
+
+def _ops(changes: list[dict], kind: str, entity_id: str) -> list[str]:
+    return [change["op"] for change in changes if change["kind"] == kind and change["id"] == entity_id]
+
+
+def test_first_sync_pages_through_visible_rows():
+    client = TestClient(create_app())
+    _, owner = _user(client)
+    viewer_id, viewer = _user(client)
+    public_ids = [_spot(client, owner) for _ in range(3)]
+    private_id = _spot(client, owner, visibility="personal")
+    client.post(f"/social/favorites/{public_ids[0]}", headers=viewer)
+
+    changes, token = _sync_all(client, viewer, limit=2)
+
+    for spot_id in public_ids:
+        assert _ops(changes, "spot", spot_id) == ["upsert"]
+    assert _ops(changes, "spot", private_id) == []
+    assert _ops(changes, "favorite", public_ids[0]) == ["upsert"]
+    assert token
+
+
+def test_delta_sync_reports_updates_and_deletions():
+    client = TestClient(create_app())
+    owner_id, owner = _user(client)
+    viewer_id, viewer = _user(client)
+    kept = _spot(client, owner)
+    hidden = _spot(client, owner)
+    deleted = _spot(client, owner)
+    client.post(f"/social/favorites/{kept}", headers=viewer)
+    client.post(f"/social/follow/{owner_id}", headers=viewer)
+    _, token = _sync_all(client, viewer)
+
+    client.put(
+        f"/social/spots/{hidden}",
+        json={"title": "Now private", "lat": 47.0, "lon": 8.0, "visibility": "personal"},
+        headers=owner,
+    )
+    client.delete(f"/social/spots/{deleted}", headers=owner)
+    client.delete(f"/social/favorites/{kept}", headers=viewer)
+    client.delete(f"/social/follow/{owner_id}", headers=viewer)
+
+    changes, _ = _sync_all(client, viewer, since=token)
+
+    assert _ops(changes, "spot", hidden)[-1] == "delete"
+    assert _ops(changes, "spot", deleted)[-1] == "delete"
+    assert _ops(changes, "favorite", kept)[-1] == "delete"
+    assert _ops(changes, "follow", f"{viewer_id}:{owner_id}")[-1] == "delete"
+
+
+def test_stale_since_requires_a_full_resync():
+    client = TestClient(create_app())
+    _, viewer = _user(client)
+    page = client.get("/social/sync", params={"since": "2000-01-01T00:00:00Z"}, headers=viewer).json()
+    assert page["full_resync"] is True
+    assert page["changes"] == []
+
+
+def test_deleted_private_spots_only_reach_viewers_who_could_see_them():
+    client = TestClient(create_app())
+    owner_id, owner = _user(client)
+    follower_id, follower = _user(client)
+    invitee_id, invitee = _user(client)
+    _, stranger = _user(client)
+    client.post(f"/social/follow/{owner_id}", headers=follower)
+    personal = _spot(client, owner, visibility="personal")
+    following = _spot(client, owner, visibility="following")
+    invited = client.post(
+        "/social/spots",
+        json={"title": "Invite", "lat": 47.0, "lon": 8.0, "visibility": "invite_only", "invite_user_ids": [invitee_id]},
+        headers=owner,
+    ).json()["id"]
+    public = _spot(client, owner)
+    tokens = {name: _sync_all(client, headers)[1] for name, headers in (("follower", follower), ("invitee", invitee), ("stranger", stranger))}
+
+    for spot_id in (personal, following, invited, public):
+        client.delete(f"/social/spots/{spot_id}", headers=owner)
+
+    spot_ids = {personal, following, invited, public}
+    deleted = {
+        name: {
+            change["id"]
+            for change in _sync_all(client, headers, since=tokens[name])[0]
+            if change["kind"] == "spot" and change["op"] == "delete" and change["id"] in spot_ids
+        }
+        for name, headers in (("follower", follower), ("invitee", invitee), ("stranger", stranger))
+    }
+    assert deleted["follower"] == {following, public}
+    assert deleted["invitee"] == {invited, public}
+    assert deleted["stranger"] == {public}
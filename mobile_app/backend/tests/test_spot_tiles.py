@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+import uuid
+
+from fastapi.testclient import TestClient
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from data.dto import CacheInvalidationRecord  # noqa: E402
+from data.mongo_repository import MongoRepository  # noqa: E402
+from main import create_app  # noqa: E402
+from routing.cache_relay import CacheInvalidationRelay  # noqa: E402
+from routing.spot_tiles import (  # noqa: E402
+    SpotTileCache,
+    encode_tile,
+    get_spot_tile_cache,
+    is_valid_tile,
+    parse_tile_key,
+    tile_for_point,
+    tile_key_text,
+    tile_spot_query,
+    without_owners,
+)
+
+
+def _matches(query: dict, lat: float, lon: float) -> bool:
+    ops = {"$gte": lambda a, b: a >= b, "$gt": lambda a, b: a > b, "$lt": lambda a, b: a < b, "$lte": lambda a, b: a <= b}
+    values = {"lat": lat, "lon": lon}
+    return all(ops[op](values[field], bound) for field, cond in query.items() for op, bound in cond.items())
+
+
+def test_tile_for_point_matches_known_tile() -> None:
+    # Zurich at zoom 10
+    assert tile_for_point(47.3769, 8.5417, 10) == (10, 536, 358)
+    assert tile_for_point(0.0, 0.0, 0) == (0, 0, 0)
+
+
+def test_tile_query_selects_exactly_the_points_of_the_tile() -> None:
+    points = [(47.3769, 8.5417), (89.9, 179.99), (-89.9, -180.0), (0.0, 180.0), (12.5, -3.25)]
+    for z in (0, 1, 5, 12):
+        for lat, lon in points:
+            key = tile_for_point(lat, lon, z)
+            assert _matches(tile_spot_query(*key), lat, lon)
+            neighbour = (z, (key[1] + 1) % (1 << z), key[2])
+            if neighbour != key:
+                assert not _matches(tile_spot_query(*neighbour), lat, lon)
+
+
+def test_is_valid_tile_rejects_out_of_range_coordinates() -> None:
+    assert is_valid_tile(3, 7, 7)
+    assert not is_valid_tile(3, 8, 0)
+    assert not is_valid_tile(-1, 0, 0)
+    assert not is_valid_tile(23, 0, 0)
+
+
+def test_encoded_tile_is_compact_and_filterable_by_owner() -> None:
+    key = (4, 8, 5)
+    entry = encode_tile(key, [["s1", "u1", "A", 1.0, 2.0, [], 0, 0], ["s2", "u2", "B", 1.0, 2.0, [], 1, 0]])
+    payload = json.loads(entry.body)
+    assert payload["fields"][0] == "id"
+    assert [row[0] for row in payload["spots"]] == ["s1", "s2"]
+
+    filtered = without_owners(entry, key, {"u2"})
+    assert [row[0] for row in json.loads(filtered.body)["spots"]] == ["s1"]
+    assert filtered.etag != entry.etag
+    assert without_owners(entry, key, {"u3"}) is entry
+
+
+def test_cache_spills_evicted_tiles_and_invalidates_touched_tiles(tmp_path) -> None:
+    cache = SpotTileCache(max_entries=1, spill_dir=tmp_path, ttl_seconds=60)
+    zurich = tile_for_point(47.3769, 8.5417, 10)
+    tokyo = tile_for_point(35.68, 139.69, 10)
+    cache.put(zurich, encode_tile(zurich, [["s1", "u1", "A", 47.3769, 8.5417, [], 0, 0]]))
+    cache.put(tokyo, encode_tile(tokyo, []))
+
+    spilled = cache.get(zurich)
+    assert spilled is not None
+    assert spilled.rows[0][0] == "s1"
+
+    cache.invalidate_point(47.3769, 8.5417)
+    assert cache.get(zurich) is None
+    assert cache.get(tokyo) is not None
+
+
+def test_cache_drops_fills_that_raced_an_invalidation(tmp_path) -> None:
+    cache = SpotTileCache(max_entries=8, spill_dir=tmp_path, ttl_seconds=60)
+    key = tile_for_point(47.3769, 8.5417, 10)
+    epoch = cache.epoch
+    cache.invalidate_point(47.3769, 8.5417)
+    cache.put(key, encode_tile(key, []), epoch=epoch)
+    assert cache.get(key) is None
+
+    # Invalidating another tile mid-load does not cost this fill its cache entry.
+    epoch = cache.epoch
+    cache.invalidate_point(35.68, 139.69)
+    cache.put(key, encode_tile(key, []), epoch=epoch)
+    assert cache.get(key) is not None
+
+
+def test_relay_drops_tiles_on_other_workers(tmp_path) -> None:
+    repository = MongoRepository(collection_name=f"cache_invalidations_{uuid.uuid4().hex[:8]}", model_type=CacheInvalidationRecord)
+    first = SpotTileCache(max_entries=8, spill_dir=tmp_path / "first", ttl_seconds=60)
+    second = SpotTileCache(max_entries=8, spill_dir=tmp_path / "second", ttl_seconds=60)
+    first_relay, second_relay = CacheInvalidationRelay(repository), CacheInvalidationRelay(repository)
+    publish = first_relay.subscribe("tiles", lambda keys: None)
+    first.add_listener(lambda keys: publish(tile_key_text(key) for key in keys))
+    second_relay.subscribe("tiles", lambda keys: second.invalidate_tiles(map(parse_tile_key, keys), broadcast=False))
+
+    key = tile_for_point(47.3769, 8.5417, 10)
+    second.put(key, encode_tile(key, []))
+    first.invalidate_point(47.3769, 8.5417)
+    assert second_relay.poll_once() == 1
+    assert second.get(key) is None
+    assert parse_tile_key("23/0/0") is None
+
+
+def test_generic_spot_crud_writes_invalidate_tiles() -> None:
+    client = TestClient(create_app())
+    name = f"tiles_{uuid.uuid4().hex[:10]}"
+    token = client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret-password"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    cache = get_spot_tile_cache()
+    zurich = tile_for_point(47.3769, 8.5417, 12)
+    tokyo = tile_for_point(35.68, 139.69, 12)
+
+    cache.put(zurich, encode_tile(zurich, []))
+    spot = {"title": "Lake", "lat": 47.3769, "lon": 8.5417}
+    spot_id = client.post("/spots/", json=spot, headers=headers).json()["id"]
+    assert cache.get(zurich) is None
+
+    cache.put(zurich, encode_tile(zurich, []))
+    cache.put(tokyo, encode_tile(tokyo, []))
+    assert client.put(f"/spots/{spot_id}", json={**spot, "lat": 35.68, "lon": 139.69}, headers=headers).status_code == 200
+    assert cache.get(zurich) is None
+    assert cache.get(tokyo) is None
+
+    cache.put(tokyo, encode_tile(tokyo, []))
+    assert client.delete(f"/spots/{spot_id}", headers=headers).status_code == 204
+    assert cache.get(tokyo) is None